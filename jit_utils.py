@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Numba-compiled pixel kernels for the web_preview.py detection loop
+
+Every kernel has a NumPy/OpenCV equivalent that is used when numba is not
+installed, so callers never need to check for it. Compiled kernels are
+cached on disk (cache=True), so only the very first start on a device pays
+the JIT cost.
+"""
+
+import cv2
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+# YOLOv5 letterbox border colour, normalised
+PAD_VALUE = 114 / 255.0
+
+
+# ─────────────── Letterbox ─────────────────────────
+def _letterbox_chw(resized, out, top, left):
+    """Write a resized BGR uint8 image into a padded, normalised float32 RGB CHW buffer"""
+    h, w = resized.shape[0], resized.shape[1]
+    out[:] = PAD_VALUE
+    for y in prange(h):
+        for x in range(w):
+            for c in range(3):
+                out[2 - c, top + y, left + x] = resized[y, x, c] / 255.0
+    return out
+
+
+def _letterbox_chw_numpy(resized, out, top, left):
+    """NumPy equivalent of _letterbox_chw"""
+    h, w = resized.shape[:2]
+    out[:] = PAD_VALUE
+    out[:, top:top + h, left:left + w] = resized[..., ::-1].transpose(2, 0, 1) / 255.0
+    return out
+
+
+# ─────────────── Motion Mask ─────────────────────────
+def _motion_area(small, prev_small, threshold):
+    """Count pixels of two greyscale images whose absolute difference exceeds threshold"""
+    count = 0
+    for y in prange(small.shape[0]):
+        for x in range(small.shape[1]):
+            if abs(np.int16(small[y, x]) - np.int16(prev_small[y, x])) > threshold:
+                count += 1
+    return count
+
+
+def _motion_area_opencv(small, prev_small, threshold):
+    """OpenCV equivalent of _motion_area"""
+    diff = cv2.absdiff(small, prev_small)
+    _, mask = cv2.threshold(diff, threshold, 255, cv2.THRESH_BINARY)
+    return cv2.countNonZero(mask)
+
+
+if njit:
+    _jit = njit(parallel=True, fastmath=True, cache=True, nogil=True)
+    letterbox_chw = _jit(_letterbox_chw)
+    motion_area = _jit(_motion_area)
+else:
+    letterbox_chw = _letterbox_chw_numpy
+    motion_area = _motion_area_opencv
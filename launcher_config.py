@@ -6,7 +6,7 @@ This file is part of the repository and controls what gets executed
 
 import os
 from datetime import datetime
-from sms_config import SMS_CONFIG, get_phone_number, get_sender_name, get_delay_minutes, get_domain_name
+from sms_config import SMS_CONFIG, PHONE_NUMBER, SENDER_NAME, DELAY_MINUTES, DOMAIN_NAME
 
 # Configuration mode: 'monolith' or 'modular'
 MODE = 'monolith'
@@ -92,16 +92,16 @@ def setup_environment():
     os.environ['PYTHONUNBUFFERED'] = '1'
     
     # Set up SMS configuration from sms_config.py
-    phone_number = get_phone_number()
+    phone_number = PHONE_NUMBER
     if phone_number:
         os.environ['PHONE_NUMBER'] = phone_number
         print(f"✓ Phone number configured: {phone_number}")
     else:
         print("⚠️  No phone number configured in sms_config.py")
     
-    os.environ['LOX24_SENDER'] = get_sender_name()
-    os.environ['SMS_DELAY_MINUTES'] = str(get_delay_minutes())
-    os.environ['DOMAIN_NAME'] = get_domain_name()
+    os.environ['LOX24_SENDER'] = SENDER_NAME
+    os.environ['SMS_DELAY_MINUTES'] = str(DELAY_MINUTES)
+    os.environ['DOMAIN_NAME'] = DOMAIN_NAME
     
     # Enable SMS if configured in CONFIG
     if CONFIG.get('enable_sms') and phone_number:
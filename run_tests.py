@@ -2,16 +2,19 @@
 """
 VespAI Test Runner
 
-Simple test runner for VespAI that runs all test modules explicitly.
+Simple test runner for VespAI that runs all test modules explicitly,
+one subprocess per test file, in parallel across the available cores.
 """
 
+import argparse
 import subprocess
 import sys
 import os
 import glob
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def run_tests():
-    """Find and run all test files in the tests directory."""
+def run_tests(fail_fast=False):
+    """Find and run all test files in the tests directory in parallel."""
     # Add project root to Python path
     project_root = os.path.dirname(os.path.abspath(__file__))
     
@@ -30,18 +33,32 @@ def run_tests():
     print(f"Found {len(test_files)} test file(s)")
     
     all_passed = True
-    for test_file in test_files:
-        print(f"\n{'='*60}")
-        print(f"Running tests in: {os.path.relpath(test_file)}")
-        print(f"{'='*60}")
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {
+            executor.submit(subprocess.run, [sys.executable, test_file],
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            universal_newlines=True): test_file
+            for test_file in test_files
+        }
         
-        try:
-            result = subprocess.run([sys.executable, test_file], 
-                                  capture_output=False, 
-                                  check=True)
-        except subprocess.CalledProcessError:
-            all_passed = False
-            print(f"Tests FAILED in {os.path.relpath(test_file)}")
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            test_file = futures[future]
+            result = future.result()
+            
+            # Print each file's buffered output in one piece so parallel runs don't interleave
+            print(f"\n{'='*60}")
+            print(f"Results for: {os.path.relpath(test_file)}")
+            print(f"{'='*60}")
+            print(result.stdout, end='')
+            
+            if result.returncode != 0:
+                all_passed = False
+                print(f"Tests FAILED in {os.path.relpath(test_file)}")
+                if fail_fast:
+                    for pending in futures:
+                        pending.cancel()
     
     if all_passed:
         print(f"\n{'='*60}")
@@ -55,5 +72,9 @@ def run_tests():
         return 1
 
 if __name__ == '__main__':
-    exit_code = run_tests()
+    parser = argparse.ArgumentParser(description="Run the VespAI test suite")
+    parser.add_argument('--fail-fast', action='store_true',
+                        help="Stop starting new test files after the first failure")
+    args = parser.parse_args()
+    exit_code = run_tests(fail_fast=args.fail_fast)
     sys.exit(exit_code)
\ No newline at end of file
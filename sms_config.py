@@ -28,26 +28,36 @@ SMS_CONFIG = {
     "cost_override": None  # or 0.08 to force 8 cents
 }
 
+# Resolved once at import; these values do not change at runtime
+PHONE_NUMBER = SMS_CONFIG.get("phone_number", "")
+SENDER_NAME = SMS_CONFIG.get("sender_name", "VespAI")
+DELAY_MINUTES = SMS_CONFIG.get("delay_minutes", 5)
+ENABLED = SMS_CONFIG.get("enabled", True)
+DOMAIN_NAME = SMS_CONFIG.get("domain_name", "localhost")
+COST_OVERRIDE = SMS_CONFIG.get("cost_override", None)
+
+
+# Getters kept for older callers; prefer the constants above
 def get_phone_number():
     """Get the configured phone number"""
-    return SMS_CONFIG.get("phone_number", "")
+    return PHONE_NUMBER
 
 def get_sender_name():
     """Get the configured sender name"""
-    return SMS_CONFIG.get("sender_name", "VespAI")
+    return SENDER_NAME
 
 def get_delay_minutes():
     """Get the configured delay in minutes"""
-    return SMS_CONFIG.get("delay_minutes", 5)
+    return DELAY_MINUTES
 
 def is_sms_enabled():
     """Check if SMS is enabled in config"""
-    return SMS_CONFIG.get("enabled", True)
+    return ENABLED
 
 def get_domain_name():
     """Get the configured domain name"""
-    return SMS_CONFIG.get("domain_name", "localhost")
+    return DOMAIN_NAME
 
 def get_cost_override():
     """Get the cost override value (None to use API response)"""
-    return SMS_CONFIG.get("cost_override", None)
\ No newline at end of file
+    return COST_OVERRIDE
@@ -11,13 +11,222 @@ Version: 1.0
 
 import os
 import argparse
+import functools
 import logging
+import types
 from typing import Tuple, Optional, Dict, Any
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _load_env_once():
+    """Read the .env file into os.environ the first time it is called."""
+    load_dotenv()
+
+
+def _parse_bool(value: str) -> bool:
+    """Interpret an environment string as a boolean flag."""
+    return value.lower() in ('true', '1', 'yes', 'on')
+
+
+# Default configuration, shared read-only by all VespAIConfig instances
+_DEFAULTS = types.MappingProxyType({
+    # Camera settings
+    'resolution': '1920x1080',
+    'video_file': None,
+
+    # Detection settings  
+    'confidence_threshold': 0.8,
+    'model_path': 'models/yolov5s-all-data.pt',
+    'save_detections': False,
+    'save_directory': 'data/detections',
+    'print_detections': False,
+
+    # Motion detection
+    'enable_motion_detection': False,
+    'min_motion_area': 100,
+    'dilation_iterations': 1,
+    'motion_threshold': 0,
+
+    # Performance settings
+    'frame_delay': 0.1,
+    'batch_size': 1,
+
+    # Web interface
+    'enable_web': False,
+    'web_host': '0.0.0.0',
+    'web_port': 5000,
+
+    # SMS settings (disabled by default, use --sms to enable)
+    'enable_sms': False,
+    'lox24_api_key': '',
+    'phone_number': '',
+    'lox24_sender': 'VespAI',
+    'sms_delay_minutes': 5,
+    'sms_burst': 1,
+    'domain_name': 'localhost',
+    'use_https': False,
+})
+
+# Environment variable -> (config key, converter)
+_ENV_SPEC = (
+    ('RESOLUTION', 'resolution', str),
+    ('CONFIDENCE_THRESHOLD', 'confidence_threshold', float),
+    ('MODEL_PATH', 'model_path', str),
+    ('SAVE_DETECTIONS', 'save_detections', _parse_bool),
+    ('SAVE_DIRECTORY', 'save_directory', str),
+    ('ENABLE_MOTION_DETECTION', 'enable_motion_detection', _parse_bool),
+    ('MIN_MOTION_AREA', 'min_motion_area', int),
+    ('MOTION_THRESHOLD', 'motion_threshold', float),
+    ('FRAME_DELAY', 'frame_delay', float),
+    ('BATCH_SIZE', 'batch_size', int),
+    ('ENABLE_WEB', 'enable_web', _parse_bool),
+    ('WEB_HOST', 'web_host', str),
+    ('WEB_PORT', 'web_port', int),
+    ('ENABLE_SMS', 'enable_sms', _parse_bool),
+    ('LOX24_API_KEY', 'lox24_api_key', str),
+    ('PHONE_NUMBER', 'phone_number', str),
+    ('LOX24_SENDER', 'lox24_sender', str),
+    ('SMS_DELAY_MINUTES', 'sms_delay_minutes', int),
+    ('SMS_BURST', 'sms_burst', int),
+    ('DOMAIN_NAME', 'domain_name', str),
+    ('USE_HTTPS', 'use_https', _parse_bool),
+)
+
+# Keys that feed get_web_config()
+_WEB_CONFIG_KEYS = frozenset(('use_https', 'domain_name', 'web_port', 'web_host', 'enable_web'))
+
+# argparse attribute -> config key
+_ARG_SPEC = (
+    ('resolution', 'resolution'),
+    ('video', 'video_file'),
+    ('conf', 'confidence_threshold'),
+    ('model_path', 'model_path'),
+    ('save', 'save_detections'),
+    ('save_dir', 'save_directory'),
+    ('print', 'print_detections'),
+    ('motion', 'enable_motion_detection'),
+    ('min_motion_area', 'min_motion_area'),
+    ('dilation', 'dilation_iterations'),
+    ('motion_threshold', 'motion_threshold'),
+    ('brake', 'frame_delay'),
+    ('batch_size', 'batch_size'),
+    ('web', 'enable_web'),
+    ('web_host', 'web_host'),
+    ('web_port', 'web_port'),
+)
+
+
+# Config keys whose current values become argparse defaults
+_PARSER_DEFAULT_KEYS = ('resolution', 'video_file', 'confidence_threshold', 'model_path',
+                        'save_detections', 'save_directory', 'print_detections',
+                        'enable_motion_detection', 'min_motion_area', 'dilation_iterations',
+                        'motion_threshold', 'frame_delay', 'batch_size', 'enable_web', 'web_host', 'web_port')
+
+
+@functools.lru_cache(maxsize=1)
+def _build_parser(defaults: Tuple[Tuple[str, Any], ...]) -> argparse.ArgumentParser:
+    """
+    Build the command line parser, once per distinct set of defaults.
+    
+    Args:
+        defaults: (config key, value) pairs for _PARSER_DEFAULT_KEYS
+        
+    Returns:
+        argparse.ArgumentParser: Parser with the given defaults
+    """
+    config = dict(defaults)
+    
+    parser = argparse.ArgumentParser(
+        description='VespAI Hornet Detection System',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+
+    # Camera settings
+    parser.add_argument('-r', '--resolution', 
+                      default=config['resolution'],
+                      help='Camera resolution (e.g., 1920x1080, 1080p, 720p)')
+    parser.add_argument('-v', '--video',
+                      default=config['video_file'],
+                      help='Video file to process instead of live camera')
+
+    # Detection settings
+    parser.add_argument('-c', '--conf', '--confidence',
+                      type=float,
+                      default=config['confidence_threshold'], 
+                      help='Detection confidence threshold')
+    parser.add_argument('--model-path',
+                      default=config['model_path'],
+                      help='Path to YOLOv5 model weights')
+    parser.add_argument('-s', '--save',
+                      action='store_true',
+                      default=config['save_detections'],
+                      help='Save detection images')
+    parser.add_argument('-sd', '--save-dir',
+                      default=config['save_directory'],
+                      help='Directory to save detection images')
+    parser.add_argument('-p', '--print',
+                      action='store_true', 
+                      default=config['print_detections'],
+                      help='Print detection details to console')
+
+    # Motion detection
+    parser.add_argument('-m', '--motion',
+                      action='store_true',
+                      default=config['enable_motion_detection'],
+                      help='Enable motion detection optimization')
+    parser.add_argument('-a', '--min-motion-area',
+                      type=int,
+                      default=config['min_motion_area'],
+                      help='Minimum motion area threshold')
+    parser.add_argument('-d', '--dilation',
+                      type=int,
+                      default=config['dilation_iterations'],
+                      help='Dilation iterations for motion detection')
+    parser.add_argument('--motion-threshold',
+                      type=float,
+                      default=config['motion_threshold'],
+                      help='Grey level change per thumbnail pixel that counts as motion; '
+                           'frames without enough changed pixels skip inference (0 disables)')
+
+    # Performance settings
+    parser.add_argument('-b', '--brake',
+                      type=float,
+                      default=config['frame_delay'],
+                      help='Frame processing delay in seconds')
+    parser.add_argument('--batch-size',
+                      type=int,
+                      default=config['batch_size'],
+                      help='Frames per inference batch (GPU throughput vs. latency)')
+
+    # Web interface
+    parser.add_argument('--web',
+                      action='store_true',
+                      default=config['enable_web'],
+                      help='Enable web dashboard')
+    parser.add_argument('--web-host',
+                      default=config['web_host'],
+                      help='Web server host address')
+    parser.add_argument('--web-port',
+                      type=int,
+                      default=config['web_port'],
+                      help='Web server port')
+
+    # SMS alerts
+    parser.add_argument('--sms',
+                      action='store_true',
+                      default=False,
+                      help='Enable SMS alerts (requires LOX24_API_KEY and PHONE_NUMBER)')
+    parser.add_argument('--no-sms',
+                      action='store_true',
+                      default=False,
+                      help='Disable SMS alerts')
+    
+    return parser
+
+
 class VespAIConfig:
     """
     Central configuration management for VespAI.
@@ -26,94 +235,39 @@ class VespAIConfig:
     with proper precedence (CLI args override env vars override defaults).
     """
     
+    __slots__ = ('config', '_resolution_cache', '_web_config_cache')
+    
+    defaults = _DEFAULTS
+    
     def __init__(self):
         """Initialize configuration with defaults."""
-        # Load environment variables from .env file
-        load_dotenv()
-        
-        # Default configuration
-        self.defaults = {
-            # Camera settings
-            'resolution': '1920x1080',
-            'video_file': None,
-            
-            # Detection settings  
-            'confidence_threshold': 0.8,
-            'model_path': 'models/yolov5s-all-data.pt',
-            'save_detections': False,
-            'save_directory': 'data/detections',
-            'print_detections': False,
-            
-            # Motion detection
-            'enable_motion_detection': False,
-            'min_motion_area': 100,
-            'dilation_iterations': 1,
-            
-            # Performance settings
-            'frame_delay': 0.1,
-            
-            # Web interface
-            'enable_web': False,
-            'web_host': '0.0.0.0',
-            'web_port': 5000,
-            
-            # SMS settings (disabled by default, use --sms to enable)
-            'enable_sms': False,
-            'lox24_api_key': '',
-            'phone_number': '',
-            'lox24_sender': 'VespAI',
-            'sms_delay_minutes': 5,
-            'domain_name': 'localhost',
-            'use_https': False,
-        }
+        # Load environment variables from .env file (once per process)
+        _load_env_once()
         
         # Current configuration (will be populated from env + args)
-        self.config = {}
+        self.config = dict(_DEFAULTS)
+
+        # Derived values, rebuilt on first use after a change
+        self._resolution_cache: Optional[Tuple[int, int]] = None
+        self._web_config_cache: Optional[Dict[str, Any]] = None
+        
         self._load_from_environment()
     
+    @classmethod
+    def reload_env(cls):
+        """Re-read the .env file, e.g. after a test has rewritten it."""
+        _load_env_once.cache_clear()
+        _load_env_once()
+    
     def _load_from_environment(self):
         """Load configuration from environment variables."""
-        # Map environment variable names to config keys
-        env_mapping = {
-            'RESOLUTION': 'resolution',
-            'CONFIDENCE_THRESHOLD': 'confidence_threshold', 
-            'MODEL_PATH': 'model_path',
-            'SAVE_DETECTIONS': 'save_detections',
-            'SAVE_DIRECTORY': 'save_directory',
-            'ENABLE_MOTION_DETECTION': 'enable_motion_detection',
-            'MIN_MOTION_AREA': 'min_motion_area',
-            'FRAME_DELAY': 'frame_delay',
-            'ENABLE_WEB': 'enable_web',
-            'WEB_HOST': 'web_host',
-            'WEB_PORT': 'web_port',
-            'ENABLE_SMS': 'enable_sms',
-            'LOX24_API_KEY': 'lox24_api_key',
-            'PHONE_NUMBER': 'phone_number',
-            'LOX24_SENDER': 'lox24_sender',
-            'SMS_DELAY_MINUTES': 'sms_delay_minutes',
-            'DOMAIN_NAME': 'domain_name',
-            'USE_HTTPS': 'use_https',
-        }
-        
-        # Start with defaults
-        self.config = self.defaults.copy()
-        
         # Override with environment variables
-        for env_key, config_key in env_mapping.items():
-            env_value = os.getenv(env_key)
+        environ = os.environ
+        for env_key, config_key, convert in _ENV_SPEC:
+            env_value = environ.get(env_key)
             if env_value is not None:
-                # Convert types based on default value type
-                default_value = self.defaults[config_key]
                 try:
-                    if isinstance(default_value, bool):
-                        self.config[config_key] = env_value.lower() in ('true', '1', 'yes', 'on')
-                    elif isinstance(default_value, int):
-                        self.config[config_key] = int(env_value)
-                    elif isinstance(default_value, float):
-                        self.config[config_key] = float(env_value)
-                    else:
-                        self.config[config_key] = env_value
-                        
+                    self.config[config_key] = convert(env_value)
                     logger.debug("Loaded %s from environment: %s", config_key, env_value)
                 except (ValueError, TypeError) as e:
                     logger.warning("Invalid environment value for %s: %s (%s)", env_key, env_value, e)
@@ -128,81 +282,8 @@ class VespAIConfig:
         Returns:
             argparse.Namespace: Parsed arguments
         """
-        parser = argparse.ArgumentParser(
-            description='VespAI Hornet Detection System',
-            formatter_class=argparse.ArgumentDefaultsHelpFormatter
-        )
-        
-        # Camera settings
-        parser.add_argument('-r', '--resolution', 
-                          default=self.config['resolution'],
-                          help='Camera resolution (e.g., 1920x1080, 1080p, 720p)')
-        parser.add_argument('-v', '--video',
-                          default=self.config['video_file'],
-                          help='Video file to process instead of live camera')
-        
-        # Detection settings
-        parser.add_argument('-c', '--conf', '--confidence',
-                          type=float,
-                          default=self.config['confidence_threshold'], 
-                          help='Detection confidence threshold')
-        parser.add_argument('--model-path',
-                          default=self.config['model_path'],
-                          help='Path to YOLOv5 model weights')
-        parser.add_argument('-s', '--save',
-                          action='store_true',
-                          default=self.config['save_detections'],
-                          help='Save detection images')
-        parser.add_argument('-sd', '--save-dir',
-                          default=self.config['save_directory'],
-                          help='Directory to save detection images')
-        parser.add_argument('-p', '--print',
-                          action='store_true', 
-                          default=self.config['print_detections'],
-                          help='Print detection details to console')
-        
-        # Motion detection
-        parser.add_argument('-m', '--motion',
-                          action='store_true',
-                          default=self.config['enable_motion_detection'],
-                          help='Enable motion detection optimization')
-        parser.add_argument('-a', '--min-motion-area',
-                          type=int,
-                          default=self.config['min_motion_area'],
-                          help='Minimum motion area threshold')
-        parser.add_argument('-d', '--dilation',
-                          type=int,
-                          default=self.config['dilation_iterations'],
-                          help='Dilation iterations for motion detection')
-        
-        # Performance settings
-        parser.add_argument('-b', '--brake',
-                          type=float,
-                          default=self.config['frame_delay'],
-                          help='Frame processing delay in seconds')
-        
-        # Web interface
-        parser.add_argument('--web',
-                          action='store_true',
-                          default=self.config['enable_web'],
-                          help='Enable web dashboard')
-        parser.add_argument('--web-host',
-                          default=self.config['web_host'],
-                          help='Web server host address')
-        parser.add_argument('--web-port',
-                          type=int,
-                          default=self.config['web_port'],
-                          help='Web server port')
-        
-        # SMS alerts
-        parser.add_argument('--sms',
-                          action='store_true',
-                          default=False,
-                          help='Enable SMS alerts (requires LOX24_API_KEY and PHONE_NUMBER)')
-        parser.add_argument('--no-sms',
-                          action='store_true',
-                          default=False,
-                          help='Disable SMS alerts')
+        frozen = tuple((key, self.config[key]) for key in _PARSER_DEFAULT_KEYS)
+        parser = _build_parser(frozen)
         
         # Parse arguments
         parsed_args = parser.parse_args(args)
@@ -212,37 +293,48 @@ class VespAIConfig:
         
         return parsed_args
     
+    @classmethod
+    def from_dict(cls, options: Dict[str, Any]) -> 'VespAIConfig':
+        """
+        Create a configuration from pre-parsed options without argparse.
+        
+        Args:
+            options: Values keyed like the argparse attributes
+                (e.g. {'resolution': '720p', 'conf': 0.6, 'web': True})
+            
+        Returns:
+            VespAIConfig: Configured instance (call validate() as needed)
+        """
+        config = cls()
+        config._update_from_args(types.SimpleNamespace(**options))
+        return config
+    
     def _update_from_args(self, args: argparse.Namespace):
         """Update configuration from parsed command line arguments."""
-        # Map argument attributes to config keys
-        arg_mapping = {
-            'resolution': 'resolution',
-            'video': 'video_file',
-            'conf': 'confidence_threshold',
-            'model_path': 'model_path', 
-            'save': 'save_detections',
-            'save_dir': 'save_directory',
-            'print': 'print_detections',
-            'motion': 'enable_motion_detection',
-            'min_motion_area': 'min_motion_area',
-            'dilation': 'dilation_iterations',
-            'brake': 'frame_delay',
-            'web': 'enable_web',
-            'web_host': 'web_host',
-            'web_port': 'web_port',
-        }
-        
-        for arg_key, config_key in arg_mapping.items():
-            if hasattr(args, arg_key):
-                value = getattr(args, arg_key)
-                if value is not None:
-                    self.config[config_key] = value
+        for arg_key, config_key in _ARG_SPEC:
+            value = getattr(args, arg_key, None)
+            if value is not None:
+                self.config[config_key] = value
         
         # Handle SMS enable/disable flags
         if hasattr(args, 'sms') and args.sms:
             self.config['enable_sms'] = True
         elif hasattr(args, 'no_sms') and args.no_sms:
             self.config['enable_sms'] = False
+        
+        self._invalidate_caches()
+    
+    def _invalidate_caches(self, key: Optional[str] = None):
+        """
+        Drop cached derived values.
+        
+        Args:
+            key: Changed configuration key (None clears everything)
+        """
+        if key is None or key == 'resolution':
+            self._resolution_cache = None
+        if key is None or key in _WEB_CONFIG_KEYS:
+            self._web_config_cache = None
     
     def get(self, key: str, default=None) -> Any:
         """
@@ -266,6 +358,7 @@ class VespAIConfig:
             value: Value to set
         """
         self.config[key] = value
+        self._invalidate_caches(key)
         logger.debug("Set %s to %s", key, value)
     
     def get_camera_resolution(self) -> Tuple[int, int]:
@@ -275,8 +368,10 @@ class VespAIConfig:
         Returns:
             Tuple of (width, height)
         """
-        from .detection import parse_resolution
-        return parse_resolution(self.config['resolution'])
+        if self._resolution_cache is None:
+            from .detection import parse_resolution
+            self._resolution_cache = parse_resolution(self.config['resolution'])
+        return self._resolution_cache
     
     def get_sms_config(self) -> Dict[str, Any]:
         """
@@ -291,6 +386,7 @@ class VespAIConfig:
             'phone_number': self.config['phone_number'],
             'sender_name': self.config['lox24_sender'],
             'delay_minutes': self.config['sms_delay_minutes'],
+            'burst': self.config['sms_burst'],
         }
     
     def get_web_config(self) -> Dict[str, Any]:
@@ -298,8 +394,11 @@ class VespAIConfig:
         Get web server configuration dictionary.
         
         Returns:
-            Dictionary with web configuration
+            Dictionary with web configuration (cached; do not modify)
         """
+        if self._web_config_cache is not None:
+            return self._web_config_cache
+        
         protocol = 'https' if self.config['use_https'] else 'http'
         domain = self.config['domain_name']
         port = self.config['web_port']
@@ -309,12 +408,13 @@ class VespAIConfig:
         else:
             public_url = f"{protocol}://{domain}:{port}"
         
-        return {
+        self._web_config_cache = {
             'enabled': self.config['enable_web'],
             'host': self.config['web_host'],
             'port': self.config['web_port'],
             'public_url': public_url,
         }
+        return self._web_config_cache
     
     def validate(self) -> bool:
         """
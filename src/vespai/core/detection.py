@@ -11,12 +11,15 @@ Version: 1.0
 
 import cv2
 import time
+import platform
 import datetime
+import functools
 import numpy as np
 import logging
 import warnings
 from typing import Tuple, Optional, Dict, Any, List
-from collections import deque
+from collections import OrderedDict, deque
+from types import SimpleNamespace
 import torch
 
 # Suppress specific PyTorch autocast deprecation warning from YOLOv5
@@ -30,6 +33,17 @@ torch.load = lambda *args, **kwargs: original_load(*args, **kwargs, weights_only
 
 logger = logging.getLogger(__name__)
 
+IS_WINDOWS = platform.system() == 'Windows'
+
+
+@functools.lru_cache(maxsize=1)
+def _has_gstreamer() -> bool:
+    """Return True if this OpenCV build can open GStreamer pipelines."""
+    for line in cv2.getBuildInformation().splitlines():
+        if line.strip().startswith('GStreamer:'):
+            return 'YES' in line
+    return False
+
 
 class CameraManager:
     """
@@ -74,7 +88,11 @@ class CameraManager:
             logger.info("Initializing camera with resolution %dx%d", self.width, self.height)
             
             # Try different backends for cross-platform compatibility
-            backends = [
+            backends = []
+            if not IS_WINDOWS and _has_gstreamer():
+                # Hardware JPEG decode where available; falls through to V4L2 otherwise
+                backends.append((self._gstreamer_pipeline(), cv2.CAP_GSTREAMER))
+            backends += [
                 (0, cv2.CAP_V4L2),      # Linux
                 ("/dev/video0", cv2.CAP_V4L2),  # Linux backup
                 (0, cv2.CAP_DSHOW),     # Windows DirectShow
@@ -99,8 +117,9 @@ class CameraManager:
             if not self.cap or not self.cap.isOpened():
                 raise RuntimeError("Cannot open camera with any backend")
             
-            # Configure camera properties
-            self._configure_camera()
+            # Configure camera properties (a GStreamer pipeline fixes them in its caps)
+            if backend != getattr(cv2, 'CAP_GSTREAMER', None):
+                self._configure_camera()
         
         if not self.cap.isOpened():
             raise RuntimeError("Failed to initialize video capture")
@@ -110,6 +129,28 @@ class CameraManager:
         time.sleep(0.5)  # Quick stabilization
         return self.cap
     
+    def _gstreamer_pipeline(self, device: str = "/dev/video0") -> str:
+        """
+        Build a GStreamer pipeline that decodes the camera's MJPEG stream.
+        
+        Uses the NVDEC JPEG decoder on Jetson and the plain jpegdec element
+        elsewhere. appsink keeps at most two buffers and drops stale ones.
+        
+        Args:
+            device: V4L2 device node of the camera
+            
+        Returns:
+            str: Pipeline description for cv2.VideoCapture
+        """
+        import os
+        caps = f"image/jpeg,width={self.width},height={self.height},framerate=30/1"
+        if os.path.exists('/etc/nv_tegra_release'):
+            decode = "nvv4l2decoder mjpeg=1 ! nvvidconv ! video/x-raw,format=BGRx ! videoconvert"
+        else:
+            decode = "jpegdec ! videoconvert"
+        return (f"v4l2src device={device} ! {caps} ! {decode} ! "
+                "video/x-raw,format=BGR ! appsink max-buffers=2 drop=true sync=false")
+    
     def _configure_camera(self):
         """Configure camera properties for optimal capture."""
         if not self.cap:
@@ -126,13 +167,22 @@ class CameraManager:
         # Set frame rate
         self.cap.set(cv2.CAP_PROP_FPS, 30)
         
+        # Keep only the newest frame queued so reads never return stale frames
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
         # Log actual settings
         actual_width = self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)
         actual_height = self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
         actual_fps = self.cap.get(cv2.CAP_PROP_FPS)
+        # Masked: unsupported backends report -1 and DirectShow negative codes
+        fourcc_code = int(self.cap.get(cv2.CAP_PROP_FOURCC)) & 0xFFFFFFFF
+        actual_fourcc = fourcc_code.to_bytes(4, 'little').decode('ascii', 'replace')
         
-        logger.info("Camera configured - Resolution: %dx%d, FPS: %.1f", 
-                   actual_width, actual_height, actual_fps)
+        logger.info("Camera configured - Resolution: %dx%d, FPS: %.1f, Format: %s", 
+                   actual_width, actual_height, actual_fps, actual_fourcc)
+        if actual_fourcc != 'MJPG':
+            logger.warning("Camera did not accept MJPG (got %s), frame rate may be USB-limited",
+                           actual_fourcc)
     
     def read_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
         """
@@ -153,6 +203,81 @@ class CameraManager:
             logger.info("Camera released")
 
 
+class ExportedModelRunner:
+    """
+    Runs an exported YOLOv5 network (ONNX Runtime or OpenVINO) on CPU.
+
+    Does the letterboxing and NMS that YOLOv5's AutoShape would otherwise do,
+    and returns an object exposing ``pred`` like YOLOv5 ``Detections``.
+    """
+
+    def __init__(self, infer, confidence: float = 0.8, iou: float = 0.45,
+                 img_size: int = 640, max_det: int = 300):
+        """
+        Initialize the runner.
+
+        Args:
+            infer: Callable mapping a (1, 3, H, W) float32 blob to raw network output
+            confidence: Detection confidence threshold
+            iou: NMS IoU threshold
+            img_size: Square input size the network was exported with
+            max_det: Maximum detections kept per frame
+        """
+        self.infer = infer
+        self.conf = confidence
+        self.iou = iou
+        self.img_size = img_size
+        self.max_det = max_det
+
+    def __call__(self, frame: np.ndarray) -> SimpleNamespace:
+        """
+        Run inference on a BGR frame.
+
+        Args:
+            frame: Input image frame (BGR)
+
+        Returns:
+            Namespace whose ``pred[0]`` is an (N, 6) array of x1, y1, x2, y2, conf, cls
+        """
+        h, w = frame.shape[:2]
+        gain = min(self.img_size / h, self.img_size / w)
+        nh, nw = round(h * gain), round(w * gain)
+        top, left = (self.img_size - nh) // 2, (self.img_size - nw) // 2
+
+        img = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+        img = cv2.copyMakeBorder(img, top, self.img_size - nh - top,
+                                 left, self.img_size - nw - left,
+                                 cv2.BORDER_CONSTANT, value=(114, 114, 114))
+        blob = cv2.dnn.blobFromImage(img, 1 / 255.0, swapRB=True)
+
+        pred = self._postprocess(np.asarray(self.infer(blob))[0])
+        pred[:, [0, 2]] = ((pred[:, [0, 2]] - left) / gain).clip(0, w)
+        pred[:, [1, 3]] = ((pred[:, [1, 3]] - top) / gain).clip(0, h)
+        return SimpleNamespace(pred=[pred])
+
+    def _postprocess(self, output: np.ndarray) -> np.ndarray:
+        """Filter raw (anchors, 5 + classes) output and apply per-class NMS."""
+        output = output[output[:, 4] > self.conf]
+        if not len(output):
+            return np.zeros((0, 6), dtype=np.float32)
+
+        scores = output[:, 5:] * output[:, 4:5]
+        cls = scores.argmax(1)
+        conf = scores[np.arange(len(cls)), cls]
+        keep = conf > self.conf
+        output, cls, conf = output[keep], cls[keep], conf[keep]
+
+        xywh = output[:, :4]
+        boxes = np.concatenate((xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, 2:]), axis=1)
+        idx = cv2.dnn.NMSBoxesBatched(boxes.tolist(), conf.tolist(), cls.tolist(),
+                                      self.conf, self.iou)
+        idx = np.asarray(idx, dtype=np.int64).reshape(-1)[:self.max_det]
+
+        xyxy = np.concatenate((boxes[idx, :2], boxes[idx, :2] + boxes[idx, 2:]), axis=1)
+        return np.concatenate((xyxy, conf[idx, None], cls[idx, None]),
+                              axis=1).astype(np.float32)
+
+
 class ModelManager:
     """
     Manages YOLOv5 model loading with multiple fallback methods.
@@ -161,18 +286,31 @@ class ModelManager:
     different environments and installations.
     """
     
-    def __init__(self, model_path: str, confidence: float = 0.8):
+    def __init__(self, model_path: str, confidence: float = 0.8,
+                 frame_size: Tuple[int, int] = (1920, 1080), batch_size: int = 1):
         """
         Initialize model manager.
         
         Args:
             model_path: Path to YOLOv5 model weights
             confidence: Detection confidence threshold
+            frame_size: Camera (width, height), used to warm up compiled
+                networks at the shape real frames are inferred at
+            batch_size: Largest number of frames per forward pass
         """
         self.model_path = model_path
         self.confidence = confidence
+        self.frame_size = frame_size
+        self.batch_size = max(1, batch_size)
         self.model = None
         self.class_names = {}
+        self.runtime: Optional[ExportedModelRunner] = None
+        # Exported networks (ONNX, TensorRT) only accept a batch of one
+        self.fixed_batch = False
+        self.half = False
+        self._amp_device = 'cpu'
+        self._amp_dtype = torch.bfloat16
+        self._amp_enabled = False
     
     def load_model(self) -> Any:
         """
@@ -190,12 +328,20 @@ class ModelManager:
             raise RuntimeError(f"Model file not found: {self.model_path}")
         
         # Try different loading methods
-        loading_methods = [
-            self._load_via_yolov5_package,
-            self._load_via_local_directory,
-            self._load_via_github,
-            self._load_fallback_model
-        ]
+        exported = self.model_path.endswith(('.engine', '.onnx'))
+        if self.model_path.endswith('.engine'):
+            loading_methods = [self._load_tensorrt_engine, self._load_via_yolov5_package]
+        elif self.model_path.endswith('.onnx'):
+            loading_methods = [self._load_via_onnxruntime, self._load_via_yolov5_package]
+        else:
+            loading_methods = [
+                self._load_via_yolov5_package,
+                self._load_via_local_directory,
+                self._load_via_github,
+                self._load_fallback_model
+            ]
+            if torch.cuda.is_available():
+                loading_methods.insert(0, self._load_tensorrt_engine)
         
         for method in loading_methods:
             try:
@@ -203,6 +349,16 @@ class ModelManager:
                 self.model = method()
                 if self.model is not None:
                     self._configure_model()
+                    self.fixed_batch = exported or method == self._load_tensorrt_engine
+                    if self.fixed_batch:
+                        pass  # Exported networks are already optimized
+                    elif not torch.cuda.is_available():
+                        self.runtime = self._load_cpu_runtime()
+                        if self.runtime is None and self._compile_network('cpu', torch.float32):
+                            logger.info("Model compiled for CPU inference")
+                    else:
+                        self._optimize_for_cuda()
+                    self._configure_precision()
                     logger.info("✓ Model loaded successfully via %s", method.__name__)
                     return self.model
                 else:
@@ -222,7 +378,25 @@ class ModelManager:
         """
         import os
         
-        if os.path.exists(self.model_path):
+        # Prefer a prebuilt TensorRT engine (GPU only) or user-provided ONNX
+        # model stored next to the weights over the PyTorch checkpoint. The
+        # CPU runtime exports to <weights>-cpu.onnx, which is not matched here.
+        extensions = ('.engine', '.onnx', '.pt') if torch.cuda.is_available() else ('.onnx', '.pt')
+        
+        def resolve(path: str) -> Optional[str]:
+            stem, ext = os.path.splitext(path)
+            if ext not in ('.pt', '.engine', '.onnx'):
+                return path if os.path.exists(path) else None
+            for candidate in (stem + e for e in extensions):
+                if os.path.exists(candidate):
+                    return candidate
+            return None
+        
+        found = resolve(self.model_path)
+        if found:
+            if found != self.model_path:
+                logger.info("Using exported model: %s", found)
+            self.model_path = found
             return True
         
         # Try alternative paths
@@ -236,17 +410,94 @@ class ModelManager:
         ]
         
         for path in alternative_paths:
-            if os.path.exists(path):
-                logger.info("Using alternative model path: %s", path)
-                self.model_path = path
+            found = resolve(path)
+            if found:
+                logger.info("Using alternative model path: %s", found)
+                self.model_path = found
                 return True
         
         return False
     
+    def _load_tensorrt_engine(self):
+        """
+        Load a TensorRT engine stored next to the weights, exporting it on first run.
+        
+        The one-time FP16 export takes about 30 s on a desktop GPU and several
+        minutes on a Jetson; the engine is then cached as ``<weights>.engine``.
+        The export is skipped when TensorRT is not installed, and a failed
+        export leaves a ``<weights>.engine-failed`` marker so later starts do
+        not retry it; delete the marker to try again.
+        """
+        import importlib.util
+        import os
+        import subprocess
+        import sys
+        import yolov5
+        
+        engine_path = os.path.splitext(self.model_path)[0] + '.engine'
+        if not os.path.exists(engine_path):
+            failed_marker = engine_path + '-failed'
+            if importlib.util.find_spec('tensorrt') is None:
+                logger.info("TensorRT not installed, skipping engine export")
+                return None
+            if os.path.exists(failed_marker):
+                logger.info("Skipping TensorRT export, previous attempt failed (see %s)", failed_marker)
+                return None
+            
+            logger.info("Exporting TensorRT engine (one-time, may take minutes): %s", engine_path)
+            try:
+                subprocess.run([sys.executable, '-m', 'yolov5.export',
+                                '--weights', self.model_path,
+                                '--include', 'engine',
+                                '--half',
+                                '--device', '0',
+                                '--imgsz', '640'],
+                               check=True, timeout=1800)
+            except (subprocess.SubprocessError, OSError) as e:
+                try:
+                    with open(failed_marker, 'w') as marker:
+                        marker.write(f"{e}\n")
+                except OSError:
+                    pass
+                raise
+        
+        return yolov5.load(engine_path, device='cuda:0')
+    
+    def _load_via_onnxruntime(self) -> ExportedModelRunner:
+        """
+        Load an exported ``.onnx`` model with ONNX Runtime, on CUDA when available.
+        
+        Returns:
+            ExportedModelRunner used as both the model and the inference runtime
+        """
+        import ast
+        import onnxruntime as ort
+        
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = [p for p in ('CUDAExecutionProvider', 'CPUExecutionProvider')
+                     if p in ort.get_available_providers()]
+        session = ort.InferenceSession(self.model_path, sess_options=opts, providers=providers)
+        model_input = session.get_inputs()[0]
+        input_name = model_input.name
+        img_size = model_input.shape[2] if isinstance(model_input.shape[2], int) else 640
+        
+        runner = ExportedModelRunner(lambda blob: session.run(None, {input_name: blob})[0],
+                                     self.confidence, img_size=img_size)
+        # YOLOv5 exports store the class names in the model metadata
+        names = session.get_modelmeta().custom_metadata_map.get('names')
+        if names:
+            runner.names = ast.literal_eval(names)
+        
+        self.runtime = runner
+        logger.info("Using ONNX Runtime (%s): %s", providers[0], self.model_path)
+        return runner
+    
     def _load_via_yolov5_package(self):
         """Load model using the yolov5 package."""
         import yolov5
-        return yolov5.load(self.model_path, device='cpu')
+        device = 'cuda:0' if torch.cuda.is_available() else 'cpu'
+        return yolov5.load(self.model_path, device=device)
     
     def _load_via_local_directory(self):
         """Load model from local YOLOv5 directory."""
@@ -314,6 +565,152 @@ class ModelManager:
         if hasattr(self.model, 'yaml'):
             logger.debug("Model config: %s", self.model.yaml)
     
+    def _optimize_for_cuda(self):
+        """Convert the network to FP16 and compile it with torch.compile on CUDA."""
+        try:
+            self.model.model.half()
+            self.half = True
+        except Exception as e:
+            logger.warning("FP16 conversion failed, using FP32 model: %s", e)
+        if self._compile_network('cuda', torch.float16 if self.half else torch.float32):
+            logger.info("Model compiled for CUDA %s inference", "FP16" if self.half else "FP32")
+    
+    def _compile_network(self, device: str, dtype: torch.dtype) -> bool:
+        """
+        Compile the network with torch.compile and warm it up.
+        
+        torch.compile is lazy, so failures surface on the first forward pass;
+        the warm-up triggers them here and restores the eager network instead
+        of leaving a broken compiled module behind.
+        
+        Args:
+            device: Device the network runs on ('cuda' or 'cpu')
+            dtype: Input dtype matching the network weights
+            
+        Returns:
+            bool: True if the compiled network is in use
+        """
+        if not hasattr(torch, 'compile') or IS_WINDOWS:
+            return False
+        
+        eager = self.model.model
+        try:
+            mode = "reduce-overhead" if device == 'cuda' else None
+            self.model.model = torch.compile(eager, mode=mode)
+            
+            # Warm up at the shapes real frames are inferred at, so the first
+            # frames don't pay the compilation/autotuning cost
+            height, width = self._inference_shape()
+            with torch.inference_mode():
+                for batch in sorted({1, self.batch_size}):
+                    dummy = torch.zeros(batch, 3, height, width, device=device, dtype=dtype)
+                    for _ in range(3):
+                        self.model.model(dummy)
+            return True
+        except Exception as e:
+            logger.warning("torch.compile failed on %s, using eager model: %s", device, e)
+            self.model.model = eager
+            return False
+    
+    def _inference_shape(self, size: int = 640) -> Tuple[int, int]:
+        """
+        Return the (height, width) AutoShape letterboxes camera frames to.
+        
+        The longer side is scaled to size and both sides are padded up to a
+        multiple of the model stride, e.g. 384x640 for 16:9 frames.
+        
+        Args:
+            size: Inference size of the longer side
+            
+        Returns:
+            Tuple[int, int]: Network input height and width
+        """
+        width, height = self.frame_size
+        stride = int(torch.as_tensor(getattr(self.model, 'stride', 32)).max())
+        gain = size / max(width, height)
+        return tuple(-(-int(side * gain) // stride) * stride for side in (height, width))
+    
+    def _configure_precision(self):
+        """Pick the autocast mode used by predict() for the PyTorch path."""
+        if torch.cuda.is_available():
+            self._amp_device, self._amp_dtype = 'cuda', torch.float16
+            self._amp_enabled = True
+        else:
+            # bfloat16 only pays off on CPUs with native support (AVX512-BF16/AMX);
+            # elsewhere, e.g. on the Raspberry Pi, it is emulated and slower
+            bf16 = getattr(torch.ops.mkldnn, '_is_mkldnn_bf16_supported', None)
+            self._amp_device, self._amp_dtype = 'cpu', torch.bfloat16
+            self._amp_enabled = bool(bf16 and bf16())
+        if self._amp_enabled:
+            logger.info("Autocast enabled: %s %s", self._amp_device, self._amp_dtype)
+    
+    def _export_onnx(self, onnx_path: str):
+        """Export the loaded YOLOv5 network to ONNX at a fixed 640x640 input."""
+        net = self.model.model.model  # AutoShape -> DetectMultiBackend -> DetectionModel
+        detect = net.model[-1]
+        detect.export = True  # Detect head returns only the concatenated predictions
+        try:
+            torch.onnx.export(net, torch.zeros(1, 3, 640, 640), onnx_path,
+                              opset_version=17,
+                              input_names=['images'],
+                              output_names=['output0'])
+        finally:
+            detect.export = False
+
+    def _load_cpu_runtime(self) -> Optional[ExportedModelRunner]:
+        """
+        Load an OpenVINO or ONNX Runtime backend for CPU-only hosts.
+
+        Looks next to the PyTorch weights for, in order of preference, an INT8
+        OpenVINO IR ``<weights>-int8.xml``, an FP32 IR
+        ``<weights>_openvino_model/<weights>.xml`` and ``<weights>-cpu.onnx``,
+        exporting the ONNX file on first run. The export is deliberately not
+        named ``<weights>.onnx``: _find_model_file() would load that directly
+        on the next start and skip the IRs and the CUDA paths. The INT8 IR runs the conv layers
+        on VNNI int8 instructions on recent x86 CPUs; it is produced offline
+        with NNCF post-training quantization over a set of apiary frames.
+
+        Returns:
+            ExportedModelRunner, or None to keep PyTorch inference
+        """
+        import os
+
+        stem = os.path.splitext(self.model_path)[0]
+        int8_xml = f"{stem}-int8.xml"
+        openvino_xml = os.path.join(f"{stem}_openvino_model", f"{os.path.basename(stem)}.xml")
+        onnx_path = f"{stem}-cpu.onnx"
+        openvino_paths = [p for p in (int8_xml, openvino_xml) if os.path.exists(p)]
+
+        try:
+            if not openvino_paths and not os.path.exists(onnx_path):
+                logger.info("Exporting model to ONNX: %s", onnx_path)
+                self._export_onnx(onnx_path)
+
+            try:
+                import openvino as ov
+                path = openvino_paths[0] if openvino_paths else onnx_path
+                compiled = ov.Core().compile_model(path, 'CPU', {'PERFORMANCE_HINT': 'LATENCY'})
+                output = compiled.output(0)
+                infer = lambda blob: compiled(blob)[output]
+                logger.info("Using OpenVINO CPU runtime: %s", path)
+            except ImportError:
+                import onnxruntime as ort
+                if not os.path.exists(onnx_path):  # Only OpenVINO IRs were found
+                    self._export_onnx(onnx_path)
+                opts = ort.SessionOptions()
+                opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                opts.intra_op_num_threads = os.cpu_count()
+                session = ort.InferenceSession(onnx_path, sess_options=opts,
+                                               providers=['CPUExecutionProvider'])
+                input_name = session.get_inputs()[0].name
+                infer = lambda blob: session.run(None, {input_name: blob})[0]
+                logger.info("Using ONNX Runtime CPU backend: %s", onnx_path)
+        except Exception as e:
+            logger.warning("Exported CPU runtime unavailable, using PyTorch: %s", e)
+            return None
+
+        return ExportedModelRunner(infer, self.confidence)
+
     def predict(self, frame: np.ndarray):
         """
         Run inference on a frame.
@@ -327,9 +724,144 @@ class ModelManager:
         if not self.model:
             raise RuntimeError("Model not loaded")
         
-        # Convert BGR to RGB for YOLOv5
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        return self.model(rgb_frame)
+        if self.runtime is not None:
+            return self.runtime(frame)
+        
+        # BGR to RGB for YOLOv5 as a strided view rather than a converted copy
+        rgb_frame = frame[..., ::-1]
+        with torch.inference_mode(), torch.autocast(self._amp_device, dtype=self._amp_dtype,
+                                                    enabled=self._amp_enabled):
+            return self.model(rgb_frame)
+
+
+    def predict_batch(self, frames: List[np.ndarray]) -> List[Any]:
+        """
+        Run inference on several frames in one forward pass.
+        
+        Args:
+            frames: Input image frames (BGR)
+            
+        Returns:
+            One result per frame, each exposing ``pred[0]`` like predict()
+        """
+        if not self.model:
+            raise RuntimeError("Model not loaded")
+        
+        if self.runtime is not None or self.fixed_batch:
+            # Exported networks have a fixed batch size of 1
+            return [self.predict(frame) for frame in frames]
+        
+        rgb_frames = [frame[..., ::-1] for frame in frames]
+        with torch.inference_mode(), torch.autocast(self._amp_device, dtype=self._amp_dtype,
+                                                    enabled=self._amp_enabled):
+            results = self.model(rgb_frames)
+        return [SimpleNamespace(pred=[pred]) for pred in results.pred]
+
+
+@functools.lru_cache(maxsize=512)
+def _label_sprite(label: str, color: Tuple[int, int, int]) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Render a detection label once and return it as a blittable sprite.
+    
+    Labels repeat constantly (two class names and a two-decimal confidence),
+    so rasterizing them with cv2.putText on every frame is wasted work.
+    
+    Args:
+        label: Text to render
+        color: BGR text colour
+        
+    Returns:
+        Tuple of (BGR sprite, uint8 glyph mask, baseline row within the sprite)
+    """
+    (w, h), baseline = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)
+    canvas = np.zeros((h + baseline + 2, w + 2), dtype=np.uint8)
+    cv2.putText(canvas, label, (1, h + 1), cv2.FONT_HERSHEY_SIMPLEX, 0.5, 255, 2)
+    mask = (canvas > 127).astype(np.uint8)
+    sprite = np.empty(canvas.shape + (3,), dtype=np.uint8)
+    sprite[:] = color
+    return sprite, mask, h + 1
+
+
+def _draw_label(image: np.ndarray, label: str, origin: Tuple[int, int],
+                color: Tuple[int, int, int]):
+    """Blit a cached label with its baseline at origin, clipped to the image."""
+    sprite, mask, baseline = _label_sprite(label, color)
+    x, y = origin[0] - 1, origin[1] - baseline
+    top, left = max(y, 0), max(x, 0)
+    bottom = min(y + mask.shape[0], image.shape[0])
+    right = min(x + mask.shape[1], image.shape[1])
+    if top >= bottom or left >= right:
+        return
+    src = (slice(top - y, bottom - y), slice(left - x, right - x))
+    cv2.copyTo(sprite[src], mask[src], image[top:bottom, left:right])
+
+
+class DetectionFrameStore(OrderedDict):
+    """
+    Most recent detection frames, oldest evicted first once maxsize is reached.
+    
+    Storing a key moves it to the newest end; lookups leave the order alone.
+    """
+    
+    def __init__(self, maxsize: int = 20):
+        """
+        Initialize an empty store.
+        
+        Args:
+            maxsize: Number of frames kept before the oldest is dropped
+        """
+        super().__init__()
+        self.maxsize = maxsize
+    
+    def __setitem__(self, key, value):
+        """Store a frame and evict the oldest ones beyond maxsize."""
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+class FrameRateMeter:
+    """
+    Frame rate over the last frames, from a ring buffer of monotonic timestamps.
+    
+    The detection loop only stores a timestamp per frame; the rate is
+    computed when a reader asks for it.
+    """
+    
+    __slots__ = ('_times', '_count')
+    
+    SIZE = 64  # power of two, so the ring index is a mask
+    
+    def __init__(self):
+        """Initialize an empty meter."""
+        self._times = np.zeros(self.SIZE, dtype=np.int64)
+        self._count = 0
+    
+    def tick(self):
+        """Record that a frame was processed now."""
+        self._times[self._count & (self.SIZE - 1)] = time.monotonic_ns()
+        self._count += 1
+    
+    def fps(self, stale_after: float = 2.0) -> float:
+        """
+        Return frames per second over the buffered frames.
+        
+        Args:
+            stale_after: Seconds without a frame after which 0.0 is reported
+            
+        Returns:
+            float: Frame rate, or 0.0 if too few or stale samples exist
+        """
+        count = self._count
+        n = min(count, self.SIZE)
+        if n < 2:
+            return 0.0
+        newest = int(self._times[(count - 1) & (self.SIZE - 1)])
+        oldest = int(self._times[(count - n) & (self.SIZE - 1)])
+        if time.monotonic_ns() - newest > stale_after * 1e9 or newest <= oldest:
+            return 0.0
+        return (n - 1) * 1e9 / (newest - oldest)
 
 
 class DetectionProcessor:
@@ -339,6 +871,12 @@ class DetectionProcessor:
     Handles detection counting, confidence tracking, and frame annotation.
     """
     
+    # Class id -> (label prefix, BGR colour)
+    _CLASS_META = {
+        0: ("Crabro", (0, 255, 0)),    # European hornet, green
+        1: ("Velutina", (0, 0, 255)),  # Asian hornet, red
+    }
+    
     def __init__(self):
         """Initialize detection processor."""
         self.stats = {
@@ -350,18 +888,28 @@ class DetectionProcessor:
             "last_detection_time": None,
             "start_time": datetime.datetime.now(),
             "detection_log": deque(maxlen=20),
-            "detection_frames": {},
+            "detection_frames": DetectionFrameStore(maxsize=20),
             "confidence_avg": 0,
         }
         
-        self.hourly_detections = {hour: {"velutina": 0, "crabro": 0} for hour in range(24)}
+        # Processing rate, read lazily by the web dashboard
+        self.frame_rate = FrameRateMeter()
+        
+        # Key of the most recently stored detection frame (used for alert links)
+        self.last_detection_key: Optional[str] = None
+        
+        # One record per hour, already in the shape /api/stats serves
+        self.hourly_detections = [{"hour": f"{hour:02d}:00", "velutina": 0, "crabro": 0, "total": 0}
+                                  for hour in range(24)]
         self.current_hour = datetime.datetime.now().hour
         
     def process_detections(self, 
                           results, 
                           frame: np.ndarray,
                           frame_id: int,
-                          confidence_threshold: float = 0.8) -> Tuple[int, int, np.ndarray]:
+                          confidence_threshold: float = 0.8,
+                          now: Optional[datetime.datetime] = None,
+                          scale: float = 1.0) -> Tuple[int, int, np.ndarray]:
         """
         Process detection results and update statistics.
         
@@ -370,56 +918,59 @@ class DetectionProcessor:
             frame: Original image frame
             frame_id: Current frame ID
             confidence_threshold: Minimum confidence for valid detections
+            now: Detection timestamp; read from the clock only when a
+                detection is actually recorded if omitted
+            scale: Factor from the inference frame's box coordinates to
+                frame, when inference ran on a downscaled copy
             
         Returns:
-            Tuple of (asian_hornets, european_hornets, annotated_frame)
+            Tuple of (asian_hornets, european_hornets, annotated_frame).
+            The input frame itself is returned when nothing was drawn.
         """
-        velutina_count = 0  # Asian hornets
-        crabro_count = 0    # European hornets
-        annotated_frame = frame.copy()
+        predictions = results.pred[0]
+        if len(predictions) == 0:
+            return 0, 0, frame
         
-        # Parse predictions
-        if len(results.pred[0]) > 0:
-            predictions = results.pred[0]
-            
-            total_confidence = 0
-            confidence_count = 0
-            
-            for pred in predictions:
-                x1, y1, x2, y2, conf, cls = pred
-                cls = int(cls)
-                confidence = float(conf)
-                
-                if confidence < confidence_threshold:
-                    continue
-                
-                total_confidence += confidence
-                confidence_count += 1
-                
-                # Count detections by class
-                if cls == 1:  # Velutina (Asian hornet)
-                    velutina_count += 1
-                    color = (0, 0, 255)  # Red for Asian hornets
-                    label = f"Velutina {confidence:.2f}"
-                elif cls == 0:  # Crabro (European hornet)
-                    crabro_count += 1
-                    color = (0, 255, 0)  # Green for European hornets  
-                    label = f"Crabro {confidence:.2f}"
-                else:
-                    continue  # Unknown class
-                
-                # Draw bounding box
-                x1, y1, x2, y2 = map(int, [x1, y1, x2, y2])
-                cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), color, 2)
-                cv2.putText(annotated_frame, label, (x1, y1-10), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+        # Filter and count on one [N, 6] array instead of per-element tensor access
+        if hasattr(predictions, 'detach'):
+            predictions = predictions.detach().cpu().numpy()
+        predictions = np.asarray(predictions)
+        predictions = predictions[predictions[:, 4] >= confidence_threshold]
+        if scale != 1.0:
+            predictions[:, :4] *= scale
+        
+        classes = predictions[:, 5]
+        velutina_count = int((classes == 1).sum())  # Asian hornets
+        crabro_count = int((classes == 0).sum())    # European hornets
+        total_confidence = float(predictions[:, 4].sum())
+        confidence_count = predictions.shape[0]
+        
+        # Copied lazily once the first box is drawn
+        annotated_frame = None
+        
+        class_meta = self._CLASS_META
+        for x1, y1, x2, y2, confidence, cls in predictions.tolist():
+            meta = class_meta.get(int(cls))
+            if meta is None:
+                continue  # Unknown class
+            name, color = meta
+            label = "%s %.2f" % (name, confidence)
             
-            # Update statistics if detections found
-            if velutina_count > 0 or crabro_count > 0:
-                self._update_detection_stats(velutina_count, crabro_count, 
-                                           frame_id, total_confidence, confidence_count,
-                                           annotated_frame)
+            # Draw bounding box
+            if annotated_frame is None:
+                annotated_frame = frame.copy()
+            x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+            cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), color, 2)
+            _draw_label(annotated_frame, label, (x1, y1-10), color)
+        
+        # Update statistics if detections found
+        if velutina_count > 0 or crabro_count > 0:
+            self._update_detection_stats(velutina_count, crabro_count, 
+                                       frame_id, total_confidence, confidence_count,
+                                       annotated_frame, now)
         
+        if annotated_frame is None:
+            annotated_frame = frame
         return velutina_count, crabro_count, annotated_frame
     
     def _update_detection_stats(self, 
@@ -428,9 +979,10 @@ class DetectionProcessor:
                                frame_id: int,
                                total_confidence: float,
                                confidence_count: int,
-                               frame: np.ndarray):
+                               frame: np.ndarray,
+                               now: Optional[datetime.datetime] = None):
         """Update detection statistics and logs."""
-        current_time = datetime.datetime.now()
+        current_time = now or datetime.datetime.now()
         
         # Update global stats
         self.stats["total_velutina"] += velutina
@@ -444,8 +996,10 @@ class DetectionProcessor:
         if current_hour != self.current_hour:
             self.current_hour = current_hour
             
-        self.hourly_detections[current_hour]["velutina"] += velutina
-        self.hourly_detections[current_hour]["crabro"] += crabro
+        bucket = self.hourly_detections[current_hour]
+        bucket["velutina"] += velutina
+        bucket["crabro"] += crabro
+        bucket["total"] += velutina + crabro
         
         # Update average confidence
         if confidence_count > 0:
@@ -455,10 +1009,12 @@ class DetectionProcessor:
         # Create detection log entry
         species = "velutina" if velutina > 0 else "crabro"
         confidence_str = f"{self.stats['confidence_avg']:.1f}"
-        detection_key = f"{frame_id}_{current_time.strftime('%H%M%S')}"
+        clock = current_time.strftime("%H:%M:%S")
+        detection_key = f"{frame_id}_{clock.replace(':', '')}"
+        self.last_detection_key = detection_key
         
         log_entry = {
-            "timestamp": current_time.strftime("%H:%M:%S"),
+            "timestamp": clock,
             "species": species,
             "confidence": confidence_str,
             "frame_id": detection_key,
@@ -468,19 +1024,50 @@ class DetectionProcessor:
         
         self.stats["detection_log"].append(log_entry)
         
-        # Store detection frame
-        self.stats["detection_frames"][detection_key] = frame.copy()
-        
-        # Limit stored frames to prevent memory issues
-        if len(self.stats["detection_frames"]) > 20:
-            oldest_key = min(self.stats["detection_frames"].keys())
-            del self.stats["detection_frames"][oldest_key]
+        # Store detection frame as JPEG bytes; encoding already detaches it
+        # from the caller's buffer, so no defensive copy is needed. The store
+        # evicts the oldest frame itself once it is full.
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        if ok:
+            self.stats["detection_frames"][detection_key] = buffer.tobytes()
         
         logger.info("Detection #%d: %d Velutina, %d Crabro (confidence: %.1f%%)",
                    self.stats["total_detections"], velutina, crabro, 
                    self.stats["confidence_avg"])
 
 
+def downscale_frame(frame: np.ndarray, max_side: int = 640) -> np.ndarray:
+    """
+    Shrink a frame so its longer side is at most max_side pixels.
+    
+    YOLOv5 letterboxes its input to 640 px anyway, so the detection loop
+    hands inference and the static-frame gate this copy and keeps the
+    full-size frame for annotation and saved images.
+    
+    Args:
+        frame: Input image frame
+        max_side: Maximum width or height of the returned frame
+        
+    Returns:
+        The resized frame, or the input itself if it is already small enough
+    """
+    h, w = frame.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1:
+        return frame
+    return cv2.resize(frame, (round(w * scale), round(h * scale)),
+                      interpolation=cv2.INTER_LINEAR)
+
+
+# Named resolution presets accepted by parse_resolution()
+_RESOLUTION_PRESETS = {
+    "4k": (3840, 2160),
+    "1080p": (1920, 1080),
+    "720p": (1280, 720),
+}
+
+
+@functools.lru_cache(maxsize=16)
 def parse_resolution(resolution_str: str) -> Tuple[int, int]:
     """
     Parse resolution string into width and height.
@@ -491,18 +1078,13 @@ def parse_resolution(resolution_str: str) -> Tuple[int, int]:
     Returns:
         Tuple of (width, height)
     """
-    resolution_map = {
-        "4k": (3840, 2160),
-        "1080p": (1920, 1080), 
-        "720p": (1280, 720)
-    }
+    preset = _RESOLUTION_PRESETS.get(resolution_str)
+    if preset is not None:
+        return preset
     
-    if resolution_str in resolution_map:
-        return resolution_map[resolution_str]
+    parts = resolution_str.split('x') if isinstance(resolution_str, str) else ()
+    if len(parts) == 2 and parts[0].isdigit() and parts[1].isdigit():
+        return int(parts[0]), int(parts[1])
     
-    try:
-        width, height = map(int, resolution_str.split('x'))
-        return width, height
-    except:
-        logger.warning("Invalid resolution format '%s', using default 1920x1080", resolution_str)
-        return 1920, 1080
\ No newline at end of file
+    logger.warning("Invalid resolution format '%s', using default 1920x1080", resolution_str)
+    return 1920, 1080
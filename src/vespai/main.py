@@ -10,6 +10,7 @@ Version: 1.0
 """
 
 import logging
+import queue
 import sys
 import time
 import threading
@@ -18,9 +19,9 @@ from typing import Optional
 
 # Core modules
 from .core.config import create_config_from_args
-from .core.detection import CameraManager, ModelManager, DetectionProcessor
+from .core.detection import CameraManager, ModelManager, DetectionProcessor, downscale_frame
 from .sms.lox24 import create_sms_manager_from_env
-from .web.routes import register_routes
+from .web.routes import register_routes, stream_jpeg_quality
 
 # External dependencies
 try:
@@ -59,9 +60,25 @@ class VespAIApplication:
         self.web_thread = None
         self.running = False
         
-        # Global state for web interface
-        self.web_frame = None
+        # Global state for web interface: latest preview frame, JPEG-encoded
+        self.web_frame_jpeg = None
         self.web_lock = threading.Lock()
+        # Signals stream clients when web_frame_seq moves to a new frame
+        self.web_cond = threading.Condition(self.web_lock)
+        self.web_frame_seq = 0
+        
+        # Capture thread state: the camera is read ahead while inference runs
+        self.frame_queue = queue.Queue(maxsize=2)
+        self.camera_lock = threading.Lock()
+        self.capture_thread = None
+        
+        # Disjoint CPU sets for capture and inference, set by _configure_threads()
+        self._capture_cpus = None
+        self._inference_cpus = None
+        
+        # Static-frame gate: thumbnail of the last inferred frame and its annotation
+        self._ref_thumb = None
+        self._last_annotated = None
         
         # Set up signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -76,6 +93,8 @@ class VespAIApplication:
         """
         logger.info("Initializing VespAI application...")
         
+        self._configure_threads()
+        
         # Load configuration
         self.config = create_config_from_args(args)
         self.config.print_summary()
@@ -91,6 +110,43 @@ class VespAIApplication:
         
         logger.info("VespAI application initialized successfully")
     
+    def _configure_threads(self):
+        """
+        Keep OpenCV and PyTorch thread pools from competing for cores.
+        
+        OpenCV work here is small (640 px resize/encode) and runs inline, so
+        it gets one thread; PyTorch keeps every core but one for inference.
+        On Linux the capture thread and the detection loop are additionally
+        pinned to disjoint CPU sets once the loop starts.
+        """
+        import os
+        
+        cv2.setNumThreads(1)
+        torch.set_num_threads(max(1, (os.cpu_count() or 2) - 1))
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # Only allowed before the first parallel operation
+            logger.debug("Torch inter-op thread count already fixed")
+        
+        self._capture_cpus = self._inference_cpus = None
+        if hasattr(os, 'sched_getaffinity'):
+            cpus = sorted(os.sched_getaffinity(0))
+            if len(cpus) >= 2:
+                self._capture_cpus, self._inference_cpus = {cpus[0]}, set(cpus[1:])
+    
+    @staticmethod
+    def _pin_current_thread(cpus):
+        """Restrict the calling thread to the given CPUs (Linux only)."""
+        import os
+        
+        if not cpus:
+            return
+        try:
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            logger.debug("Could not set CPU affinity %s: %s", sorted(cpus), e)
+    
     def _initialize_camera(self):
         """Initialize camera manager."""
         logger.info("Initializing camera...")
@@ -106,7 +162,9 @@ class VespAIApplication:
         model_path = self.config.get('model_path')
         confidence = self.config.get('confidence_threshold')
         
-        self.model_manager = ModelManager(model_path, confidence)
+        self.model_manager = ModelManager(model_path, confidence,
+                                          frame_size=self.config.get_camera_resolution(),
+                                          batch_size=int(self.config.get('batch_size', 1)))
         self.model_manager.load_model()
     
     def _initialize_detection_processor(self):
@@ -185,95 +243,117 @@ class VespAIApplication:
         logger.info("Press Ctrl+C to stop")
         
         self.running = True
+        batch_size = max(1, int(self.config.get('batch_size', 1)))
+        motion_threshold = float(self.config.get('motion_threshold', 0) or 0)
+        if self.frame_queue.maxsize < batch_size:
+            self.frame_queue = queue.Queue(maxsize=batch_size)
+        self._pin_current_thread(self._inference_cpus)
+        self._start_capture_thread()
         frame_count = 0
-        fps_start_time = time.time()
-        fps_counter = 0
         
         # Add watchdog timer for system health
-        last_frame_time = time.time()
-        last_stats_update = time.time()
+        last_frame_time = last_stats_update = time.time()
         
         try:
             while self.running:
-                loop_start = time.time()
+                # One clock read per iteration drives the watchdog, stats and pacing
+                current_time = loop_start = time.time()
                 
                 # Watchdog: Detect if system is hanging
-                current_time = time.time()
                 if current_time - last_frame_time > 30:  # No frame for 30 seconds
                     logger.warning("System appears to be hanging - attempting recovery...")
                     self._attempt_recovery()
                     last_frame_time = current_time
                 
-                # Read frame from camera with timeout
-                try:
-                    success, frame = self.camera_manager.read_frame()
-                    if not success or frame is None:
-                        logger.warning("Failed to read frame, retrying...")
-                        time.sleep(0.1)
-                        continue
-                        
-                    last_frame_time = current_time
-                    
-                except Exception as e:
-                    logger.error(f"Camera error: {e}")
-                    time.sleep(1)
+                # Take up to batch_size frames grabbed by the capture thread
+                frames = self._next_batch(batch_size)
+                if not frames:
                     continue
+                last_frame_time = current_time
                 
-                frame_count += 1
-                fps_counter += 1
+                # Inference only needs the network-sized copy; the full frame is
+                # kept for annotation, saved images and SMS detection frames
+                small_frames = [downscale_frame(frame) for frame in frames]
                 
-                # Update frame count in stats (for web dashboard)
-                self.detection_processor.stats['frame_id'] = frame_count
-                
-                # Debug logging every 30 frames
-                if frame_count % 30 == 0:
-                    logger.debug(f"Frame count updated: {frame_count}")
-                
-                # Update FPS calculation
-                if time.time() - fps_start_time >= 1.0:
-                    self.detection_processor.stats['fps'] = fps_counter
-                    fps_counter = 0
-                    fps_start_time = time.time()
-                
-                # Run detection with error handling
+                # Run detection on the changed frames in one forward pass
+                static = [self._is_static(small, motion_threshold) for small in small_frames]
+                moving = [small for small, skip in zip(small_frames, static) if not skip]
                 try:
-                    results = self.model_manager.predict(frame)
-                    velutina_count, crabro_count, annotated_frame = self.detection_processor.process_detections(
-                        results, frame, frame_count, self.config.get('confidence_threshold')
-                    )
+                    moving_results = self.model_manager.predict_batch(moving) if moving else []
                 except Exception as e:
                     logger.error(f"Detection error: {e}")
-                    # Use original frame if detection fails
-                    velutina_count = crabro_count = 0
-                    annotated_frame = frame.copy()
-                
-                # Handle detections
-                if velutina_count > 0 or crabro_count > 0:
-                    self._handle_detection(velutina_count, crabro_count, frame_count, annotated_frame)
+                    moving_results = [None] * len(moving)
+                moving_results = iter(moving_results)
                 
-                # Update web frame (optimized for Raspberry Pi) with error handling
-                if self.config.get('enable_web'):
-                    try:
-                        # Reduce resolution for better Raspberry Pi performance
-                        display_frame = cv2.resize(annotated_frame, (640, 360))
-                        with self.web_lock:
-                            self.web_frame = display_frame.copy()
-                    except Exception as e:
-                        logger.error(f"Web frame update error: {e}")
+                for frame, small, skip in zip(frames, small_frames, static):
+                    frame_count += 1
+                    self.detection_processor.frame_rate.tick()
+                    
+                    # Update frame count in stats (for web dashboard)
+                    self.detection_processor.stats['frame_id'] = frame_count
+                    
+                    # Debug logging every 30 frames
+                    if frame_count % 30 == 0:
+                        logger.debug(f"Frame count updated: {frame_count}")
+                    
+                    # Process detections with error handling
+                    if skip:
+                        # Nothing changed: keep showing the last annotated frame
+                        velutina_count = crabro_count = 0
+                        annotated_frame = (self._last_annotated
+                                           if self._last_annotated is not None else frame)
+                    else:
+                        results = next(moving_results)
+                        try:
+                            if results is None:
+                                raise RuntimeError("no results for frame")
+                            velutina_count, crabro_count, annotated_frame = self.detection_processor.process_detections(
+                                results, frame, frame_count, self.config.get('confidence_threshold'),
+                                scale=frame.shape[1] / small.shape[1]
+                            )
+                        except Exception as e:
+                            logger.error(f"Detection error: {e}")
+                            # Use original frame if detection fails
+                            velutina_count = crabro_count = 0
+                            annotated_frame = frame.copy()
+                        self._last_annotated = annotated_frame
+                    
+                    # Handle detections
+                    if velutina_count > 0 or crabro_count > 0:
+                        self._handle_detection(velutina_count, crabro_count, frame_count, annotated_frame)
+                    
+                    # Update web frame (optimized for Raspberry Pi) with error handling
+                    if self.config.get('enable_web'):
+                        try:
+                            display_frame = annotated_frame
+                            if display_frame.shape[:2] != (360, 640):
+                                display_frame = cv2.resize(display_frame, (640, 360))
+                            # Encode once here so stream clients only copy bytes;
+                            # quality drops while the CPU is busy
+                            ok, buffer = cv2.imencode('.jpg', display_frame,
+                                                      [cv2.IMWRITE_JPEG_QUALITY, stream_jpeg_quality()])
+                            if ok:
+                                jpeg = buffer.tobytes()
+                                with self.web_cond:
+                                    self.web_frame_jpeg = jpeg
+                                    self.web_frame_seq += 1
+                                    self.web_cond.notify_all()
+                        except Exception as e:
+                            logger.error(f"Web frame update error: {e}")
+                    
+                    # Print detection info if enabled
+                    if self.config.get('print_detections') and (velutina_count > 0 or crabro_count > 0):
+                        confidence = self.detection_processor.stats.get('confidence_avg', 0)
+                        print(f"Frame {frame_count}: {velutina_count} Velutina, {crabro_count} Crabro "
+                              f"(confidence: {confidence:.1f}%)")
                 
                 # Force stats update every 10 seconds to keep web interface alive
                 if current_time - last_stats_update > 10:
                     self.detection_processor.stats['last_update'] = current_time
                     last_stats_update = current_time
                 
-                # Print detection info if enabled
-                if self.config.get('print_detections') and (velutina_count > 0 or crabro_count > 0):
-                    confidence = self.detection_processor.stats.get('confidence_avg', 0)
-                    print(f"Frame {frame_count}: {velutina_count} Velutina, {crabro_count} Crabro "
-                          f"(confidence: {confidence:.1f}%)")
-                
-                # Frame rate control (optimized for Raspberry Pi)
-                frame_delay = self.config.get('frame_delay', 0.3)  # Slower for RPi performance
+                # Frame rate control (optimized for Raspberry Pi), per frame in the batch
+                frame_delay = self.config.get('frame_delay', 0.3) * len(frames)
                 elapsed = time.time() - loop_start
                 if elapsed < frame_delay:
                     time.sleep(frame_delay - elapsed)
@@ -292,6 +372,120 @@ class VespAIApplication:
         logger.info("VespAI detection system stopped")
         return True
     
+    def _start_capture_thread(self):
+        """Start reading camera frames ahead of the detection loop."""
+        self.capture_thread = threading.Thread(target=self._capture_loop,
+                                               name="camera-capture", daemon=True)
+        self.capture_thread.start()
+    
+    def _capture_loop(self):
+        """
+        Read frames while the detection loop runs inference.
+        
+        Overlapping camera I/O with inference turns T_capture + T_inference
+        per frame into max(T_capture, T_inference). For a live camera only the
+        newest frames are kept: a stale frame is dropped before a new one is
+        queued. A video file is read no faster than it is processed, so every
+        frame of it still goes through detection.
+        """
+        self._pin_current_thread(self._capture_cpus)
+        drop_stale = not self.config.get('video_file')
+        while self.running:
+            try:
+                with self.camera_lock:
+                    success, frame = self.camera_manager.read_frame()
+            except Exception as e:
+                logger.error(f"Camera error: {e}")
+                time.sleep(1)
+                continue
+            
+            if not success or frame is None:
+                logger.warning("Failed to read frame, retrying...")
+                time.sleep(0.1)
+                continue
+            
+            if not drop_stale:
+                # Video file: wait for the detection loop instead of skipping frames
+                while self.running:
+                    try:
+                        self.frame_queue.put(frame, timeout=0.5)
+                        break
+                    except queue.Full:
+                        pass
+                continue
+            
+            if self.frame_queue.full():
+                try:
+                    self.frame_queue.get_nowait()
+                except queue.Empty:
+                    pass
+            self.frame_queue.put(frame)
+    
+    # Static-frame gate thumbnail size and the number of changed thumbnail
+    # pixels that counts as motion; a 60x60 px hornet in a 640x360 frame
+    # covers about 225 pixels of the thumbnail
+    STATIC_GATE_SIZE = (160, 90)
+    STATIC_GATE_MIN_PIXELS = 20
+    
+    def _is_static(self, frame, threshold: float) -> bool:
+        """
+        Check whether a frame is visually unchanged since the last inferred frame.
+        
+        Counts the greyscale thumbnail pixels that changed by more than
+        threshold, which costs a fraction of a millisecond against tens of
+        milliseconds for inference. The reference thumbnail is only replaced
+        by frames that go on to inference, so slow changes still add up.
+        
+        Args:
+            frame: BGR frame from the capture queue
+            threshold: Per-pixel grey level difference that counts as a
+                change; 0 or less disables the gate
+            
+        Returns:
+            bool: True if inference can be skipped for this frame
+        """
+        if threshold <= 0:
+            return False
+        thumb = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), self.STATIC_GATE_SIZE,
+                           interpolation=cv2.INTER_AREA)
+        if self._ref_thumb is not None:
+            _, mask = cv2.threshold(cv2.absdiff(thumb, self._ref_thumb), threshold,
+                                    255, cv2.THRESH_BINARY)
+            if cv2.countNonZero(mask) < self.STATIC_GATE_MIN_PIXELS:
+                return True
+        self._ref_thumb = thumb
+        return False
+    
+    def _next_batch(self, batch_size: int, max_wait: float = 0.02) -> list:
+        """
+        Collect up to batch_size frames from the capture queue.
+        
+        Waits up to 1 s for the first frame, then at most max_wait seconds
+        for the rest, so a slow camera never stalls the batch.
+        
+        Args:
+            batch_size: Maximum number of frames to return
+            max_wait: Time to wait for frames after the first one
+            
+        Returns:
+            list: Frames in capture order (empty if none arrived)
+        """
+        try:
+            frames = [self.frame_queue.get(timeout=1.0)]
+        except queue.Empty:
+            return []
+        
+        deadline = time.monotonic() + max_wait
+        while len(frames) < batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                frames.append(self.frame_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return frames
+    
     def _handle_detection(self, velutina_count: int, crabro_count: int, frame_id: int, frame):
         """
         Handle a detection event with alerts and logging.
@@ -306,9 +500,10 @@ class VespAIApplication:
         if self.config.get('save_detections'):
             self._save_detection_image(frame, frame_id, velutina_count, crabro_count)
         
-        # Send SMS alert if configured
+        # Send SMS alert if configured, linking the frame the processor just stored
         if self.sms_manager:
-            self._send_sms_alert(velutina_count, crabro_count, frame_id)
+            self._send_sms_alert(velutina_count, crabro_count, frame_id,
+                                 getattr(self.detection_processor, 'last_detection_key', None))
     
     def _save_detection_image(self, frame, frame_id: int, velutina: int, crabro: int):
         """Save detection image to disk."""
@@ -326,15 +521,17 @@ class VespAIApplication:
         cv2.imwrite(filepath, frame)
         logger.info("Saved detection image: %s", filepath)
     
-    def _send_sms_alert(self, velutina_count: int, crabro_count: int, frame_id: int):
+    def _send_sms_alert(self, velutina_count: int, crabro_count: int, frame_id: int,
+                        detection_key: Optional[str] = None):
         """Send SMS alert for detection."""
         if not self.sms_manager:
             return
         
-        # Create frame URL for SMS
+        # Create frame URL for SMS; reuse the stored frame's key when known so
+        # the link cannot drift across a second boundary
         web_config = self.config.get_web_config()
-        current_time = time.strftime('%H%M%S')
-        detection_key = f"{frame_id}_{current_time}"
+        if not isinstance(detection_key, str):
+            detection_key = f"{frame_id}_{time.strftime('%H%M%S')}"
         frame_url = f"{web_config['public_url']}/frame/{detection_key}"
         
         # Determine hornet type and create alert
@@ -348,12 +545,10 @@ class VespAIApplication:
         confidence = self.detection_processor.stats.get('confidence_avg', 0)
         message = self.sms_manager.create_hornet_alert(hornet_type, count, confidence, frame_url)
         
-        # Send alert
-        success, status = self.sms_manager.send_alert(message)
-        if success:
-            logger.info("SMS alert sent: %s", status)
-        else:
-            logger.warning("SMS alert failed: %s", status)
+        # Queue alert; the HTTP request runs on the SMS sender thread
+        queued, status = self.sms_manager.queue_alert(message)
+        if not queued:
+            logger.warning("SMS alert not queued: %s", status)
     
     def _validate_initialization(self) -> bool:
         """Validate that all required components are initialized."""
@@ -395,13 +590,16 @@ class VespAIApplication:
             # Reset camera connection
             if self.camera_manager:
                 logger.info("Resetting camera connection...")
-                self.camera_manager.release()
-                time.sleep(2)
-                self.camera_manager.initialize_camera()
+                with self.camera_lock:
+                    self.camera_manager.release()
+                    time.sleep(2)
+                    self.camera_manager.initialize_camera()
             
             # Clear any stuck web frames
-            with self.web_lock:
-                self.web_frame = None
+            with self.web_cond:
+                self.web_frame_jpeg = None
+                self.web_frame_seq += 1
+                self.web_cond.notify_all()
                 
             logger.info("Recovery attempt completed")
             
@@ -412,9 +610,18 @@ class VespAIApplication:
         """Clean up resources on shutdown - simplified like web_preview.py."""
         logger.info("Cleaning up resources...")
         
+        # Stop the capture thread before the camera is released under it
+        self.running = False
+        if self.capture_thread is not None:
+            self.capture_thread.join(timeout=2)
+        
         # Release camera (web server will auto-die as daemon thread)
         if self.camera_manager:
             self.camera_manager.release()
+
+        # Close pooled SMS connections
+        if self.sms_manager:
+            self.sms_manager.close()
         
         # Final statistics
         if self.detection_processor:
@@ -1,5 +1,5 @@
 """SMS module for VespAI"""
 
-from .lox24 import Lox24SMS, SMSManager
+from .lox24 import Lox24SMS, AsyncLox24SMS, SMSManager
 
-__all__ = ['Lox24SMS', 'SMSManager']
\ No newline at end of file
+__all__ = ['Lox24SMS', 'AsyncLox24SMS', 'SMSManager']
\ No newline at end of file
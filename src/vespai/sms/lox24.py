@@ -9,15 +9,104 @@ Author: Jakob Zeise (Zeise Digital)
 Version: 1.0
 """
 
+import asyncio
 import json
 import os
 import datetime
+import functools
+import types
 import logging
+import queue
+import threading
+import time
 import requests
-from typing import Tuple, Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Tuple, Optional, Dict, Any, List
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+LOX24_SMS_URL = "https://api.lox24.eu/sms"
+
+# Upper bound for a combined alert text (several concatenated SMS parts)
+MAX_BATCH_TEXT = 1000
+
+# Batched alerts kept while rate limited; the oldest are dropped beyond this
+MAX_PENDING_ALERTS = 50
+
+# Lox24 HTTP status codes and their meaning
+_ERROR_MESSAGES = types.MappingProxyType({
+    400: "Invalid input parameters",
+    401: "Client ID or API key is invalid or inactive",
+    402: "Insufficient funds in account",
+    403: "Account not activated - contact support",
+    404: "Resource not found",
+    500: "Internal server error - contact LOX24 support",
+    502: "Bad gateway - contact LOX24 support",
+    503: "Service unavailable - contact LOX24 support",
+    504: "Gateway timeout - contact LOX24 support",
+})
+
+
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(obj: Any) -> bytes:
+        """Serialise obj to compact UTF-8 JSON, like orjson.dumps."""
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    _loads = json.loads
+
+
+def lox24_retry() -> Retry:
+    """
+    Build the retry policy for Lox24 requests.
+    
+    Connection errors and the gateway errors 502/503 are retried with
+    exponential backoff on the pooled keep-alive connection. Read errors,
+    500 and 504 are never retried: the POST is not idempotent, and after
+    a read or gateway timeout Lox24 has usually accepted the message, so a
+    retry would send and bill the SMS again. Retry-After is honoured, and
+    jitter spreads out retries from several devices after an outage.
+    
+    Returns:
+        Retry: urllib3 retry configuration
+    """
+    options = dict(total=3, read=0, backoff_factor=0.5, status_forcelist=(502, 503),
+                   allowed_methods=frozenset(['POST']), raise_on_status=False,
+                   respect_retry_after_header=True)
+    try:
+        return Retry(backoff_jitter=0.5, **options)
+    except TypeError:
+        # urllib3 < 2.0 has no backoff_jitter
+        return Retry(**options)
+
+
+# Fields of the Lox24 JSON body that are the same for every SMS
+_PAYLOAD_DEFAULTS = types.MappingProxyType({
+    'service_code': "direct",
+    'delivery_at': 0,
+    'is_unicode': True,
+    'callback_data': '123456',
+    'voice_lang': 'DE'
+})
+
+# hornet_type -> (emoji, species name, urgency) for alert texts
+_ALERT_STYLES = types.MappingProxyType({
+    'velutina': ("⚠️", "Asian Hornet", "ALERT"),
+    'crabro': ("ℹ️", "European Hornet", "Info"),
+})
+
 
 class Lox24SMS:
     """
@@ -27,6 +116,9 @@ class Lox24SMS:
     for the Lox24 SMS service used in VespAI hornet detection alerts.
     """
     
+    __slots__ = ('api_key', 'sender_name', 'username', 'password', 'sms_available',
+                 '_session', '_headers', '_url', '_payload_template')
+    
     def __init__(self, api_key: str, sender_name: str = "VespAI"):
         """
         Initialize the Lox24 SMS client.
@@ -38,6 +130,7 @@ class Lox24SMS:
         self.api_key = api_key
         self.sender_name = sender_name
         self.sms_available = True
+        self._payload_template = {**_PAYLOAD_DEFAULTS, 'sender_id': sender_name}
 
         # Parse API key format (username:password or token)
         if ":" in api_key:
@@ -47,6 +140,24 @@ class Lox24SMS:
             self.username = ""
             self.password = api_key
 
+        # Persistent session: keep-alive and connection pooling avoid a new
+        # TCP + TLS handshake to api.lox24.eu for every alert. Transient
+        # network errors and 5xx responses are retried with backoff by urllib3.
+        self._url = LOX24_SMS_URL
+        self._headers = {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+            'X-LOX24-AUTH-TOKEN': api_key,
+        }
+        self._session = requests.Session()
+        self._session.headers.update(self._headers)
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                                                    max_retries=lox24_retry()))
+
+    def close(self):
+        """Close the underlying HTTP session and its pooled connections."""
+        self._session.close()
+
     def send_sms(self, to: str, message: str) -> Tuple[bool, float]:
         """
         Send an SMS message via the Lox24 API.
@@ -62,51 +173,46 @@ class Lox24SMS:
             logger.info(f"[SMS disabled] Would send: {message}")
             return False, 0.0
 
-        url = "https://api.lox24.eu/sms"
+        logger.info(f"Sending SMS to {to}: {message[:50]}...")
 
-        try:
-            logger.info(f"Sending SMS to {to}: {message[:50]}...")
-
-            data = {
-                'sender_id': self.sender_name,
-                'text': message,
-                'service_code': "direct",
-                'phone': to,
-                'delivery_at': 0,
-                'is_unicode': True,
-                'callback_data': '123456',
-                'voice_lang': 'DE'
-            }
-
-            headers = {
-                'Accept': 'application/json',
-                'Content-Type': 'application/json',
-                'X-LOX24-AUTH-TOKEN': self.api_key,
-            }
-
-            logger.debug("SMS payload: %s", json.dumps(data, indent=4))
-
-            # Send request with 100 second timeout
-            response = requests.post(url, headers=headers, json=data, timeout=100)
-            
-            if response.status_code != 201:  # Created
-                error_msg = self._handle_error_response(response)
-                logger.error("SMS sending failed: %s", error_msg)
-                return False, 0.0
-            else:
-                logger.info("✓ SMS sent successfully (status: %d)", response.status_code)
-                response_data = response.json()
-                logger.debug("SMS response: %s", json.dumps(response_data, indent=4))
-                
-                # Extract cost from response
-                cost = self._extract_cost_from_response(response_data)
-                return True, cost
+        data = {**self._payload_template, 'phone': to, 'text': message}
+
+        body = _dumps(data)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("SMS payload: %s", body.decode('utf-8'))
 
+        # Send request (5 s connect / 15 s read timeout, retries in the adapter).
+        # The session headers already declare Content-Type: application/json.
+        try:
+            response = self._session.post(self._url, data=body, timeout=(5, 15))
         except requests.exceptions.RequestException as e:
             logger.error("SMS request error: %s", e)
             return False, 0.0
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Lox24 connection: %s", response.headers.get('Connection', 'keep-alive'))
+        
+        if response.status_code != 201:  # Created
+            error_msg = self._handle_error_response(response)
+            logger.error("SMS sending failed: %s", error_msg)
+            return False, 0.0
 
-    def _handle_error_response(self, response: requests.Response) -> str:
+        logger.info("✓ SMS sent successfully (status: %d)", response.status_code)
+        try:
+            response_data = _loads(response.content)
+        except ValueError:
+            # Delivered, but the body is unreadable so the cost is unknown
+            logger.warning("SMS response is not valid JSON: %s", response.text)
+            return True, 0.0
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("SMS response: %s", response.text)
+        
+        # Extract cost from response
+        cost = self._extract_cost_from_response(response_data)
+        return True, cost
+
+    @staticmethod
+    def _handle_error_response(response: requests.Response) -> str:
         """
         Handle and format error responses from the Lox24 API.
         
@@ -116,19 +222,7 @@ class Lox24SMS:
         Returns:
             str: Formatted error message
         """
-        error_messages = {
-            400: "Invalid input parameters",
-            401: "Client ID or API key is invalid or inactive",
-            402: "Insufficient funds in account",
-            403: "Account not activated - contact support",
-            404: "Resource not found",
-            500: "Internal server error - contact LOX24 support",
-            502: "Bad gateway - contact LOX24 support", 
-            503: "Service unavailable - contact LOX24 support",
-            504: "Gateway timeout - contact LOX24 support"
-        }
-        
-        error_msg = error_messages.get(response.status_code, f"Unknown error (status: {response.status_code})")
+        error_msg = _ERROR_MESSAGES.get(response.status_code, f"Unknown error (status: {response.status_code})")
         
         try:
             response_text = response.text
@@ -138,7 +232,8 @@ class Lox24SMS:
             
         return f"{error_msg}. Response: {response_text}"
 
-    def _extract_cost_from_response(self, response_data: Dict[str, Any]) -> float:
+    @staticmethod
+    def _extract_cost_from_response(response_data: Dict[str, Any]) -> float:
         """
         Extract the SMS cost from the API response.
         
@@ -148,17 +243,100 @@ class Lox24SMS:
         Returns:
             float: Message cost in EUR, or 0.0 if not found
         """
-        # Try different possible cost field names
-        cost_fields = ['price', 'cost', 'total_price', 'amount']
+        # Lox24 reports 'price'; older responses used one of the other names
+        value = (response_data.get('price') or response_data.get('cost')
+                 or response_data.get('total_price') or response_data.get('amount'))
+        if value is None:
+            return 0.0
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return 0.0
+
+
+class AsyncLox24SMS:
+    """
+    Asynchronous Lox24 SMS client built on aiohttp.
+    
+    One ClientSession and TCP pool is shared by all sends, so alerts to
+    several recipients go out concurrently instead of one after another.
+    Use Lox24SMS for single synchronous alerts.
+    """
+    
+    def __init__(self, api_key: str, sender_name: str = "VespAI"):
+        """
+        Initialize the async Lox24 SMS client.
         
-        for field in cost_fields:
-            if field in response_data:
-                try:
-                    return float(response_data[field])
-                except (ValueError, TypeError):
-                    continue
-                    
-        return 0.0
+        Args:
+            api_key (str): Lox24 API key
+            sender_name (str): Sender name that appears on SMS messages
+            
+        Raises:
+            ImportError: If aiohttp is not installed
+        """
+        if aiohttp is None:
+            raise ImportError("aiohttp is required for AsyncLox24SMS (pip install aiohttp)")
+        self.api_key = api_key
+        self.sender_name = sender_name
+        self._payload_template = {**_PAYLOAD_DEFAULTS, 'sender_id': sender_name}
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Create the shared ClientSession on first use, inside the running event loop."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=8, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=30),
+                headers={
+                    'Accept': 'application/json',
+                    'Content-Type': 'application/json',
+                    'X-LOX24-AUTH-TOKEN': self.api_key,
+                })
+        return self._session
+
+    async def send_sms(self, to: str, message: str) -> Tuple[bool, float]:
+        """
+        Send an SMS message via the Lox24 API.
+        
+        Args:
+            to (str): Recipient phone number (e.g., "+491234567890")
+            message (str): SMS message content
+            
+        Returns:
+            Tuple[bool, float]: (success, cost) - Success status and message cost in EUR
+        """
+        data = {**self._payload_template, 'phone': to, 'text': message}
+        try:
+            async with self._get_session().post(LOX24_SMS_URL, json=data) as res:
+                if res.status != 201:  # Created
+                    logger.error("SMS sending to %s failed (status %d): %s", to, res.status, await res.text())
+                    return False, 0.0
+                response_data = await res.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("SMS request error: %s", e)
+            return False, 0.0
+
+        logger.info("✓ SMS sent successfully to %s", to)
+        return True, Lox24SMS._extract_cost_from_response(response_data)
+
+    async def send_many(self, phones: List[str], message: str) -> List[Tuple[bool, float]]:
+        """
+        Send the same message to several recipients concurrently.
+        
+        Args:
+            phones (List[str]): Recipient phone numbers
+            message (str): SMS message content
+            
+        Returns:
+            List[Tuple[bool, float]]: (success, cost) per recipient, in input order
+        """
+        return await asyncio.gather(*[self.send_sms(phone, message) for phone in phones])
+
+    async def close(self):
+        """Close the shared ClientSession."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
 
 class SMSManager:
@@ -169,12 +347,19 @@ class SMSManager:
     and integration with VespAI statistics.
     """
     
+    __slots__ = ('phone_number', 'delay_minutes', 'enabled', 'last_sms_time', 'client',
+                 '_capacity', '_tokens', '_rate', '_last_refill', '_bucket_lock',
+                 '_queue', '_worker', '_unavailable_reason', 'coalesce_seconds',
+                 '_pending', '_pending_lock', '_flush_timer')
+    
     def __init__(self, 
                  api_key: str, 
                  phone_number: str,
                  sender_name: str = "VespAI",
                  delay_minutes: int = 5,
-                 enabled: bool = True):
+                 enabled: bool = True,
+                 coalesce_seconds: float = 30.0,
+                 burst: int = 1):
         """
         Initialize the SMS Manager.
         
@@ -184,11 +369,33 @@ class SMSManager:
             sender_name (str): SMS sender name
             delay_minutes (int): Minimum delay between SMS messages
             enabled (bool): Whether SMS sending is enabled
+            coalesce_seconds (float): Window in which queued alerts are
+                combined into one SMS (0 sends each alert on its own)
+            burst (int): SMS that may go out back-to-back before the
+                delay applies; the long-term rate stays one per delay
         """
         self.phone_number = phone_number
         self.delay_minutes = delay_minutes
         self.enabled = enabled
         self.last_sms_time: Optional[datetime.datetime] = None
+
+        # Token bucket over time.monotonic(): up to burst SMS at once, then
+        # one per delay period; immune to wall-clock jumps and allocation-free
+        # on the hot path
+        self._capacity = float(max(1, burst))
+        self._tokens = self._capacity
+        self._last_refill = time.monotonic()
+        self._bucket_lock = threading.Lock()
+
+        # Background sender, started on the first queue_alert()
+        self._queue: "queue.Queue[Optional[Tuple[str, bool]]]" = queue.Queue(maxsize=16)
+        self._worker: Optional[threading.Thread] = None
+
+        # Alerts waiting for the coalescing window to close
+        self.coalesce_seconds = coalesce_seconds
+        self._pending: List[str] = []
+        self._pending_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
         
         # Initialize SMS client
         if api_key and phone_number and enabled:
@@ -196,6 +403,25 @@ class SMSManager:
         else:
             self.client = None
             logger.warning("SMS not configured - alerts disabled")
+
+        self.reload()
+
+    def reload(self):
+        """
+        Recompute the cached send predicate and refill rate.
+        
+        Call this after changing enabled, client, phone_number or
+        delay_minutes at runtime.
+        """
+        if not self.enabled:
+            self._unavailable_reason = "SMS disabled in configuration"
+        elif not self.client:
+            self._unavailable_reason = "SMS client not initialized"
+        elif not self.phone_number:
+            self._unavailable_reason = "No phone number configured"
+        else:
+            self._unavailable_reason = None
+        self._rate = 1.0 / (self.delay_minutes * 60.0) if self.delay_minutes > 0 else None
     
     def send_alert(self, message: str, force: bool = False) -> Tuple[bool, str]:
         """
@@ -208,25 +434,123 @@ class SMSManager:
         Returns:
             Tuple[bool, str]: (success, status_message)
         """
-        # Check if SMS is enabled and configured
-        if not self.enabled:
-            return False, "SMS disabled in configuration"
-            
-        if not self.client:
-            return False, "SMS client not initialized"
-            
-        if not self.phone_number:
-            return False, "No phone number configured"
+        # Check if SMS is enabled and configured (cached by reload())
+        if self._unavailable_reason:
+            return False, self._unavailable_reason
         
         # Check rate limiting
-        if not force and self.last_sms_time is not None:
-            time_since_last = (datetime.datetime.now() - self.last_sms_time).total_seconds() / 60
+        if not self._check_rate_limit(force):
+            return False, self._rate_limited_status()
+        
+        return self._deliver(message, force)
+
+    def queue_alert(self, message: str, force: bool = False) -> Tuple[bool, str]:
+        """
+        Queue an SMS alert for the background sender thread.
+        
+        Alerts arriving within coalesce_seconds of each other are combined
+        into a single SMS once the window closes and a rate-limit token is
+        available. The call returns immediately, so the detection loop never
+        waits on the HTTP POST.
+        
+        Args:
+            message (str): Alert message to send
+            force (bool): Send now with any batched alerts, bypassing rate limiting
             
-            if time_since_last < self.delay_minutes:
-                remaining = self.delay_minutes - time_since_last
-                return False, f"Rate limited - next SMS allowed in {remaining:.1f} minutes"
+        Returns:
+            Tuple[bool, str]: (accepted, status_message)
+        """
+        if self._unavailable_reason:
+            return False, self._unavailable_reason
+        
+        if force:
+            with self._pending_lock:
+                batch = self._take_pending()
+            batch.append(message)
+            return self._enqueue(self._combine(batch), True)
         
-        # Send the SMS
+        if self.coalesce_seconds <= 0:
+            if not self._check_rate_limit():
+                return False, self._rate_limited_status()
+            return self._enqueue(message, False)
+        
+        with self._pending_lock:
+            if len(self._pending) >= MAX_PENDING_ALERTS:
+                logger.warning("SMS batch full - dropping oldest alert: %s", self._pending.pop(0))
+            self._pending.append(message)
+            if self._flush_timer is None:
+                self._schedule_flush(self.coalesce_seconds)
+        return True, "SMS batched"
+
+    def _flush(self):
+        """Send the batched alerts, or retry when the next rate-limit token is due."""
+        with self._pending_lock:
+            self._flush_timer = None
+            if not self._pending:
+                return
+            if not self._check_rate_limit():
+                self._schedule_flush((1.0 - self._tokens) / self._rate)
+                return
+            batch = self._take_pending()
+        self._enqueue(self._combine(batch), False)
+
+    def _schedule_flush(self, delay: float):
+        """Start the flush timer; the caller holds _pending_lock."""
+        self._flush_timer = threading.Timer(delay, self._flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _take_pending(self) -> List[str]:
+        """Cancel the flush timer and return the batched alerts; the caller holds _pending_lock."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        batch, self._pending = self._pending, []
+        return batch
+
+    @staticmethod
+    def _combine(batch: List[str]) -> str:
+        """Join batched alerts into one SMS text."""
+        if len(batch) == 1:
+            return batch[0]
+        text = f"{len(batch)} hornet detections: " + "; ".join(batch[:5])
+        if len(text) > MAX_BATCH_TEXT:
+            text = text[:MAX_BATCH_TEXT - 3] + "..."
+        return text
+
+    def _enqueue(self, message: str, force: bool) -> Tuple[bool, str]:
+        """Hand a rate-limited message to the sender thread."""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._send_worker, name="sms-sender", daemon=True)
+            self._worker.start()
+        
+        try:
+            self._queue.put_nowait((message, force))
+        except queue.Full:
+            logger.warning("SMS queue full - dropping alert")
+            self._refund(force)
+            return False, "SMS queue full"
+        return True, "SMS queued"
+
+    def _rate_limited_status(self) -> str:
+        """Describe how long until the next SMS may be sent."""
+        remaining = (1.0 - self._tokens) / self._rate / 60
+        return f"Rate limited - next SMS allowed in {remaining:.1f} minutes"
+
+    def _send_worker(self):
+        """Send queued alerts until close() posts the None sentinel."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            success, status = self._deliver(*item)
+            if success:
+                logger.info("SMS alert sent: %s", status)
+            else:
+                logger.warning("SMS alert failed: %s", status)
+
+    def _deliver(self, message: str, force: bool) -> Tuple[bool, str]:
+        """Send an already rate-limited message and record the result."""
         success, cost = self.client.send_sms(self.phone_number, message)
         
         if success:
@@ -236,7 +560,56 @@ class SMSManager:
                 status_msg += f" (cost: {cost:.3f}€)"
             return True, status_msg
         else:
+            # Refund the token so a failed send does not block the next alert
+            self._refund(force)
             return False, "Failed to send SMS"
+
+    def _refund(self, force: bool):
+        """Return a token taken by _check_rate_limit() for an alert that was not sent."""
+        if not force:
+            with self._bucket_lock:
+                self._tokens = min(self._capacity, self._tokens + 1.0)
+
+    def _check_rate_limit(self, force: bool = False) -> bool:
+        """
+        Take a token from the rate-limit bucket.
+        
+        Args:
+            force (bool): Whether to bypass rate limiting
+            
+        Returns:
+            bool: True if an SMS may be sent now
+        """
+        if force or self._rate is None:
+            return True
+        with self._bucket_lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * self._rate)
+            self._last_refill = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    def close(self):
+        """Send or drop batched alerts, stop the background sender and release the HTTP connections."""
+        with self._pending_lock:
+            batch = self._take_pending()
+        if batch:
+            if self._check_rate_limit():
+                self._enqueue(self._combine(batch), False)
+            else:
+                logger.warning("Dropping %d batched SMS alert(s) on shutdown (rate limited)", len(batch))
+        
+        if self._worker is not None:
+            try:
+                self._queue.put(None, timeout=1)
+            except queue.Full:
+                pass
+            self._worker.join(timeout=5)
+            self._worker = None
+        if self.client:
+            self.client.close()
     
     def create_hornet_alert(self, 
                           hornet_type: str, 
@@ -255,28 +628,33 @@ class SMSManager:
         Returns:
             str: Formatted alert message
         """
-        time_str = datetime.datetime.now().strftime('%H:%M')
-        
-        if hornet_type == 'velutina':
-            emoji = "⚠️"
-            species = "Asian Hornet"
-            urgency = "ALERT"
-        else:
-            emoji = "ℹ️"
-            species = "European Hornet"
-            urgency = "Info"
-            
+        emoji, species, urgency = _ALERT_STYLES.get(hornet_type, _ALERT_STYLES['crabro'])
         plural = "s" if count > 1 else ""
+        confidence_str = f" ({confidence:.1f}% confidence)" if confidence > 0 else ""
+        view_str = f". View: {frame_url}" if frame_url else ""
         
-        message = f"{emoji} {urgency}: {count} {species}{plural} detected at {time_str}"
-        
-        if confidence > 0:
-            message += f" ({confidence:.1f}% confidence)"
-            
-        if frame_url:
-            message += f". View: {frame_url}"
-            
-        return message
+        return (f"{emoji} {urgency}: {count} {species}{plural} detected at "
+                f"{time.strftime('%H:%M')}{confidence_str}{view_str}")
+
+
+@functools.lru_cache(maxsize=1)
+def _env_snapshot() -> Dict[str, Any]:
+    """
+    Read and parse the SMS environment variables once per process.
+    
+    Call _env_snapshot.cache_clear() after changing them at runtime.
+    
+    Returns:
+        Dict[str, Any]: SMSManager keyword arguments (do not modify)
+    """
+    return {
+        'api_key': os.getenv("LOX24_API_KEY", ""),
+        'phone_number': os.getenv("PHONE_NUMBER", ""),
+        'sender_name': os.getenv("LOX24_SENDER", "VespAI"),
+        'delay_minutes': int(os.getenv("SMS_DELAY_MINUTES", "5")),
+        'enabled': os.getenv("ENABLE_SMS", "true").lower() == "true",
+        'burst': int(os.getenv("SMS_BURST", "1")),
+    }
 
 
 def create_sms_manager_from_env() -> Optional[SMSManager]:
@@ -288,33 +666,26 @@ def create_sms_manager_from_env() -> Optional[SMSManager]:
     - PHONE_NUMBER: Target phone number
     - LOX24_SENDER: SMS sender name (optional)
     - SMS_DELAY_MINUTES: Delay between messages (optional)
+    - SMS_BURST: Messages allowed back-to-back before the delay applies (optional)
     - ENABLE_SMS: Whether SMS is enabled (optional)
     
+    The variables are read once per process, see _env_snapshot().
+    
     Returns:
         SMSManager: Configured SMS manager or None if not properly configured
     """
-    api_key = os.getenv("LOX24_API_KEY", "")
-    phone_number = os.getenv("PHONE_NUMBER", "")
-    sender_name = os.getenv("LOX24_SENDER", "VespAI")
-    delay_minutes = int(os.getenv("SMS_DELAY_MINUTES", "5"))
-    enabled = os.getenv("ENABLE_SMS", "true").lower() == "true"
+    env = _env_snapshot()
     
-    if not api_key:
+    if not env['api_key']:
         logger.warning("LOX24_API_KEY not set - SMS alerts disabled")
         return None
         
-    if not phone_number:
+    if not env['phone_number']:
         logger.warning("PHONE_NUMBER not set - SMS alerts disabled") 
         return None
     
     try:
-        return SMSManager(
-            api_key=api_key,
-            phone_number=phone_number,
-            sender_name=sender_name,
-            delay_minutes=delay_minutes,
-            enabled=enabled
-        )
+        return SMSManager(**env)
     except Exception as e:
         logger.error("Failed to initialize SMS manager: %s", e)
         return None
\ No newline at end of file
@@ -32,12 +32,102 @@ import logging
 from flask import Response, render_template, jsonify
 import os
 import numpy as np
+import threading
 import time
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Set up logger
 logger = logging.getLogger(__name__)
 
 
+# Multipart header and trailer around every JPEG in the /video_feed stream
+MJPEG_FRAME_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+MJPEG_FRAME_TAIL = b'\r\n'
+
+# System readings shared by all dashboard polls for SYSTEM_STATS_TTL seconds
+SYSTEM_STATS_TTL = 1.0
+_sys_cache = {"t": None, "cpu_usage": 0, "ram_usage": 0, "disk_usage": 0, "cpu_temp": 0}
+_sys_cache_lock = threading.Lock()
+
+# CPU temperature sensor (Raspberry Pi), opened once and re-read at offset 0
+try:
+    _thermal_file = open('/sys/class/thermal/thermal_zone0/temp', 'rb', buffering=0)
+except OSError:
+    _thermal_file = None
+
+
+def read_cpu_temp() -> float:
+    """
+    Read the CPU temperature without reopening the sysfs file.
+    
+    Returns:
+        float: Temperature in °C, or 0 if no sensor is available
+    """
+    if _thermal_file is None:
+        return 0
+    try:
+        return int(os.pread(_thermal_file.fileno(), 16, 0)) / 1000
+    except (OSError, ValueError):
+        return 0
+
+
+def get_system_stats():
+    """
+    Return CPU, RAM, disk and temperature readings, refreshed at most once per TTL.
+    
+    Several open dashboards poll /api/stats independently; within the TTL
+    they all get the same snapshot instead of querying psutil and sysfs again.
+    
+    Returns:
+        dict: cpu_usage, ram_usage, disk_usage (percent) and cpu_temp (°C)
+    """
+    with _sys_cache_lock:
+        now = time.monotonic()
+        if _sys_cache["t"] is not None and now - _sys_cache["t"] < SYSTEM_STATS_TTL:
+            return {k: v for k, v in _sys_cache.items() if k != "t"}
+        
+        try:
+            _sys_cache["cpu_usage"] = psutil.cpu_percent(interval=None)  # Non-blocking
+            _sys_cache["ram_usage"] = psutil.virtual_memory().percent
+            _sys_cache["disk_usage"] = psutil.disk_usage('/').percent
+        except (OSError, psutil.Error) as e:
+            # Keep the previous readings
+            logger.debug("System stats unavailable: %s", e)
+        
+        # CPU temperature (Raspberry Pi)
+        _sys_cache["cpu_temp"] = read_cpu_temp()
+        
+        _sys_cache["t"] = now
+        return {k: v for k, v in _sys_cache.items() if k != "t"}
+
+
+# Live stream JPEG quality when the CPU is not busy
+STREAM_JPEG_QUALITY = 60
+
+
+def stream_jpeg_quality() -> int:
+    """
+    Return the live stream JPEG quality for the last measured CPU load.
+    
+    Uses the reading cached by get_system_stats() without measuring again,
+    and steps the quality down while the CPU is busy so that encoding
+    takes less time away from detection.
+    
+    Returns:
+        int: JPEG quality for cv2.IMWRITE_JPEG_QUALITY
+    """
+    cpu_usage = _sys_cache["cpu_usage"]
+    if cpu_usage < 60:
+        return STREAM_JPEG_QUALITY
+    if cpu_usage < 85:
+        return STREAM_JPEG_QUALITY - 10
+    return STREAM_JPEG_QUALITY - 20
+
+
 def convert_numpy_to_serializable(data):
     """
     Recursively convert numpy arrays and other non-serializable types to JSON-serializable types.
@@ -62,6 +152,26 @@ def convert_numpy_to_serializable(data):
         return data
 
 
+def json_response(data):
+    """
+    Serialize data to a JSON response, using orjson when it is installed.
+    
+    orjson encodes in native code and handles numpy arrays and scalars
+    directly, so the recursive numpy conversion is only needed for the
+    stdlib fallback.
+    
+    Args:
+        data: JSON-compatible data, possibly containing numpy values
+        
+    Returns:
+        Response: application/json response
+    """
+    if orjson is not None:
+        body = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        return Response(body, mimetype='application/json')
+    return jsonify(convert_numpy_to_serializable(data))
+
+
 def register_routes(app, stats, hourly_detections, app_instance):
     """
     Register all essential web routes with the Flask app.
@@ -69,14 +179,21 @@ def register_routes(app, stats, hourly_detections, app_instance):
     Args:
         app (Flask): The Flask application instance
         stats (dict): Global statistics dictionary containing detection counts, system stats, etc.
-        hourly_detections (dict): Dictionary tracking detections per hour (24-hour format)
-        app_instance (VespAIApplication): The main application instance with web_frame and web_lock
+        hourly_detections (list): 24 per-hour records with hour, velutina, crabro and total counts
+        app_instance (VespAIApplication): The main application instance with web_frame_jpeg, web_frame_seq and web_cond
     """
     
+    # Prime psutil's CPU counters so the first poll reports real usage
+    # without a blocking interval
+    psutil.cpu_percent(interval=None)
+    
+    # Newest web frame as (seq, complete multipart part), framed once for all
+    # stream clients; only read and replaced while holding web_cond
+    stream_part = [-1, None]
+    
     # Cache for hourly data to avoid recalculating on every request
     hourly_data_cache = {
-        'last_update': 0,
-        'data_24h': [],
+        'last_update': None,
         'data_4h': []
     }
     
@@ -117,35 +234,50 @@ def register_routes(app, stats, hourly_detections, app_instance):
             Yields:
                 bytes: MJPEG frame data with HTTP multipart boundaries
             """
-            frame_timeout = 0
+            last_seq = -1
+            part = None
+            idle_seconds = 0
             while True:
                 try:
-                    with app_instance.web_lock:
-                        if app_instance.web_frame is None:
-                            frame_timeout += 1
-                            if frame_timeout > 100:  # 10 seconds without frame
-                                logger.warning("No frames available for streaming")
-                                frame_timeout = 0
-                            time.sleep(0.1)
-                            continue
-                        frame = app_instance.web_frame.copy()
-                        frame_timeout = 0
-
-                    # Optimized quality for Raspberry Pi performance
-                    (flag, encodedImage) = cv2.imencode(".jpg", frame,
-                                                        [cv2.IMWRITE_JPEG_QUALITY, 60])
-                    if not flag:
+                    # Sleep until the detection loop publishes a new frame, so
+                    # each client sends each frame once instead of spinning
+                    with app_instance.web_cond:
+                        app_instance.web_cond.wait_for(
+                            lambda: app_instance.web_frame_seq != last_seq, timeout=1.0)
+                        if app_instance.web_frame_seq != last_seq:
+                            # A slow client skips straight to the newest frame
+                            # rather than working through a backlog
+                            skipped = app_instance.web_frame_seq - last_seq - 1
+                            if last_seq >= 0 and skipped > 0 and logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("Video feed client skipped %d frames", skipped)
+                            last_seq = app_instance.web_frame_seq
+                            if stream_part[0] != last_seq:
+                                jpeg = app_instance.web_frame_jpeg
+                                stream_part[0] = last_seq
+                                stream_part[1] = (MJPEG_FRAME_HEADER + jpeg + MJPEG_FRAME_TAIL
+                                                  if jpeg is not None else None)
+                            part = stream_part[1]
+                            idle_seconds = 0
+                        else:
+                            idle_seconds += 1
+                    
+                    if part is None:
+                        if idle_seconds >= 10:  # 10 seconds without frame
+                            logger.warning("No frames available for streaming")
+                            idle_seconds = 0
                         continue
-
-                    yield (b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' +
-                           bytearray(encodedImage) + b'\r\n')
+                    
+                    # On timeout the last part is re-sent as a keep-alive
+                    yield part
                            
                 except Exception as e:
                     logger.error(f"Video feed error: {e}")
                     time.sleep(0.5)
                     continue
 
-        return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
+        # Parts are already complete bytes, so Werkzeug passes them through unwrapped
+        return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame',
+                        direct_passthrough=True)
 
     @app.route('/api/detection_frame/<frame_id>')
     def get_detection_frame(frame_id):
@@ -160,12 +292,19 @@ def register_routes(app, stats, hourly_detections, app_instance):
         """
         if frame_id in stats["detection_frames"]:
             frame = stats["detection_frames"][frame_id]
-            # Optimized JPEG encoding with lower quality for faster loading
-            ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 75])
+            max_age = 3600
+            if isinstance(frame, bytes):
+                # Already JPEG-encoded by the detection processor; a frame id
+                # always maps to the same image, so clients may keep it
+                ret, data, max_age = True, frame, 86400
+            else:
+                # Optimized JPEG encoding with lower quality for faster loading
+                ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 75])
+                data = buffer.tobytes() if ret else None
             if ret:
-                response = Response(buffer.tobytes(), mimetype='image/jpeg')
+                response = Response(data, mimetype='image/jpeg')
                 # Add caching headers for better performance
-                response.headers['Cache-Control'] = 'public, max-age=3600'
+                response.headers['Cache-Control'] = f'public, max-age={max_age}'
                 response.headers['ETag'] = f'"{frame_id}"'
                 return response
         return "Frame not found", 404
@@ -224,40 +363,18 @@ def register_routes(app, stats, hourly_detections, app_instance):
         uptime = datetime.datetime.now() - stats["start_time"]
         hours, remainder = divmod(uptime.seconds, 3600)
         minutes, _ = divmod(remainder, 60)
-        stats["uptime"] = f"{hours}h {minutes}m"
 
-        # Get system stats (non-blocking)
-        try:
-            stats["cpu_usage"] = psutil.cpu_percent(interval=None)  # Non-blocking
-            stats["ram_usage"] = psutil.virtual_memory().percent
-            stats["disk_usage"] = psutil.disk_usage('/').percent
-        except:
-            pass
+        # Frame rate is computed on demand from the processor's timestamp ring
+        processor = getattr(app_instance, 'detection_processor', None)
+        frame_rate = getattr(processor, 'frame_rate', None)
+        fps = round(frame_rate.fps(), 1) if frame_rate is not None else stats.get("fps", 0)
 
-        # CPU temperature (Raspberry Pi)
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp = int(f.read()) / 1000
-                stats["cpu_temp"] = temp
-        except:
-            stats["cpu_temp"] = 0
-
-        # Prepare hourly data with caching (only recalculate if detections changed)
+        # Prepare 4-hour blocks with caching (only recalculate if detections changed)
         current_total_detections = stats.get("total_detections", 0)
         if hourly_data_cache['last_update'] != current_total_detections:
             # Recalculate hourly data
             hourly_data_cache['last_update'] = current_total_detections
             
-            # 24-hour detailed data (matching original)
-            hourly_data_cache['data_24h'] = []
-            for hour in range(24):
-                hourly_data_cache['data_24h'].append({
-                    "hour": f"{hour:02d}:00",
-                    "velutina": hourly_detections[hour]["velutina"],
-                    "crabro": hourly_detections[hour]["crabro"],
-                    "total": hourly_detections[hour]["velutina"] + hourly_detections[hour]["crabro"]
-                })
-            
             # 4-hour grouped data (for mobile)
             hourly_data_cache['data_4h'] = []
             for block in range(6):  # 6 blocks of 4 hours each
@@ -278,38 +395,44 @@ def register_routes(app, stats, hourly_detections, app_instance):
                     "total": block_velutina + block_crabro
                 })
         
-        # Use cached data
-        hourly_data_24h = hourly_data_cache['data_24h']
+        # Use cached data; the 24-hour records are kept up to date by the
+        # detection processor and served as they are
+        hourly_data_24h = hourly_detections
         hourly_data_4h = hourly_data_cache['data_4h']
 
-        response_data = dict(stats)
-        response_data["hourly_data"] = hourly_data_24h  # Default to 24h for backward compatibility
-        response_data["hourly_data_24h"] = hourly_data_24h  # Detailed 24-hour data
-        response_data["hourly_data_4h"] = hourly_data_4h   # Grouped 4-hour data
+        # Only the served fields are picked from stats; stored detection frames
+        # are served by /api/detection_frame and never copied here
+        response_data = {
+            "frame_id": stats.get("frame_id", 0),
+            "total_velutina": stats.get("total_velutina", 0),
+            "total_crabro": stats.get("total_crabro", 0),
+            "total_detections": stats.get("total_detections", 0),
+            "fps": fps,
+            "uptime": f"{hours}h {minutes}m",
+            "confidence_avg": stats.get("confidence_avg", 0),
+            "detection_log": list(stats.get("detection_log", ())),
+            "hourly_data": hourly_data_24h,  # Default to 24h for backward compatibility
+            "hourly_data_24h": hourly_data_24h,  # Detailed 24-hour data
+            "hourly_data_4h": hourly_data_4h,  # Grouped 4-hour data
+            "sms_sent": stats.get("sms_sent", 0),
+            "sms_cost": stats.get("sms_cost", 0.0),
+            "saved_images": stats.get("saved_images", 0),
+            "last_detection_time": None,
+            "last_sms_time": None,
+            "start_time": stats["start_time"].strftime("%H:%M:%S"),
+        }
         
-        # Add missing fields with defaults if not present
-        response_data.setdefault("sms_sent", 0)
-        response_data.setdefault("sms_cost", 0.0)
-        response_data.setdefault("saved_images", 0)
-        response_data.setdefault("last_sms_time", None)
+        # System stats, shared between polls for SYSTEM_STATS_TTL seconds
+        response_data.update(get_system_stats())
         
-        # Convert deque to list for JSON serialization
-        if "detection_log" in response_data:
-            response_data["detection_log"] = list(response_data["detection_log"])
-        if "hourly_stats" in response_data:
-            response_data["hourly_stats"] = list(response_data["hourly_stats"])
+        if "hourly_stats" in stats:
+            response_data["hourly_stats"] = list(stats["hourly_stats"])
         
         # Format timestamps
-        if response_data.get("last_detection_time"):
-            response_data["last_detection_time"] = response_data["last_detection_time"].strftime("%H:%M:%S")
-        if response_data.get("last_sms_time"):
-            response_data["last_sms_time"] = response_data["last_sms_time"].strftime("%H:%M:%S")
-            
-        if response_data.get("start_time"):
-            response_data["start_time"] = response_data["start_time"].strftime("%H:%M:%S")
-
-        # Convert any numpy arrays to JSON-serializable types
-        response_data = convert_numpy_to_serializable(response_data)
+        if stats.get("last_detection_time"):
+            response_data["last_detection_time"] = stats["last_detection_time"].strftime("%H:%M:%S")
+        if stats.get("last_sms_time"):
+            response_data["last_sms_time"] = stats["last_sms_time"].strftime("%H:%M:%S")
         
         # Add health check information
         current_time = time.time()
@@ -326,10 +449,10 @@ def register_routes(app, stats, hourly_detections, app_instance):
             }
         
         # Debug log frame_id periodically
-        if hasattr(stats, 'get') and stats.get('frame_id', 0) % 50 == 0:
-            print(f"DEBUG: API returning frame_id: {response_data.get('frame_id', 'NOT_FOUND')}")
+        if response_data["frame_id"] % 50 == 0:
+            print(f"DEBUG: API returning frame_id: {response_data['frame_id']}")
         
-        return jsonify(response_data)
+        return json_response(response_data)
 
 
 # Template files have been extracted to separate files:
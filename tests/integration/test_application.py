@@ -119,6 +119,54 @@ class TestVespAIApplication(unittest.TestCase):
         
         self.assertFalse(self.app.running)
     
+    def test_static_frame_gate(self):
+        """Test unchanged frames are flagged so inference can be skipped"""
+        frame = np.zeros((360, 640, 3), dtype=np.uint8)
+        hornet = frame.copy()
+        hornet[150:210, 300:360] = 80  # 60x60 px object entering a still scene
+        
+        self.assertFalse(self.app._is_static(frame, 15))  # no reference yet
+        self.assertTrue(self.app._is_static(frame.copy(), 15))
+        self.assertFalse(self.app._is_static(hornet, 15))
+        self.assertFalse(self.app._is_static(frame, 0))  # gate disabled
+    
+    def test_static_frame_gate_accumulates_slow_change(self):
+        """Test the reference stays at the last inferred frame, so drift adds up"""
+        base = np.zeros((360, 640, 3), dtype=np.uint8)
+        self.assertFalse(self.app._is_static(base, 15))
+        
+        first, second = base.copy(), base.copy()
+        first[100:200, 200:300] = 10  # below the threshold on its own
+        second[100:200, 200:300] = 20  # 10 more than first, 20 more than the reference
+        
+        self.assertTrue(self.app._is_static(first, 15))
+        self.assertFalse(self.app._is_static(second, 15))
+    
+    def test_capture_loop_keeps_every_video_frame(self):
+        """Test video file frames are queued in order instead of dropped when the queue is full"""
+        frames = [np.full((90, 160, 3), i, dtype=np.uint8) for i in range(5)]
+        reads = iter(frames)
+        
+        def read_frame():
+            frame = next(reads, None)
+            if frame is None:
+                self.app.running = False
+                return False, None
+            return True, frame
+        
+        self.app.config = Mock()
+        self.app.config.get.side_effect = lambda key, default=None: (
+            'clip.mp4' if key == 'video_file' else default)
+        self.app.camera_manager = Mock(read_frame=read_frame)
+        self.app.running = True
+        
+        capture = threading.Thread(target=self.app._capture_loop, daemon=True)
+        capture.start()
+        received = [int(self.app.frame_queue.get(timeout=2)[0, 0, 0]) for _ in frames]
+        capture.join(timeout=2)
+        
+        self.assertEqual(received, [0, 1, 2, 3, 4])
+    
     @patch('src.vespai.main.create_config_from_args')
     def test_cleanup(self, mock_config):
         """Test application cleanup"""
@@ -190,7 +238,7 @@ class TestVespAIApplication(unittest.TestCase):
         # Mock SMS manager
         mock_sms = Mock()
         mock_sms.create_hornet_alert.return_value = "Test alert message"
-        mock_sms.send_alert.return_value = (True, "SMS sent successfully")
+        mock_sms.queue_alert.return_value = (True, "SMS queued")
         mock_create_sms.return_value = mock_sms
         
         # Mock configuration
@@ -208,7 +256,7 @@ class TestVespAIApplication(unittest.TestCase):
         
         # Verify SMS creation and sending
         mock_sms.create_hornet_alert.assert_called_once()
-        mock_sms.send_alert.assert_called_once_with("Test alert message")
+        mock_sms.queue_alert.assert_called_once_with("Test alert message")
 
 
 class TestApplicationFlow(unittest.TestCase):
@@ -18,7 +18,9 @@ from collections import deque
 project_root = os.path.join(os.path.dirname(__file__), '..', '..')
 sys.path.insert(0, project_root)
 
-from src.vespai.core.detection import CameraManager, ModelManager, DetectionProcessor, parse_resolution
+from src.vespai.core.detection import (CameraManager, ModelManager, DetectionProcessor, FrameRateMeter,
+                                       ExportedModelRunner, DetectionFrameStore, downscale_frame,
+                                       parse_resolution, _draw_label)
 
 
 class TestCameraManager(unittest.TestCase):
@@ -52,7 +54,7 @@ class TestCameraManager(unittest.TestCase):
         """Test successful camera initialization"""
         mock_cap = Mock()
         mock_cap.isOpened.return_value = True
-        mock_cap.get.side_effect = [1920, 1080, 30]  # width, height, fps
+        mock_cap.get.side_effect = [1920, 1080, 30, cv2.VideoWriter_fourcc(*'MJPG')]  # width, height, fps, fourcc
         mock_video_capture.return_value = mock_cap
         
         result = self.camera_manager.initialize_camera()
@@ -61,6 +63,17 @@ class TestCameraManager(unittest.TestCase):
         self.assertTrue(mock_video_capture.called)
         mock_sleep.assert_called_once_with(2)
     
+    @patch('src.vespai.core.detection.cv2.VideoCapture')
+    @patch('src.vespai.core.detection.time.sleep')
+    def test_initialize_camera_negative_fourcc(self, mock_sleep, mock_video_capture):
+        """Test a backend reporting FOURCC -1 doesn't abort camera initialization"""
+        mock_cap = Mock()
+        mock_cap.isOpened.return_value = True
+        mock_cap.get.side_effect = [1920, 1080, 30, -1]
+        mock_video_capture.return_value = mock_cap
+        
+        self.assertEqual(self.camera_manager.initialize_camera(), mock_cap)
+    
     @patch('src.vespai.core.detection.cv2.VideoCapture')
     def test_initialize_camera_failure(self, mock_video_capture):
         """Test camera initialization failure"""
@@ -71,6 +84,15 @@ class TestCameraManager(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             self.camera_manager.initialize_camera()
     
+    @patch('os.path.exists', return_value=False)
+    def test_gstreamer_pipeline(self, mock_exists):
+        """Test GStreamer pipeline requests MJPEG at the configured resolution"""
+        pipeline = self.camera_manager._gstreamer_pipeline()
+        
+        self.assertIn("image/jpeg,width=1920,height=1080", pipeline)
+        self.assertIn("jpegdec", pipeline)
+        self.assertTrue(pipeline.endswith("appsink max-buffers=2 drop=true sync=false"))
+    
     def test_read_frame_no_camera(self):
         """Test reading frame without initialized camera"""
         success, frame = self.camera_manager.read_frame()
@@ -114,10 +136,18 @@ class TestModelManager(unittest.TestCase):
         self.assertIsNone(self.model_manager.model)
         self.assertEqual(self.model_manager.class_names, {})
     
+    def test_inference_shape_matches_letterbox(self):
+        """Test warm-up uses the stride-padded shape of real camera frames"""
+        self.model_manager.model = Mock(stride=32)
+        self.assertEqual(self.model_manager._inference_shape(), (384, 640))
+        
+        self.model_manager.frame_size = (640, 480)
+        self.assertEqual(self.model_manager._inference_shape(), (480, 640))
+    
     @patch('os.path.exists')
     def test_find_model_file_exists(self, mock_exists):
         """Test finding existing model file"""
-        mock_exists.return_value = True
+        mock_exists.side_effect = lambda path: path == "test_model.pt"
         
         result = self.model_manager._find_model_file()
         
@@ -127,8 +157,8 @@ class TestModelManager(unittest.TestCase):
     @patch('os.path.exists')
     def test_find_model_file_fallback(self, mock_exists):
         """Test finding model file with fallback paths"""
-        # First call (original path) returns False, second call (fallback) returns True
-        mock_exists.side_effect = [False, True]
+        # Only the first fallback path exists
+        mock_exists.side_effect = lambda path: path == "/opt/vespai/models/yolov5s-all-data.pt"
         
         result = self.model_manager._find_model_file()
         
@@ -136,6 +166,38 @@ class TestModelManager(unittest.TestCase):
         # Should update to first fallback path
         self.assertEqual(self.model_manager.model_path, "/opt/vespai/models/yolov5s-all-data.pt")
     
+    @patch('src.vespai.core.detection.torch.cuda.is_available', return_value=False)
+    @patch('os.path.exists')
+    def test_find_model_file_prefers_onnx(self, mock_exists, mock_cuda):
+        """Test that an exported ONNX model next to the weights is preferred"""
+        mock_exists.side_effect = lambda path: path in ("test_model.pt", "test_model.onnx")
+        
+        result = self.model_manager._find_model_file()
+        
+        self.assertTrue(result)
+        self.assertEqual(self.model_manager.model_path, "test_model.onnx")
+    
+    @patch.dict(sys.modules, {'openvino': Mock()})
+    @patch('src.vespai.core.detection.torch.cuda.is_available', return_value=False)
+    def test_cpu_export_not_picked_up_on_next_start(self, mock_cuda):
+        """Test the CPU runtime's own ONNX export doesn't replace the weights on restart"""
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            weights = os.path.join(tmp, 'model.pt')
+            open(weights, 'wb').close()
+            
+            for _ in range(2):  # First start exports, second start must still find the .pt
+                manager = ModelManager(weights)
+                self.assertTrue(manager._find_model_file())
+                self.assertEqual(manager.model_path, weights)
+                with patch.object(ModelManager, '_export_onnx',
+                                  side_effect=lambda path: open(path, 'wb').close()) as mock_export:
+                    self.assertIsNotNone(manager._load_cpu_runtime())
+            
+            mock_export.assert_not_called()
+            self.assertTrue(os.path.exists(os.path.join(tmp, 'model-cpu.onnx')))
+    
     @patch('os.path.exists')
     def test_find_model_file_not_found(self, mock_exists):
         """Test model file not found anywhere"""
@@ -171,6 +233,35 @@ class TestModelManager(unittest.TestCase):
         
         self.assertIn("Model file not found", str(context.exception))
     
+    @patch.dict(sys.modules, {'yolov5': Mock()})
+    @patch('subprocess.run')
+    @patch('importlib.util.find_spec', return_value=None)
+    @patch('os.path.exists', return_value=False)
+    def test_tensorrt_export_skipped_without_tensorrt(self, mock_exists, mock_find_spec, mock_run):
+        """Test the engine export is not attempted when TensorRT is missing"""
+        self.assertIsNone(self.model_manager._load_tensorrt_engine())
+        mock_run.assert_not_called()
+    
+    @patch.dict(sys.modules, {'yolov5': Mock()})
+    @patch('subprocess.run')
+    @patch('importlib.util.find_spec', return_value=Mock())
+    def test_tensorrt_export_failure_is_remembered(self, mock_find_spec, mock_run):
+        """Test a failed engine export leaves a marker that skips later attempts"""
+        import subprocess
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            self.model_manager.model_path = os.path.join(tmp, 'model.pt')
+            mock_run.side_effect = subprocess.CalledProcessError(1, 'export')
+            
+            with self.assertRaises(subprocess.CalledProcessError):
+                self.model_manager._load_tensorrt_engine()
+            self.assertTrue(os.path.exists(os.path.join(tmp, 'model.engine-failed')))
+            
+            mock_run.reset_mock()
+            self.assertIsNone(self.model_manager._load_tensorrt_engine())
+            mock_run.assert_not_called()
+    
     def test_predict_no_model(self):
         """Test prediction without loaded model"""
         frame = np.zeros((480, 640, 3))
@@ -190,6 +281,75 @@ class TestModelManager(unittest.TestCase):
         
         self.assertEqual(result, mock_predictions)
         mock_model.assert_called_once()
+    
+    def test_predict_batch_splits_results(self):
+        """Test batched prediction runs one forward pass and splits per frame"""
+        mock_model = Mock()
+        mock_model.return_value = Mock(pred=["pred0", "pred1"])
+        self.model_manager.model = mock_model
+        
+        frames = [np.zeros((480, 640, 3), dtype=np.uint8) for _ in range(2)]
+        results = self.model_manager.predict_batch(frames)
+        
+        mock_model.assert_called_once()
+        self.assertEqual(len(mock_model.call_args[0][0]), 2)
+        self.assertEqual([r.pred[0] for r in results], ["pred0", "pred1"])
+    
+    def test_predict_batch_fixed_batch_runs_per_frame(self):
+        """Test a TensorRT engine (batch 1) gets one call per frame"""
+        mock_model = Mock()
+        self.model_manager.model = mock_model
+        self.model_manager.fixed_batch = True
+        
+        frames = [np.zeros((480, 640, 3), dtype=np.uint8) for _ in range(3)]
+        results = self.model_manager.predict_batch(frames)
+        
+        self.assertEqual(mock_model.call_count, 3)
+        self.assertEqual(mock_model.call_args[0][0].shape, (480, 640, 3))
+        self.assertEqual(len(results), 3)
+
+
+class TestExportedModelRunner(unittest.TestCase):
+    """Test cases for ExportedModelRunner class"""
+    
+    def test_letterbox_nms_and_rescale(self):
+        """Test raw network output is filtered, suppressed and mapped back to the frame"""
+        raw = np.array([[
+            [320, 320, 100, 100, 0.90, 0.05, 0.95],  # Velutina, kept
+            [322, 318, 100, 100, 0.88, 0.05, 0.94],  # Overlapping duplicate
+            [100, 200, 50, 50, 0.30, 0.90, 0.10],    # Below confidence
+        ]], dtype=np.float32)
+        infer = Mock(return_value=raw)
+        runner = ExportedModelRunner(infer, confidence=0.8)
+        
+        results = runner(np.zeros((480, 640, 3), dtype=np.uint8))
+        
+        blob = infer.call_args[0][0]
+        self.assertEqual(blob.shape, (1, 3, 640, 640))
+        pred = results.pred[0]
+        self.assertEqual(pred.shape, (1, 6))
+        np.testing.assert_allclose(pred[0, :4], [270, 190, 370, 290])
+        self.assertEqual(int(pred[0, 5]), 1)
+    
+    def test_no_detections(self):
+        """Test empty output when nothing passes the threshold"""
+        raw = np.zeros((1, 5, 7), dtype=np.float32)
+        runner = ExportedModelRunner(Mock(return_value=raw), confidence=0.8)
+        
+        results = runner(np.zeros((480, 640, 3), dtype=np.uint8))
+        
+        self.assertEqual(results.pred[0].shape, (0, 6))
+    
+    def test_predict_uses_runtime(self):
+        """Test ModelManager.predict dispatches to the exported runtime"""
+        manager = ModelManager("test_model.pt")
+        manager.model = Mock()
+        manager.runtime = Mock(return_value="runtime results")
+        
+        result = manager.predict(np.zeros((480, 640, 3), dtype=np.uint8))
+        
+        self.assertEqual(result, "runtime results")
+        manager.model.assert_not_called()
 
 
 class TestDetectionProcessor(unittest.TestCase):
@@ -222,6 +382,37 @@ class TestDetectionProcessor(unittest.TestCase):
         self.assertEqual(velutina, 0)
         self.assertEqual(crabro, 0)
         np.testing.assert_array_equal(annotated, frame)
+        self.assertIs(annotated, frame)
+    
+    def test_detection_frame_stored_as_jpeg(self):
+        """Test detection frames are kept JPEG-encoded"""
+        import torch
+        
+        mock_results = Mock()
+        mock_results.pred = [torch.tensor([[100, 100, 200, 200, 0.95, 1]])]
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        
+        _, _, annotated = self.processor.process_detections(mock_results, frame, 1)
+        
+        self.assertIsNot(annotated, frame)
+        stored = list(self.processor.stats["detection_frames"].values())[0]
+        self.assertIsInstance(stored, bytes)
+        self.assertTrue(stored.startswith(b'\xff\xd8'))
+    
+    def test_detection_key_uses_given_time(self):
+        """Test the stored frame key is built from the supplied timestamp"""
+        import torch
+        
+        mock_results = Mock()
+        mock_results.pred = [torch.tensor([[100, 100, 200, 200, 0.95, 1]])]
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        now = datetime(2024, 6, 1, 14, 5, 9)
+        
+        self.processor.process_detections(mock_results, frame, 7, now=now)
+        
+        self.assertEqual(self.processor.last_detection_key, "7_140509")
+        self.assertIn("7_140509", self.processor.stats["detection_frames"])
+        self.assertEqual(self.processor.stats["detection_log"][-1]["timestamp"], "14:05:09")
     
     def test_process_detections_with_velutina(self):
         """Test processing frame with Asian hornet detection"""
@@ -241,12 +432,27 @@ class TestDetectionProcessor(unittest.TestCase):
         self.assertEqual(crabro, 0)
         self.assertEqual(self.processor.stats["total_velutina"], 1)
         self.assertEqual(self.processor.stats["total_detections"], 1)
+        self.assertEqual(sum(h["total"] for h in self.processor.hourly_detections), 1)
         
         # Check that detection was logged
         self.assertEqual(len(self.processor.stats["detection_log"]), 1)
         log_entry = self.processor.stats["detection_log"][0]
         self.assertEqual(log_entry["species"], "velutina")
     
+    def test_process_detections_scales_boxes_to_full_frame(self):
+        """Test boxes found on the downscaled copy are drawn on the full-size frame"""
+        import torch
+        
+        mock_results = Mock()
+        mock_results.pred = [torch.tensor([[100, 100, 200, 200, 0.95, 1]])]
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        
+        _, _, annotated = self.processor.process_detections(mock_results, frame, 1, scale=3.0)
+        
+        self.assertEqual(annotated.shape, (1080, 1920, 3))
+        self.assertTrue(annotated[450, 300].any())  # left edge of the scaled box
+        self.assertFalse(annotated[150, 100].any())  # left edge of the unscaled box
+    
     def test_process_detections_with_crabro(self):
         """Test processing frame with European hornet detection"""
         import torch
@@ -329,6 +535,10 @@ class TestDetectionProcessor(unittest.TestCase):
         
         # Should not exceed 20 stored frames
         self.assertLessEqual(len(self.processor.stats["detection_frames"]), 20)
+        
+        # The oldest frames are the ones evicted
+        oldest = next(iter(self.processor.stats["detection_frames"]))
+        self.assertTrue(oldest.startswith("6_"))
 
 
 class TestUtilityFunctions(unittest.TestCase):
@@ -351,6 +561,52 @@ class TestUtilityFunctions(unittest.TestCase):
         self.assertEqual(parse_resolution("invalid"), (1920, 1080))
         self.assertEqual(parse_resolution("800"), (1920, 1080))
         self.assertEqual(parse_resolution(""), (1920, 1080))
+    
+    def test_draw_label_clips_to_frame(self):
+        """Test cached labels are drawn and clipped at the frame edges"""
+        frame = np.zeros((40, 40, 3), dtype=np.uint8)
+        
+        _draw_label(frame, "Velutina 0.95", (-5, 8), (0, 0, 255))
+        _draw_label(frame, "Crabro 0.90", (100, 100), (0, 255, 0))  # fully outside
+        
+        self.assertTrue(frame[..., 2].any())
+        self.assertFalse(frame[..., 1].any())
+    
+    @patch('src.vespai.core.detection.time.monotonic_ns')
+    def test_frame_rate_meter(self, mock_ns):
+        """Test FPS is computed from the timestamp ring and goes stale"""
+        meter = FrameRateMeter()
+        self.assertEqual(meter.fps(), 0.0)
+        
+        for i in range(100):  # 10 FPS, wrapping the ring
+            mock_ns.return_value = i * 100_000_000
+            meter.tick()
+        self.assertAlmostEqual(meter.fps(), 10.0)
+        
+        mock_ns.return_value += 5_000_000_000
+        self.assertEqual(meter.fps(), 0.0)
+
+    def test_detection_frame_store_evicts_oldest(self):
+        """Test the frame store keeps only the newest maxsize frames"""
+        store = DetectionFrameStore(maxsize=3)
+        for i in range(5):
+            store[f"f{i}"] = b"jpeg"
+        self.assertEqual(list(store), ["f2", "f3", "f4"])
+
+        store["f2"] = b"jpeg"  # re-storing refreshes the key
+        store["f5"] = b"jpeg"
+        self.assertEqual(list(store), ["f4", "f2", "f5"])
+
+        self.assertEqual(store.get("f4"), b"jpeg")  # reads leave order alone
+        self.assertEqual(next(iter(store)), "f4")
+
+    def test_downscale_frame(self):
+        """Test frames are shrunk to the network size only when larger"""
+        large = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        self.assertEqual(downscale_frame(large).shape, (360, 640, 3))
+        
+        small = np.zeros((240, 320, 3), dtype=np.uint8)
+        self.assertIs(downscale_frame(small), small)
 
 
 class TestDetectionIntegration(unittest.TestCase):
@@ -363,7 +619,7 @@ class TestDetectionIntegration(unittest.TestCase):
         # Setup camera mock
         mock_cap = Mock()
         mock_cap.isOpened.return_value = True
-        mock_cap.get.side_effect = [640, 480, 30]
+        mock_cap.get.side_effect = [640, 480, 30, cv2.VideoWriter_fourcc(*'MJPG')]
         mock_cap.read.return_value = (True, np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8))
         mock_video_capture.return_value = mock_cap
         
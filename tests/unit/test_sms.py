@@ -16,7 +16,8 @@ import json
 project_root = os.path.join(os.path.dirname(__file__), '..', '..')
 sys.path.insert(0, project_root)
 
-from src.vespai.sms.lox24 import Lox24SMS, SMSManager, create_sms_manager_from_env
+from src.vespai.sms.lox24 import Lox24SMS, AsyncLox24SMS, SMSManager, create_sms_manager_from_env
+from src.vespai.sms import lox24
 
 
 class TestLox24SMS(unittest.TestCase):
@@ -42,13 +43,13 @@ class TestLox24SMS(unittest.TestCase):
         self.assertEqual(client.username, "user")
         self.assertEqual(client.password, "pass")
     
-    @patch('src.vespai.sms.lox24.requests.post')
+    @patch('src.vespai.sms.lox24.requests.Session.post')
     def test_send_sms_success(self, mock_post):
         """Test successful SMS sending"""
         # Mock successful response
         mock_response = Mock()
         mock_response.status_code = 201
-        mock_response.json.return_value = {"price": 0.05, "id": "12345"}
+        mock_response.content = b'{"price": 0.05, "id": "12345"}'
         mock_post.return_value = mock_response
         
         success, cost = self.sms_client.send_sms("+491234567890", "Test message")
@@ -57,7 +58,7 @@ class TestLox24SMS(unittest.TestCase):
         self.assertEqual(cost, 0.05)
         mock_post.assert_called_once()
     
-    @patch('src.vespai.sms.lox24.requests.post')
+    @patch('src.vespai.sms.lox24.requests.Session.post')
     def test_send_sms_failure(self, mock_post):
         """Test SMS sending failure"""
         # Mock error response
@@ -71,7 +72,7 @@ class TestLox24SMS(unittest.TestCase):
         self.assertFalse(success)
         self.assertEqual(cost, 0.0)
     
-    @patch('src.vespai.sms.lox24.requests.post')
+    @patch('src.vespai.sms.lox24.requests.Session.post')
     def test_send_sms_network_error(self, mock_post):
         """Test SMS sending with network error"""
         # Mock network exception
@@ -83,6 +84,21 @@ class TestLox24SMS(unittest.TestCase):
         self.assertFalse(success)
         self.assertEqual(cost, 0.0)
     
+    def test_session_reuses_auth_headers(self):
+        """Test that the pooled session carries the auth headers"""
+        headers = self.sms_client._session.headers
+        self.assertEqual(headers['X-LOX24-AUTH-TOKEN'], self.api_key)
+        self.assertEqual(headers['Content-Type'], 'application/json')
+    
+    def test_session_retries_gateway_errors(self):
+        """Test that 5xx responses are retried on the pooled session"""
+        retries = self.sms_client._session.get_adapter(lox24.LOX24_SMS_URL).max_retries
+        self.assertEqual(retries.total, 3)
+        self.assertEqual(retries.read, 0)  # a timed-out POST may already have sent the SMS
+        self.assertIn(503, retries.status_forcelist)
+        self.assertNotIn(504, retries.status_forcelist)  # the upstream may have accepted the SMS
+        self.assertTrue(retries.respect_retry_after_header)
+    
     def test_disabled_sms_client(self):
         """Test SMS client with SMS disabled"""
         client = Lox24SMS("api_key", "TestSender")
@@ -170,6 +186,17 @@ class TestSMSManager(unittest.TestCase):
         self.assertFalse(success)
         self.assertIn("not initialized", message)
     
+    def test_reload_after_runtime_change(self):
+        """Test that reload() picks up a runtime configuration change"""
+        manager = SMSManager("api_key", "+491234567890")
+        manager.enabled = False
+        manager.reload()
+        
+        success, message = manager.send_alert("Test alert")
+        
+        self.assertFalse(success)
+        self.assertIn("disabled", message)
+    
     @patch('src.vespai.sms.lox24.Lox24SMS')
     def test_send_alert_success(self, mock_lox24):
         """Test successful alert sending"""
@@ -191,13 +218,27 @@ class TestSMSManager(unittest.TestCase):
         mock_lox24.return_value = mock_client
         
         manager = SMSManager("api_key", "+491234567890", delay_minutes=5)
-        manager.last_sms_time = datetime.now() - timedelta(minutes=2)
+        manager._tokens = 0.0  # an SMS was just sent
         
         success, message = manager.send_alert("Test alert")
         
         self.assertFalse(success)
         self.assertIn("Rate limited", message)
     
+    @patch('src.vespai.sms.lox24.Lox24SMS')
+    def test_send_alert_burst(self, mock_lox24):
+        """Test that burst alerts go out back-to-back before rate limiting"""
+        mock_client = Mock()
+        mock_client.send_sms.return_value = (True, 0.03)
+        mock_lox24.return_value = mock_client
+        
+        manager = SMSManager("api_key", "+491234567890", delay_minutes=5, burst=3)
+        
+        results = [manager.send_alert(f"Alert {i}")[0] for i in range(4)]
+        
+        self.assertEqual(results, [True, True, True, False])
+        self.assertEqual(mock_client.send_sms.call_count, 3)
+    
     @patch('src.vespai.sms.lox24.Lox24SMS')
     def test_send_alert_force_override_rate_limit(self, mock_lox24):
         """Test forcing alert to bypass rate limiting"""
@@ -206,13 +247,68 @@ class TestSMSManager(unittest.TestCase):
         mock_lox24.return_value = mock_client
         
         manager = SMSManager("api_key", "+491234567890", delay_minutes=5)
-        manager.last_sms_time = datetime.now() - timedelta(minutes=2)
+        manager._tokens = 0.0  # an SMS was just sent
         
         success, message = manager.send_alert("Test alert", force=True)
         
         self.assertTrue(success)
         self.assertIn("successfully", message)
     
+    @patch('src.vespai.sms.lox24.Lox24SMS')
+    def test_queue_alert_sends_in_background(self, mock_lox24):
+        """Test that queued alerts are sent by the worker thread"""
+        mock_client = Mock()
+        mock_client.send_sms.return_value = (True, 0.05)
+        mock_lox24.return_value = mock_client
+        
+        manager = SMSManager("api_key", "+491234567890", delay_minutes=5, coalesce_seconds=0)
+        queued, message = manager.queue_alert("Test alert")
+        manager.close()
+        
+        self.assertTrue(queued)
+        mock_client.send_sms.assert_called_once_with("+491234567890", "Test alert")
+        self.assertIsNotNone(manager.last_sms_time)
+        
+        # Second alert within the delay is rejected without queuing
+        queued, message = manager.queue_alert("Second alert")
+        self.assertFalse(queued)
+        self.assertIn("Rate limited", message)
+    
+    @patch('src.vespai.sms.lox24.Lox24SMS')
+    def test_queue_alert_coalesces_burst(self, mock_lox24):
+        """Test that alerts within the coalescing window become one SMS"""
+        mock_client = Mock()
+        mock_client.send_sms.return_value = (True, 0.05)
+        mock_lox24.return_value = mock_client
+        
+        manager = SMSManager("api_key", "+491234567890", delay_minutes=5, coalesce_seconds=60)
+        for text in ("first", "second", "third"):
+            queued, message = manager.queue_alert(text)
+            self.assertTrue(queued)
+            self.assertIn("batched", message)
+        manager.close()
+        
+        mock_client.send_sms.assert_called_once_with(
+            "+491234567890", "3 hornet detections: first; second; third")
+    
+    @patch('src.vespai.sms.lox24.Lox24SMS')
+    def test_queue_alert_caps_pending_batch(self, mock_lox24):
+        """Test that alerts batched while rate limited are capped, dropping the oldest"""
+        manager = SMSManager("api_key", "+491234567890", delay_minutes=5, coalesce_seconds=60)
+        for i in range(lox24.MAX_PENDING_ALERTS + 5):
+            manager.queue_alert(f"Alert {i}")
+        
+        pending = manager._take_pending()
+        self.assertEqual(len(pending), lox24.MAX_PENDING_ALERTS)
+        self.assertEqual(pending[0], "Alert 5")
+    
+    def test_combined_alert_is_truncated(self):
+        """Test that a combined burst never exceeds the batch text limit"""
+        text = SMSManager._combine(["x" * 400] * 5)
+        
+        self.assertEqual(len(text), lox24.MAX_BATCH_TEXT)
+        self.assertTrue(text.endswith("..."))
+    
     def test_create_velutina_alert(self):
         """Test creating Asian hornet alert message"""
         frame_url = "http://example.com/frame/123"
@@ -250,6 +346,19 @@ class TestSMSManager(unittest.TestCase):
 class TestSMSManagerEnvironment(unittest.TestCase):
     """Test environment-based SMS manager creation"""
     
+    def setUp(self):
+        """Re-read the environment for every test"""
+        lox24._env_snapshot.cache_clear()
+    
+    def test_env_read_once(self):
+        """Test the environment is parsed once until the cache is cleared"""
+        with patch.dict(os.environ, {'SMS_DELAY_MINUTES': '7'}):
+            self.assertEqual(lox24._env_snapshot()['delay_minutes'], 7)
+        with patch.dict(os.environ, {'SMS_DELAY_MINUTES': '9'}):
+            self.assertEqual(lox24._env_snapshot()['delay_minutes'], 7)
+            lox24._env_snapshot.cache_clear()
+            self.assertEqual(lox24._env_snapshot()['delay_minutes'], 9)
+    
     @patch.dict(os.environ, {
         'LOX24_API_KEY': 'test_key',
         'PHONE_NUMBER': '+491234567890',
@@ -271,7 +380,8 @@ class TestSMSManagerEnvironment(unittest.TestCase):
             phone_number='+491234567890',
             sender_name='VespAI',
             delay_minutes=10,
-            enabled=True
+            enabled=True,
+            burst=1
         )
     
     @patch.dict(os.environ, {}, clear=True)
@@ -311,17 +421,17 @@ class TestSMSManagerEnvironment(unittest.TestCase):
 class TestSMSManagerIntegration(unittest.TestCase):
     """Integration tests for SMS manager"""
     
-    @patch('src.vespai.sms.lox24.requests.post')
+    @patch('src.vespai.sms.lox24.requests.Session.post')
     def test_full_sms_workflow(self, mock_post):
         """Test complete SMS sending workflow"""
         # Mock successful API response
         mock_response = Mock()
         mock_response.status_code = 201
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
             "id": "msg_12345",
             "price": 0.08,
             "status": "sent"
-        }
+        }).encode()
         mock_post.return_value = mock_response
         
         # Create manager and send alert
@@ -345,5 +455,23 @@ class TestSMSManagerIntegration(unittest.TestCase):
         self.assertEqual(mock_post.call_count, 2)
 
 
+@unittest.skipIf(lox24.aiohttp is None, "aiohttp not installed")
+class TestAsyncLox24SMS(unittest.TestCase):
+    """Test cases for AsyncLox24SMS class"""
+    
+    def test_send_many_keeps_recipient_order(self):
+        """Test that send_many returns one result per recipient in order"""
+        import asyncio
+        client = AsyncLox24SMS("test_api_key")
+        
+        async def fake_send(to, message):
+            return to.endswith("1"), 0.05
+        
+        with patch.object(client, 'send_sms', side_effect=fake_send):
+            results = asyncio.run(client.send_many(["+491", "+492"], "Test"))
+        
+        self.assertEqual(results, [(True, 0.05), (False, 0.05)])
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -9,6 +9,7 @@ ensuring all endpoints work correctly and handle edge cases properly.
 import unittest
 import sys
 import os
+import tempfile
 import threading
 from unittest.mock import Mock, patch
 from flask import Flask
@@ -22,6 +23,7 @@ project_root = os.path.join(os.path.dirname(__file__), '..', '..')
 sys.path.insert(0, project_root)
 
 from src.vespai.web.routes import register_routes
+from src.vespai.web import routes
 
 
 class TestWebRoutes(unittest.TestCase):
@@ -62,7 +64,8 @@ class TestWebRoutes(unittest.TestCase):
         }
         
         # Mock hourly detections tracking
-        self.hourly_detections = {hour: {"velutina": 0, "crabro": 0} for hour in range(24)}
+        self.hourly_detections = [{"hour": f"{hour:02d}:00", "velutina": 0, "crabro": 0, "total": 0}
+                                  for hour in range(24)]
         
         # Mock web frame and thread lock
         self.web_frame = np.zeros((480, 640, 3), dtype=np.uint8)
@@ -123,6 +126,15 @@ class TestWebRoutes(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.content_type, 'image/jpeg')
     
+    def test_detection_frame_pre_encoded(self):
+        """Test detection frame route serves stored JPEG bytes unchanged."""
+        jpeg = b'\xff\xd8\xff\xe0test\xff\xd9'
+        self.stats["detection_frames"]["encoded"] = jpeg
+        
+        response = self.client.get('/api/detection_frame/encoded')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, jpeg)
+    
     def test_frame_page_not_found(self):
         """Test frame page route with non-existent frame returns 404."""
         response = self.client.get('/frame/nonexistent')
@@ -180,12 +192,22 @@ class TestWebRoutes(unittest.TestCase):
         data = response.get_json()
         self.assertEqual(len(data['detection_log']), 1)
         self.assertEqual(data['detection_log'][0]['species'], 'crabro')
-    
+
+    def test_stats_leaves_frames_and_stats_alone(self):
+        """Test stats API neither returns stored frames nor writes into stats."""
+        self.stats["detection_frames"]["test_frame"] = b'\xff\xd8\xff\xd9'
+        before = dict(self.stats)
+
+        data = self.client.get('/api/stats').get_json()
+
+        self.assertNotIn('detection_frames', data)
+        self.assertIn('uptime', data)
+        self.assertEqual(self.stats, before)
+
     def test_stats_hourly_data_structure(self):
         """Test stats API hourly data has correct structure."""
         # Add some hourly detection data
-        self.hourly_detections[12]["velutina"] = 3
-        self.hourly_detections[12]["crabro"] = 5
+        self.hourly_detections[12].update(velutina=3, crabro=5, total=8)
         
         response = self.client.get('/api/stats')
         self.assertEqual(response.status_code, 200)
@@ -248,9 +270,9 @@ class TestWebRoutesIntegration(unittest.TestCase):
             "last_sms_time": datetime(2023, 8, 15, 14, 30, 45)
         }
         
-        self.hourly_detections = {hour: {"velutina": 0, "crabro": 0} for hour in range(24)}
-        self.hourly_detections[14]["velutina"] = 3
-        self.hourly_detections[14]["crabro"] = 7
+        self.hourly_detections = [{"hour": f"{hour:02d}:00", "velutina": 0, "crabro": 0, "total": 0}
+                                  for hour in range(24)]
+        self.hourly_detections[14].update(velutina=3, crabro=7, total=10)
         
         # Create a realistic test frame
         self.web_frame = np.random.randint(0, 255, (240, 320, 3), dtype=np.uint8)
@@ -304,5 +326,81 @@ class TestWebRoutesIntegration(unittest.TestCase):
         self.assertIn(frame_id, data['available_frames'])
 
 
+
+class TestSystemStats(unittest.TestCase):
+    """Test cases for the cached system statistics"""
+    
+    def setUp(self):
+        """Start every test with an expired cache."""
+        routes._sys_cache["t"] = None
+    
+    @patch('src.vespai.web.routes.psutil')
+    def test_readings_cached_within_ttl(self, mock_psutil):
+        """Test psutil is queried once per TTL window."""
+        mock_psutil.cpu_percent.return_value = 12.5
+        mock_psutil.virtual_memory.return_value.percent = 40.0
+        mock_psutil.disk_usage.return_value.percent = 55.0
+        
+        first = routes.get_system_stats()
+        second = routes.get_system_stats()
+        
+        self.assertEqual(first, second)
+        self.assertEqual(first["cpu_usage"], 12.5)
+        mock_psutil.cpu_percent.assert_called_once_with(interval=None)
+        
+        routes._sys_cache["t"] -= routes.SYSTEM_STATS_TTL
+        routes.get_system_stats()
+        self.assertEqual(mock_psutil.cpu_percent.call_count, 2)
+
+    def test_cpu_temp_reread_from_open_file(self):
+        """Test the temperature sensor is re-read without reopening it."""
+        with tempfile.TemporaryFile() as sensor:
+            sensor.write(b"45200\n")
+            sensor.flush()
+            with patch.object(routes, '_thermal_file', sensor):
+                self.assertEqual(routes.read_cpu_temp(), 45.2)
+                sensor.seek(0)
+                sensor.write(b"51000\n")
+                sensor.flush()
+                self.assertEqual(routes.read_cpu_temp(), 51.0)
+        
+        with patch.object(routes, '_thermal_file', None):
+            self.assertEqual(routes.read_cpu_temp(), 0)
+
+    @patch.dict(routes._sys_cache, {"cpu_usage": 0})
+    def test_stream_quality_follows_cpu_load(self):
+        """Test the stream JPEG quality steps down as the cached CPU load rises."""
+        qualities = []
+        for load in (20, 70, 95):
+            routes._sys_cache["cpu_usage"] = load
+            qualities.append(routes.stream_jpeg_quality())
+
+        self.assertEqual(qualities[0], routes.STREAM_JPEG_QUALITY)
+        self.assertGreater(qualities[0], qualities[1])
+        self.assertGreater(qualities[1], qualities[2])
+
+
+
+class TestJsonResponse(unittest.TestCase):
+    """Test cases for JSON serialization of API responses"""
+    
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.data = {"count": np.int64(3), "values": np.array([1.5, 2.5]), "name": "stats"}
+    
+    def test_numpy_values_serialized(self):
+        """Test numpy scalars and arrays are encoded with the fast path."""
+        with self.app.app_context():
+            response = routes.json_response(self.data)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(response.get_json(), {"count": 3, "values": [1.5, 2.5], "name": "stats"})
+    
+    def test_stdlib_fallback(self):
+        """Test the stdlib encoder is used when orjson is unavailable."""
+        with patch.object(routes, 'orjson', None), self.app.app_context():
+            response = routes.json_response(self.data)
+        self.assertEqual(response.get_json(), {"count": 3, "values": [1.5, 2.5], "name": "stats"})
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -12,14 +12,19 @@ Complete Version with Real-Time Data Integration and Fixed Log Updates
 
 # ───────────────────────── imports ─────────────────────────
 import argparse
+import atexit
 import datetime
+import gzip
 import logging
 import os
+import queue
 import sys
 import threading
 import time
 import warnings
-from collections import deque
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from dotenv import load_dotenv
 
 import json
@@ -47,12 +52,43 @@ except ImportError:
     logger.warning("RPi.GPIO not available - GPIO functions disabled")
     GPIO = None
 
+# Size the OpenMP/MKL pools before torch and OpenCV create them: both default
+# to the hyperthread count and oversubscribe the cores when run together
+CPU_THREADS = max(1, (os.cpu_count() or 4) // 2)
+os.environ.setdefault("OMP_NUM_THREADS", str(CPU_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(CPU_THREADS))
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
 import cv2
 import numpy as np
 import psutil
 import requests
+from requests.adapters import HTTPAdapter
 import torch
-from flask import Flask, Response, render_template_string, jsonify
+import torch.nn.functional as F
+from flask import Flask, Response, jsonify, request
+
+from jit_utils import letterbox_chw, motion_area
+from src.vespai.sms.lox24 import lox24_retry
 
 # Fix PyTorch 2.6+ weights_only issue
 original_load = torch.load
@@ -64,6 +100,7 @@ LOX24_API_KEY = os.getenv("LOX24_API_KEY", "")  # Customer Number:API v2 Key
 LOX24_SENDER = os.getenv("LOX24_SENDER", "VespAI")  # Sender name that appears on SMS
 PHONE_NUMBER = "+41793484504" #os.getenv("PHONE_NUMBER", "")  # Target phone number for alerts
 SMS_DELAY_MINUTES = int(os.getenv("SMS_DELAY_MINUTES", "5"))  # Minimum delay between SMS messages in minutes
+SMS_BURST = max(1, int(os.getenv("SMS_BURST", "1")))  # SMS allowed back-to-back before the delay applies
 
 # Web server configuration for SMS links
 DOMAIN_NAME = os.getenv("DOMAIN_NAME", "localhost")  # Your domain name
@@ -73,6 +110,9 @@ PUBLIC_URL = f"https://{DOMAIN_NAME}" if USE_HTTPS else f"http://{DOMAIN_NAME}"
 # Model configuration
 MODEL_PATH = os.getenv("MODEL_PATH", "models/yolov5s-all-data.pt")  # Path to YOLOv5 model
 
+# Web server: "waitress" (production WSGI server) or "flask" (development server)
+WSGI_SERVER = os.getenv("WSGI_SERVER", "waitress").lower()
+
 # Validate critical configuration
 if not LOX24_API_KEY and os.getenv("ENABLE_SMS", "true").lower() == "true":
     print("WARNING: LOX24_API_KEY not set - SMS alerts disabled")
@@ -81,38 +121,130 @@ if not PHONE_NUMBER and os.getenv("ENABLE_SMS", "true").lower() == "true":
 
 # ───────────────────────── Flask Web Server ─────────────────────────
 app = Flask(__name__)
-web_frame = None
+app.json.sort_keys = False  # Key order doesn't matter to the dashboard
 web_lock = threading.Lock()
+# Double-buffered stream frame: the detection loop resizes into the inactive
+# buffer and then flips web_idx, so it never waits on an encode. After one
+# flip the producer starts writing into the buffer a reader may still be
+# encoding, so readers copy the active buffer under the lock (once per frame,
+# as the framed part is shared across clients).
+WEB_FRAME_SIZE = (960, 540)
+web_frames = [np.zeros((WEB_FRAME_SIZE[1], WEB_FRAME_SIZE[0], 3), dtype=np.uint8)
+              for _ in range(2)]
+web_idx = 0
+# Notified whenever the detection loop publishes a new frame
+web_frame_cond = threading.Condition(web_lock)
+web_frame_seq = 0
+
+STREAM_JPEG_QUALITY = 70
+# Lowered by the stats refresher while the CPU is busy, see stream_quality_for_load
+stream_jpeg_quality = STREAM_JPEG_QUALITY
+
+
+def stream_quality_for_load(cpu_percent):
+    """Pick the stream JPEG quality so encoding takes less CPU from detection under load"""
+    if cpu_percent < 60:
+        return STREAM_JPEG_QUALITY
+    if cpu_percent < 85:
+        return STREAM_JPEG_QUALITY - 10
+    return STREAM_JPEG_QUALITY - 20
+
+
+def encode_stream_jpeg(frame):
+    """Encode a BGR frame for the MJPEG stream, via libjpeg-turbo when available"""
+    quality = stream_jpeg_quality
+    if simplejpeg is not None:
+        return simplejpeg.encode_jpeg(frame, quality=quality,
+                                      colorspace='BGR', fastdct=True)
+    flag, encoded = cv2.imencode(".jpg", frame,
+                                 [cv2.IMWRITE_JPEG_QUALITY, quality,
+                                  cv2.IMWRITE_JPEG_OPTIMIZE, 0])
+    return encoded.tobytes() if flag else None
 
 # Real-time statistics
-stats = {
-    "frame_id": 0,
-    "total_velutina": 0,
-    "total_crabro": 0,
-    "total_detections": 0,
-    "fps": 0,
-    "last_detection_time": None,
-    "start_time": datetime.datetime.now(),
-    "detection_log": deque(maxlen=20),  # Keep last 20 detections
-    "hourly_stats": deque(maxlen=24),  # Keep last 24 hours
-    "cpu_temp": 0,
-    "cpu_usage": 0,
-    "ram_usage": 0,
-    "disk_usage": 0,
-    "uptime": 0,
-    "saved_images": 0,
-    "sms_sent": 0,
-    "sms_cost": 0.0,  # Track total SMS costs in EUR
-    "confidence_avg": 0,
-    "detection_history": [],  # For chart data
-    "detection_frames": {},  # Store frames for each detection
-    "last_sms_time": None  # Track last SMS sent time for delay
-}
-
-# Track detections per hour
+# Only the most recent detection frames are kept, so memory stays flat with uptime
+MAX_DETECTION_FRAMES = 20
+
+
+class DetectionFrameStore(OrderedDict):
+    """Most recent detection frames; storing past maxsize evicts the oldest"""
+
+    def __init__(self, maxsize=MAX_DETECTION_FRAMES):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+class Stats:
+    """Real-time statistics shared by the detection loop and the web server"""
+    # Plain int attributes: a Python int increment is cheaper than a numpy
+    # scalar update, and single attribute writes are atomic under the GIL
+    __slots__ = ("frame_id", "total_velutina", "total_crabro", "total_detections", "fps",
+                 "start_mono", "detection_log", "disk_usage",
+                 "saved_images", "sms_sent", "sms_cost", "confidence_avg",
+                 "detection_frames", "last_sms_time", "sms_tokens", "sms_refill_mono")
+
+    def __init__(self):
+        self.frame_id = 0
+        self.total_velutina = 0
+        self.total_crabro = 0
+        self.total_detections = 0
+        self.fps = 0
+        self.start_mono = time.monotonic()
+        self.detection_log = deque(maxlen=20)  # Keep last 20 detections
+        self.disk_usage = 0
+        self.saved_images = 0
+        self.sms_sent = 0
+        self.sms_cost = 0.0  # Track total SMS costs in EUR
+        self.confidence_avg = 0
+        self.detection_frames = DetectionFrameStore()  # Last MAX_DETECTION_FRAMES detection frames
+        self.last_sms_time = None  # Wall-clock time of the last SMS, for display
+        self.sms_tokens = float(SMS_BURST)  # SMS rate-limit token bucket
+        self.sms_refill_mono = self.start_mono  # Monotonic time the bucket was last refilled
+
+
+stats = Stats()
+
+# Model class ids
+CRABRO, VELUTINA = 0, 1
+
+# Track detections per hour; dict increments beat numpy scalar updates here
 hourly_detections = {hour: {"velutina": 0, "crabro": 0} for hour in range(24)}
 current_hour = datetime.datetime.now().hour
 
+# Ring buffer of individual detections, preallocated so the detection loop
+# never allocates Python objects for history bookkeeping
+DETECTION_HISTORY_SIZE = 10000
+detection_history = np.zeros(DETECTION_HISTORY_SIZE,
+                             dtype=[('ts', 'i8'), ('cls', 'u1'), ('conf', 'f4')])
+detection_history_head = 0
+
+
+def record_detections(preds, ts):
+    """Append the velutina/crabro rows of an (N, 6) prediction array to the history ring"""
+    global detection_history_head
+
+    preds = preds[(preds[:, 5] == 0) | (preds[:, 5] == 1)]
+    idx = (detection_history_head + np.arange(len(preds))) % DETECTION_HISTORY_SIZE
+    detection_history['ts'][idx] = ts
+    detection_history['cls'][idx] = preds[:, 5]
+    detection_history['conf'][idx] = preds[:, 4]
+    detection_history_head += len(preds)
+
+
+def last_detection_time(cls):
+    """Return the HH:MM:SS time of the most recent detection of a class, or None"""
+    recorded = detection_history[:min(detection_history_head, DETECTION_HISTORY_SIZE)]
+    ts = recorded['ts'][recorded['cls'] == cls]
+    if not len(ts):
+        return None
+    return time.strftime("%H:%M:%S", time.localtime(int(ts.max())))
+
 HTML_TEMPLATE = '''
 <!DOCTYPE html>
 <html lang="de">
@@ -1198,151 +1330,154 @@ HTML_TEMPLATE = '''
             }
         }
 
-        // Fetch live stats
-        function updateStats() {
-            fetch('/api/stats')
-                .then(response => response.json())
-                .then(data => {
-                    // Update counters with animation
-                    updateValue('frame-count', data.frame_id);
-                    updateValue('velutina-count', data.total_velutina);
-                    updateValue('crabro-count', data.total_crabro);
-                    updateValue('total-detections', data.total_detections);
-                    updateValue('sms-count', data.sms_sent);
-                    
-                    // Update SMS cost
-                    if (data.sms_cost !== undefined) {
-                        document.getElementById('sms-cost').textContent = data.sms_cost.toFixed(2) + '€';
-                        if (data.sms_sent > 0) {
-                            const costPerSms = (data.sms_cost / data.sms_sent).toFixed(3);
-                            document.getElementById('cost-per-sms').textContent = costPerSms + '€/SMS';
-                        }
-                    }
+        // Render one stats snapshot
+        function renderStats(data) {
+            // Update counters with animation
+            updateValue('frame-count', data.frame_id);
+            updateValue('velutina-count', data.total_velutina);
+            updateValue('crabro-count', data.total_crabro);
+            updateValue('total-detections', data.total_detections);
+            updateValue('sms-count', data.sms_sent);
+            
+            // Update SMS cost
+            if (data.sms_cost !== undefined) {
+                document.getElementById('sms-cost').textContent = data.sms_cost.toFixed(2) + '€';
+                if (data.sms_sent > 0) {
+                    const costPerSms = (data.sms_cost / data.sms_sent).toFixed(3);
+                    document.getElementById('cost-per-sms').textContent = costPerSms + '€/SMS';
+                }
+            }
 
-                    // Update other stats
-                    document.getElementById('fps').textContent = data.fps.toFixed(1) + ' FPS';
-                    document.getElementById('uptime').textContent = 'Uptime: ' + data.uptime;
-                    document.getElementById('cpu-temp').textContent = data.cpu_temp + '°C';
-                    document.getElementById('cpu-usage').textContent = data.cpu_usage + '%';
-                    document.getElementById('ram-usage').textContent = data.ram_usage + '%';
+            // Update other stats
+            document.getElementById('fps').textContent = data.fps.toFixed(1) + ' FPS';
+            document.getElementById('uptime').textContent = 'Uptime: ' + data.uptime;
+            document.getElementById('cpu-temp').textContent = data.cpu_temp + '°C';
+            document.getElementById('cpu-usage').textContent = data.cpu_usage + '%';
+            document.getElementById('ram-usage').textContent = data.ram_usage + '%';
 
-                    if (data.confidence_avg) {
-                        document.getElementById('confidence').textContent = data.confidence_avg.toFixed(0) + '%';
-                    }
+            if (data.confidence_avg) {
+                document.getElementById('confidence').textContent = data.confidence_avg.toFixed(0) + '%';
+            }
 
-                    // Update detection rate
-                    if (data.detection_rate !== undefined) {
-                        document.getElementById('detection-rate').textContent = data.detection_rate + '/h';
-                    }
+            // Update detection rate
+            if (data.detection_rate !== undefined) {
+                document.getElementById('detection-rate').textContent = data.detection_rate + '/h';
+            }
 
-                    // Update last detection times
-                    if (data.last_velutina) {
-                        document.getElementById('velutina-last').textContent = 'Last: ' + data.last_velutina;
-                    }
-                    if (data.last_crabro) {
-                        document.getElementById('crabro-last').textContent = 'Last: ' + data.last_crabro;
-                    }
-                    if (data.last_sms) {
-                        document.getElementById('last-sms').textContent = 'Last: ' + data.last_sms;
-                    }
+            // Update last detection times
+            if (data.last_velutina) {
+                document.getElementById('velutina-last').textContent = 'Last: ' + data.last_velutina;
+            }
+            if (data.last_crabro) {
+                document.getElementById('crabro-last').textContent = 'Last: ' + data.last_crabro;
+            }
+            if (data.last_sms) {
+                document.getElementById('last-sms').textContent = 'Last: ' + data.last_sms;
+            }
 
-                    // Update log without flickering
-                    if (data.detection_log) {
-                        updateLog(data.detection_log);
-                    }
+            // Update log without flickering
+            if (data.detection_log) {
+                updateLog(data.detection_log);
+            }
 
-                    // Update hourly chart only every 10 seconds to prevent flickering
-                    const now = Date.now();
-                    if (data.hourly_stats && (now - lastChartUpdate > 10000)) {
-                        lastChartUpdate = now;
-                        const chart = document.getElementById('hourly-chart');
-                        chart.innerHTML = '';
+            // Update hourly chart only every 10 seconds to prevent flickering
+            const now = Date.now();
+            if (data.hourly_stats && (now - lastChartUpdate > 10000)) {
+                lastChartUpdate = now;
+                const chart = document.getElementById('hourly-chart');
+                chart.innerHTML = '';
+                
+                // Check if we're on mobile (viewport width < 640px)
+                const isMobile = window.innerWidth < 640;
+                
+                if (isMobile) {
+                    // Group hours into 6 bars (4 hours each) for mobile
+                    const groupedStats = [];
+                    const groups = [
+                        { label: '1-4h', hours: [] },
+                        { label: '5-8h', hours: [] },
+                        { label: '9-12h', hours: [] },
+                        { label: '13-16h', hours: [] },
+                        { label: '17-20h', hours: [] },
+                        { label: '21-24h', hours: [] }
+                    ];
+                    
+                    // Group the hourly data
+                    data.hourly_stats.forEach(hour => {
+                        const groupIndex = Math.floor(hour.hour / 4);
+                        if (groupIndex >= 0 && groupIndex < 6) {
+                            if (!groups[groupIndex].hours) groups[groupIndex].hours = [];
+                            groups[groupIndex].hours.push(hour);
+                        }
+                    });
+                    
+                    // Calculate totals for each group
+                    groups.forEach(group => {
+                        const totalVelutina = group.hours.reduce((sum, h) => sum + (h.velutina || 0), 0);
+                        const totalCrabro = group.hours.reduce((sum, h) => sum + (h.crabro || 0), 0);
+                        groupedStats.push({
+                            label: group.label,
+                            velutina: totalVelutina,
+                            crabro: totalCrabro,
+                            total: totalVelutina + totalCrabro
+                        });
+                    });
+                    
+                    const maxVal = Math.max(...groupedStats.map(g => g.total), 1);
+                    
+                    groupedStats.forEach(group => {
+                        const bar = document.createElement('div');
+                        bar.className = 'time-bar';
+                        const height = Math.max(((group.total / maxVal) * 100), 2);
+                        bar.style.height = height + '%';
                         
-                        // Check if we're on mobile (viewport width < 640px)
-                        const isMobile = window.innerWidth < 640;
+                        if (group.velutina > 0 && group.crabro > 0) {
+                            bar.style.background = 'linear-gradient(180deg, var(--danger) 0%, var(--honey) 100%)';
+                        } else if (group.velutina > 0) {
+                            bar.style.background = 'linear-gradient(180deg, var(--danger) 0%, #ff0066 100%)';
+                        } else if (group.crabro > 0) {
+                            bar.style.background = 'linear-gradient(180deg, var(--honey) 0%, var(--honey-dark) 100%)';
+                        } else {
+                            bar.style.background = 'rgba(255,255,255,0.1)';
+                        }
                         
-                        if (isMobile) {
-                            // Group hours into 6 bars (4 hours each) for mobile
-                            const groupedStats = [];
-                            const groups = [
-                                { label: '1-4h', hours: [] },
-                                { label: '5-8h', hours: [] },
-                                { label: '9-12h', hours: [] },
-                                { label: '13-16h', hours: [] },
-                                { label: '17-20h', hours: [] },
-                                { label: '21-24h', hours: [] }
-                            ];
-                            
-                            // Group the hourly data
-                            data.hourly_stats.forEach(hour => {
-                                const groupIndex = Math.floor(hour.hour / 4);
-                                if (groupIndex >= 0 && groupIndex < 6) {
-                                    if (!groups[groupIndex].hours) groups[groupIndex].hours = [];
-                                    groups[groupIndex].hours.push(hour);
-                                }
-                            });
-                            
-                            // Calculate totals for each group
-                            groups.forEach(group => {
-                                const totalVelutina = group.hours.reduce((sum, h) => sum + (h.velutina || 0), 0);
-                                const totalCrabro = group.hours.reduce((sum, h) => sum + (h.crabro || 0), 0);
-                                groupedStats.push({
-                                    label: group.label,
-                                    velutina: totalVelutina,
-                                    crabro: totalCrabro,
-                                    total: totalVelutina + totalCrabro
-                                });
-                            });
-                            
-                            const maxVal = Math.max(...groupedStats.map(g => g.total), 1);
-                            
-                            groupedStats.forEach(group => {
-                                const bar = document.createElement('div');
-                                bar.className = 'time-bar';
-                                const height = Math.max(((group.total / maxVal) * 100), 2);
-                                bar.style.height = height + '%';
-                                
-                                if (group.velutina > 0 && group.crabro > 0) {
-                                    bar.style.background = 'linear-gradient(180deg, var(--danger) 0%, var(--honey) 100%)';
-                                } else if (group.velutina > 0) {
-                                    bar.style.background = 'linear-gradient(180deg, var(--danger) 0%, #ff0066 100%)';
-                                } else if (group.crabro > 0) {
-                                    bar.style.background = 'linear-gradient(180deg, var(--honey) 0%, var(--honey-dark) 100%)';
-                                } else {
-                                    bar.style.background = 'rgba(255,255,255,0.1)';
-                                }
-                                
-                                bar.innerHTML = `<span class="time-bar-label">${group.label}</span>`;
-                                bar.title = `${group.label} - Velutina: ${group.velutina}, Crabro: ${group.crabro}`;
-                                chart.appendChild(bar);
-                            });
+                        bar.innerHTML = `<span class="time-bar-label">${group.label}</span>`;
+                        bar.title = `${group.label} - Velutina: ${group.velutina}, Crabro: ${group.crabro}`;
+                        chart.appendChild(bar);
+                    });
+                } else {
+                    // Desktop view - show all 24 hours
+                    const maxVal = Math.max(...data.hourly_stats.map(h => h.total), 1);
+                    
+                    data.hourly_stats.forEach(hour => {
+                        const bar = document.createElement('div');
+                        bar.className = 'time-bar';
+                        const height = Math.max(((hour.total / maxVal) * 100), 2);
+                        bar.style.height = height + '%';
+
+                        if (hour.velutina > 0 && hour.crabro > 0) {
+                            bar.style.background = 'linear-gradient(180deg, var(--danger) 0%, var(--honey) 100%)';
+                        } else if (hour.velutina > 0) {
+                            bar.style.background = 'linear-gradient(180deg, var(--danger) 0%, #ff0066 100%)';
+                        } else if (hour.crabro > 0) {
+                            bar.style.background = 'linear-gradient(180deg, var(--honey) 0%, var(--honey-dark) 100%)';
                         } else {
-                            // Desktop view - show all 24 hours
-                            const maxVal = Math.max(...data.hourly_stats.map(h => h.total), 1);
-                            
-                            data.hourly_stats.forEach(hour => {
-                                const bar = document.createElement('div');
-                                bar.className = 'time-bar';
-                                const height = Math.max(((hour.total / maxVal) * 100), 2);
-                                bar.style.height = height + '%';
-
-                                if (hour.velutina > 0 && hour.crabro > 0) {
-                                    bar.style.background = 'linear-gradient(180deg, var(--danger) 0%, var(--honey) 100%)';
-                                } else if (hour.velutina > 0) {
-                                    bar.style.background = 'linear-gradient(180deg, var(--danger) 0%, #ff0066 100%)';
-                                } else if (hour.crabro > 0) {
-                                    bar.style.background = 'linear-gradient(180deg, var(--honey) 0%, var(--honey-dark) 100%)';
-                                } else {
-                                    bar.style.background = 'rgba(255,255,255,0.1)';
-                                }
-
-                                bar.innerHTML = `<span class="time-bar-label">${hour.hour}h</span>`;
-                                bar.title = `${hour.hour}:00 - Velutina: ${hour.velutina}, Crabro: ${hour.crabro}`;
-                                chart.appendChild(bar);
-                            });
+                            bar.style.background = 'rgba(255,255,255,0.1)';
                         }
-                    }
-                })
+
+                        bar.innerHTML = `<span class="time-bar-label">${hour.hour}h</span>`;
+                        bar.title = `${hour.hour}:00 - Velutina: ${hour.velutina}, Crabro: ${hour.crabro}`;
+                        chart.appendChild(bar);
+                    });
+                }
+            }
+        }
+
+        // Fetch live stats once, for browsers without EventSource
+        function updateStats() {
+            fetch('/api/stats')
+                .then(response => response.json())
+                .then(renderStats)
                 .catch(error => {
                     console.error('Error fetching stats:', error);
                 });
@@ -1376,41 +1511,82 @@ HTML_TEMPLATE = '''
             }
         }
 
-        // Update stats every 2 seconds
-        setInterval(updateStats, 2000);
-        updateStats();
+        // Stats are pushed by the server; fall back to polling every 2 seconds
+        if (window.EventSource) {
+            const statsSource = new EventSource('/api/stats_stream');
+            statsSource.onmessage = event => renderStats(JSON.parse(event.data));
+        } else {
+            setInterval(updateStats, 2000);
+            updateStats();
+        }
     </script>
 </body>
 </html>
 '''
 
+# The dashboard page is static, so encode and compress it once at startup
+INDEX_HTML = HTML_TEMPLATE.encode('utf-8')
+INDEX_HTML_GZ = gzip.compress(INDEX_HTML, compresslevel=9)
+
 
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        return Response(INDEX_HTML_GZ, headers={'Content-Encoding': 'gzip',
+                                                'Content-Type': 'text/html; charset=utf-8',
+                                                'Vary': 'Accept-Encoding'})
+    return Response(INDEX_HTML, mimetype='text/html')
+
+
+# Multipart header and trailer around every JPEG in the /video_feed stream
+MJPEG_FRAME_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+MJPEG_FRAME_TAIL = b'\r\n'
+
+# Last stream frame as (seq, complete multipart part), shared by all stream clients
+web_part = (0, None)
+web_part_lock = threading.Lock()
+
+
+def latest_stream_part():
+    """Return (seq, part) for the newest web frame, encoding and framing each frame only once"""
+    global web_part
+    with web_part_lock:
+        with web_frame_cond:
+            seq = web_frame_seq
+            frame = web_frames[web_idx].copy() if web_part[0] != seq else None
+        if frame is not None:
+            jpeg = encode_stream_jpeg(frame)
+            part = MJPEG_FRAME_HEADER + jpeg + MJPEG_FRAME_TAIL if jpeg is not None else None
+            web_part = (seq, part)
+        return web_part
 
 
 @app.route('/video_feed')
 def video_feed():
     def generate():
-        global web_frame
+        last_seq = -1
+        part = None
         while True:
-            with web_lock:
-                if web_frame is None:
-                    continue
-                frame = web_frame.copy()
-
-            # Höhere Qualität und keine zusätzliche Verzögerung
-            (flag, encodedImage) = cv2.imencode(".jpg", frame,
-                                                [cv2.IMWRITE_JPEG_QUALITY, 85])
-            if not flag:
+            # Sleep until the detection loop publishes a new frame instead of
+            # re-encoding the same one in a busy loop
+            with web_frame_cond:
+                web_frame_cond.wait_for(lambda: web_frame_seq != last_seq,
+                                        timeout=1.0)
+                has_new_frame = web_frame_seq not in (0, last_seq)
+
+            if has_new_frame:
+                last_seq, part = latest_stream_part()
+            # Otherwise re-send the last part as a keep-alive, without encoding
+            if part is None:
                 continue
 
-            yield (b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' +
-                   bytearray(encodedImage) + b'\r\n')
+            # The shared part is yielded as is, without a per-client copy
+            yield part
 
+    # Parts are already complete bytes, so Werkzeug passes them through unwrapped
     return Response(generate(),
-                    mimetype='multipart/x-mixed-replace; boundary=frame')
+                    mimetype='multipart/x-mixed-replace; boundary=frame',
+                    direct_passthrough=True)
 
 
 @app.route('/api/detection_frame/<frame_id>')
@@ -1418,10 +1594,10 @@ def get_detection_frame(frame_id):
     """Return a specific detection frame"""
     global stats
 
-    if frame_id in stats["detection_frames"]:
-        frame = stats["detection_frames"][frame_id]
-        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        response = Response(buffer.tobytes(), mimetype='image/jpeg')
+    if frame_id in stats.detection_frames:
+        # Stored JPEG-encoded at detection time; frame ids never change content
+        response = Response(stats.detection_frames[frame_id], mimetype='image/jpeg')
+        response.headers['Cache-Control'] = 'public, max-age=86400'
         return response
     else:
         return "Frame not found", 404
@@ -1433,12 +1609,9 @@ def serve_detection_frame(frame_id):
     global stats
 
     print(f"[DEBUG] Requested frame_id: {frame_id}")
-    print(f"[DEBUG] Available frames: {list(stats['detection_frames'].keys())}")
+    print(f"[DEBUG] Available frames: {list(stats.detection_frames.keys())}")
 
-    if frame_id in stats["detection_frames"]:
-        frame = stats["detection_frames"][frame_id]
-        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
-        
+    if frame_id in stats.detection_frames:
         # Create HTML page with the image
         html_content = f'''
 <!DOCTYPE html>
@@ -1526,7 +1699,7 @@ def serve_detection_frame(frame_id):
         '''
         return html_content
     else:
-        return f"Frame not found. Available frames: {list(stats['detection_frames'].keys())}", 404
+        return f"Frame not found. Available frames: {list(stats.detection_frames.keys())}", 404
 
 
 @app.route('/api/frames')
@@ -1534,32 +1707,120 @@ def list_frames():
     """List all available detection frames for debugging"""
     global stats
     return jsonify({
-        "available_frames": list(stats["detection_frames"].keys()),
-        "frame_count": len(stats["detection_frames"])
+        "available_frames": list(stats.detection_frames.keys()),
+        "frame_count": len(stats.detection_frames)
     })
 
 
+def dumps_json(obj) -> bytes:
+    """Serialize to JSON bytes, using orjson when it is installed"""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+# Serialized /api/stats body, rebuilt by the stats refresher thread so that
+# dashboard polls and streams only hand out bytes. Rebinding is atomic under
+# the GIL; stats_json_cond wakes /api/stats_stream clients after each rebuild.
+STATS_REFRESH_INTERVAL = 1.0  # also the fastest /api/stats_stream push rate
+cached_stats_json = None
+stats_json_seq = 0
+stats_json_cond = threading.Condition()
+
+
+def refresh_stats_json():
+    """Rebuild the cached /api/stats response body and adapt the stream quality"""
+    global cached_stats_json, stats_json_seq, stream_jpeg_quality
+    current = build_stats()
+    stream_jpeg_quality = stream_quality_for_load(current["cpu_usage"])
+    body = dumps_json(current)
+    with stats_json_cond:
+        # Streams are only woken when something they would show has changed
+        if body != cached_stats_json:
+            cached_stats_json = body
+            stats_json_seq += 1
+            stats_json_cond.notify_all()
+
+
+def stats_refresher():
+    """Keep the cached /api/stats body fresh in the background"""
+    while True:
+        try:
+            refresh_stats_json()
+        except Exception as e:
+            logger.error(f"Stats refresh error: {e}")
+        time.sleep(STATS_REFRESH_INTERVAL)
+
+
 @app.route('/api/stats')
 def api_stats():
     """Return current statistics as JSON"""
+    if cached_stats_json is None:
+        refresh_stats_json()
+    return Response(cached_stats_json, mimetype='application/json')
+
+
+@app.route('/api/stats_stream')
+def api_stats_stream():
+    """Push each changed /api/stats body as a Server-Sent Event, at most once per refresh"""
+    def generate():
+        last_seq = -1
+        while True:
+            with stats_json_cond:
+                stats_json_cond.wait_for(lambda: stats_json_seq != last_seq,
+                                         timeout=15.0)
+                if stats_json_seq == last_seq:
+                    body = None
+                else:
+                    last_seq, body = stats_json_seq, cached_stats_json
+            if body is None:
+                # A comment line keeps idle connections from timing out
+                yield b': ping\n\n'
+            else:
+                yield b'data: ' + body + b'\n\n'
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# CPU temperature sensor (Raspberry Pi), opened once and re-read at offset 0
+try:
+    thermal_file = open('/sys/class/thermal/thermal_zone0/temp', 'rb', buffering=0)
+except OSError:
+    thermal_file = None
+
+
+def read_cpu_temp():
+    """Return the CPU temperature in °C without reopening the sysfs file, or 0"""
+    if thermal_file is None:
+        return 0
+    try:
+        return int(os.pread(thermal_file.fileno(), 16, 0)) / 1000
+    except (OSError, ValueError):
+        return 0
+
+
+def build_stats():
+    """Collect current statistics for the dashboard"""
     global stats, hourly_detections
 
+    frame_id, total_velutina, total_crabro = stats.frame_id, stats.total_velutina, stats.total_crabro
+    total_detections, fps = stats.total_detections, stats.fps
+
     # Calculate uptime
-    uptime = datetime.datetime.now() - stats["start_time"]
-    hours, remainder = divmod(uptime.seconds, 3600)
-    minutes, _ = divmod(remainder, 60)
+    uptime = int(time.monotonic() - stats.start_mono)
+    hours, remainder = divmod(uptime, 3600)
+    minutes = remainder // 60
 
     # Get system stats
-    try:
-        cpu_temp = int(
-            open('/sys/class/thermal/thermal_zone0/temp').read()) / 1000
-    except:
-        cpu_temp = 0
+    cpu_temp = read_cpu_temp()
 
     # Calculate detection rate (per hour)
-    if uptime.seconds > 0:
+    if uptime > 0:
         detection_rate = round(
-            (stats["total_detections"] / (uptime.seconds / 3600)), 1)
+            (total_detections / (uptime / 3600)), 1)
     else:
         detection_rate = 0
 
@@ -1568,62 +1829,76 @@ def api_stats():
     current_hour = datetime.datetime.now().hour
     for i in range(24):
         hour = (current_hour - 23 + i) % 24
+        counts = hourly_detections[hour]
+        velutina, crabro = counts["velutina"], counts["crabro"]
         hourly_stats.append({
             "hour": hour,
-            "velutina": hourly_detections[hour]["velutina"],
-            "crabro": hourly_detections[hour]["crabro"],
-            "total": hourly_detections[hour]["velutina"] +
-                     hourly_detections[hour]["crabro"]
+            "velutina": velutina,
+            "crabro": crabro,
+            "total": velutina + crabro
         })
 
     # Get last detection times
-    last_velutina = None
-    last_crabro = None
+    last_velutina = last_detection_time(VELUTINA)
+    last_crabro = last_detection_time(CRABRO)
     last_sms = None
 
-    for entry in reversed(list(stats["detection_log"])):
-        if not last_velutina and "velutina" in entry.get("type", ""):
-            last_velutina = entry["time"].split(" ")[1] if " " in entry[
-                "time"] else entry["time"]
-        if not last_crabro and "crabro" in entry.get("type", ""):
-            last_crabro = entry["time"].split(" ")[1] if " " in entry[
-                "time"] else entry["time"]
-        if last_velutina and last_crabro:
-            break
-
-    return jsonify({
-        "frame_id": stats["frame_id"],
-        "total_velutina": stats["total_velutina"],
-        "total_crabro": stats["total_crabro"],
-        "total_detections": stats["total_detections"],
-        "fps": stats["fps"],
+    return {
+        "frame_id": frame_id,
+        "total_velutina": total_velutina,
+        "total_crabro": total_crabro,
+        "total_detections": total_detections,
+        "fps": fps,
         "uptime": f"{hours}h {minutes}m",
-        "saved_images": stats["saved_images"],
-        "sms_sent": stats["sms_sent"],
-        "sms_cost": stats["sms_cost"],
+        "saved_images": stats.saved_images,
+        "sms_sent": stats.sms_sent,
+        "sms_cost": stats.sms_cost,
         "cpu_temp": round(cpu_temp, 1),
-        "cpu_usage": psutil.cpu_percent(),
+        "cpu_usage": psutil.cpu_percent(interval=None),
         "ram_usage": psutil.virtual_memory().percent,
-        "disk_usage": stats["disk_usage"],
+        "disk_usage": stats.disk_usage,
         "detection_rate": detection_rate,
-        "detection_log": list(stats["detection_log"]),
+        "detection_log": list(stats.detection_log),
         "hourly_stats": hourly_stats,
         "last_velutina": last_velutina,
         "last_crabro": last_crabro,
         "last_sms": last_sms,
-        "confidence_avg": round(stats["confidence_avg"], 1) if stats[
-                                                                   "confidence_avg"] > 0 else 80
-    })
+        "confidence_avg": round(stats.confidence_avg, 1) if stats.confidence_avg > 0 else 80
+    }
 
 
 def start_web_server():
     """Start Flask web server in background thread"""
+    # Prime psutil's CPU counters so the first refresh reports real usage
+    psutil.cpu_percent(interval=None)
+    threading.Thread(target=stats_refresher, daemon=True).start()
     print("Starting web server on http://0.0.0.0:5000")
-    app.run(host='0.0.0.0', port=5000, threaded=True, debug=False)
+
+    # Each open /video_feed or /api/stats_stream pins one worker thread, so
+    # use a real thread-pooled WSGI server with a connection cap instead of
+    # Werkzeug's development server
+    serve = None
+    if WSGI_SERVER != "flask":
+        try:
+            from waitress import serve
+        except ImportError:
+            print("waitress not installed - falling back to Flask development server")
+
+    if serve is None:
+        app.run(host='0.0.0.0', port=5000, threaded=True, debug=False)
+        return
+
+    serve(app, host='0.0.0.0', port=5000, threads=16, connection_limit=64,
+          channel_timeout=60)
 
 
 # ────────────────  Lox24 SMS API  ──────────────────────────
 
+try:
+    from sms_config import COST_OVERRIDE as SMS_COST_OVERRIDE
+except ImportError:
+    SMS_COST_OVERRIDE = None  # sms_config not available, use API cost
+
 class Lox24SMS:
     def __init__(self, api_key: str, sender_name: str = "VespAI"):
         # For Lox24, we need to split the credentials
@@ -1640,6 +1915,23 @@ class Lox24SMS:
             self.username = ""
             self.password = api_key
 
+        # One keep-alive session, so bursts of alerts reuse the TLS connection
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+            'X-LOX24-AUTH-TOKEN': self.api_key,
+        })
+        # Same retry policy as the packaged client: connection and gateway
+        # errors only, never a read timeout that may already have sent the SMS
+        retries = lox24_retry()
+        self.session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=4,
+                                                   max_retries=retries))
+
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.session.close()
+
     def send_sms(self, to: str, message: str):
         if not self.sms_available:
             print(f"[SMS disabled] Would send: {message}")
@@ -1661,16 +1953,11 @@ class Lox24SMS:
                 'voice_lang': 'DE'
             }
 
-            headers = {
-                'Accept': 'application/json',
-                'Content-Type': 'application/json',
-                'X-LOX24-AUTH-TOKEN': self.api_key,  # Use the token part
-            }
-
             print("Post data : ", json.dumps(data, indent=4))
 
-            # timeout is 100 seconds, the payload is automatically converted to json format
-            res = requests.post(url, headers=headers, json=data, timeout=100)
+            # 5 s to connect, 15 s to answer; the payload is automatically converted
+            # to json format and auth and content headers are set on the session
+            res = self.session.post(url, json=data, timeout=(5, 15))
             if res.status_code != 201:  # Created
                 print("Error: Wrong response code on create sms")
                 if res.status_code == 400:
@@ -1704,14 +1991,9 @@ class Lox24SMS:
                     cost = float(response_data['total_price'])
                 
                 # Check for cost override from config
-                try:
-                    from sms_config import get_cost_override
-                    cost_override = get_cost_override()
-                    if cost_override is not None:
-                        cost = float(cost_override)
-                        print(f"  Using cost override: {cost:.3f}€ (API returned: {response_data.get('price', 'N/A')})")
-                except ImportError:
-                    pass  # sms_config not available, use API cost
+                if SMS_COST_OVERRIDE is not None:
+                    cost = float(SMS_COST_OVERRIDE)
+                    print(f"  Using cost override: {cost:.3f}€ (API returned: {response_data.get('price', 'N/A')})")
                 
                 return True, cost
 
@@ -1724,6 +2006,7 @@ lox24_client = None
 print(f"Initializing Lox24 SMS with API key: {LOX24_API_KEY[:10]}...")
 try:
     lox24_client = Lox24SMS(api_key=LOX24_API_KEY, sender_name=LOX24_SENDER)
+    atexit.register(lox24_client.close)
     print(f"Lox24 client created. SMS available: {lox24_client.sms_available}")
     if lox24_client.sms_available:
         print("✓ Lox24 SMS module initialized successfully")
@@ -1734,40 +2017,88 @@ except Exception as e:
     lox24_client = None
 
 
-def send_sms_with_delay(text: str, force: bool = False):
-    """Send SMS with rate limiting - minimum delay between messages"""
-    global stats
+# A single worker keeps SMS order and takes the HTTP round trip off the
+# detection loop; sms_lock guards the rate-limit and SMS stats fields
+SMS_REFILL_PER_SEC = 1.0 / (SMS_DELAY_MINUTES * 60) if SMS_DELAY_MINUTES > 0 else None
+sms_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sms")
+sms_lock = threading.Lock()
+atexit.register(sms_executor.shutdown, wait=False)
 
-    # Check if SMS is disabled
-    if os.getenv("ENABLE_SMS", "true").lower() != "true":
-        logger.info(f"[SMS disabled] Would send: {text}")
-        return False
 
+def _sms_unavailable_reason():
+    """Return why SMS can't be sent at all, or None when it can"""
+    if os.getenv("ENABLE_SMS", "true").lower() != "true":
+        return "SMS disabled"
     if not lox24_client:
-        logger.warning(f"[SMS client unavailable] Would send: {text}")
-        return False
-
+        return "SMS client unavailable"
     if not LOX24_API_KEY or not PHONE_NUMBER:
-        logger.warning(f"[SMS not configured] Would send: {text}")
-        return False
+        return "SMS not configured"
+    return None
+
+
+def _log_sms_unavailable(reason, text):
+    """Log an SMS that was not sent because SMS is off or not configured"""
+    log = logger.info if reason == "SMS disabled" else logger.warning
+    log(f"[{reason}] Would send: {text}")
+
+
+def _take_sms_token():
+    """Take a rate-limit token, returning 0.0 or the seconds until one is due
+
+    Token bucket: SMS_BURST alerts at once, then one per SMS_DELAY_MINUTES.
+    The caller holds sms_lock.
+    """
+    now = time.monotonic()
+    tokens = min(SMS_BURST, stats.sms_tokens + (now - stats.sms_refill_mono) * SMS_REFILL_PER_SEC)
+    stats.sms_refill_mono = now
+    if tokens < 1.0:
+        stats.sms_tokens = tokens
+        return (1.0 - tokens) / SMS_REFILL_PER_SEC
+
+    # Take the token now so alerts arriving while this one is in
+    # flight are rate limited; refunded if sending fails
+    stats.sms_tokens = tokens - 1.0
+    return 0.0
 
-    # Check if enough time has passed since last SMS
-    current_time = datetime.datetime.now()
 
-    if not force and stats["last_sms_time"] is not None:
-        time_since_last = (current_time - stats[
-            "last_sms_time"]).total_seconds() / 60  # in minutes
+def send_sms_with_delay(text: str, force: bool = False):
+    """Queue an SMS with rate limiting - minimum delay between messages
+
+    Returns True once the message is handed to the SMS worker; the outcome
+    is recorded by _record_sms_result when the request completes.
+    """
+    reason = _sms_unavailable_reason()
+    if reason:
+        _log_sms_unavailable(reason, text)
+        return False
 
-        if time_since_last < SMS_DELAY_MINUTES:
-            remaining = SMS_DELAY_MINUTES - time_since_last
-            print(
-                f"[SMS Rate Limited] Next SMS allowed in {remaining:.1f} minutes")
+    limited = not force and SMS_REFILL_PER_SEC is not None
+    if limited:
+        with sms_lock:
+            delay = _take_sms_token()
+        if delay > 0:
+            print(f"[SMS Rate Limited] Next SMS allowed in {delay / 60:.1f} minutes")
             print(f"[Queued Message] {text}")
             return False
 
-    # Send the SMS
-    result = lox24_client.send_sms(PHONE_NUMBER, text)
-    
+    _submit_sms(text, limited)
+    return True
+
+
+def _submit_sms(text, took_token):
+    """Hand an already rate-limited SMS to the worker"""
+    future = sms_executor.submit(lox24_client.send_sms, PHONE_NUMBER, text)
+    future.add_done_callback(partial(_record_sms_result, text, took_token))
+
+
+def _record_sms_result(text, took_token, future):
+    """Update SMS stats once the worker has finished sending"""
+    try:
+        result = future.result()
+    except Exception as e:
+        print(f"SMS Error: {e}")
+        result = False
+
     # Handle both old format (bool) and new format (tuple)
     if isinstance(result, tuple):
         success, cost = result
@@ -1776,29 +2107,472 @@ def send_sms_with_delay(text: str, force: bool = False):
         cost = 0.0
 
     if success:
-        stats["sms_sent"] += 1
-        stats["sms_cost"] += cost
-        stats["last_sms_time"] = current_time
+        with sms_lock:
+            stats.sms_sent += 1
+            stats.sms_cost += cost
+            stats.last_sms_time = datetime.datetime.now()
         print(f"✓ SMS sent: {text}")
         if cost > 0:
             print(f"  Cost: {cost:.3f}€")
 
         # Update log
         log_entry = {
-            "time": current_time.strftime("%H:%M:%S"),
+            "time": time.strftime("%H:%M:%S"),
             "message": f"📱 SMS Alert sent: {text}",
             "type": "sms"
         }
-        stats["detection_log"].append(log_entry)
-        return True
+        stats.detection_log.append(log_entry)
     else:
+        if took_token:
+            with sms_lock:
+                stats.sms_tokens = min(SMS_BURST, stats.sms_tokens + 1.0)
         print(f"✗ Failed to send SMS: {text}")
+
+
+# Alerts arriving within this window are combined into one SMS
+SMS_COALESCE_SECONDS = 30
+SMS_MAX_BATCH_TEXT = 1000
+# Batched alerts kept while rate limited; the oldest are dropped beyond this
+SMS_MAX_PENDING = 50
+sms_pending = []
+sms_flush_timer = None
+
+
+def queue_sms_alert(text: str, immediate: bool = False):
+    """Batch an SMS alert so detection bursts go out as a single message
+
+    immediate sends right away, together with anything already batched,
+    for alerts that should not wait for the window to close. Sending is
+    still rate limited: a rate-limited batch is kept and sent once the
+    next token is due.
+    """
+    with sms_lock:
+        if len(sms_pending) >= SMS_MAX_PENDING:
+            logger.warning("SMS batch full - dropping oldest alert: %s", sms_pending.pop(0))
+        sms_pending.append(text)
+        if not immediate:
+            if sms_flush_timer is None:
+                _schedule_sms_flush(SMS_COALESCE_SECONDS)
+            return True
+    return _flush_sms_alerts()
+
+
+def _schedule_sms_flush(delay):
+    """Start the flush timer; the caller holds sms_lock"""
+    global sms_flush_timer
+
+    sms_flush_timer = threading.Timer(delay, _flush_sms_alerts)
+    sms_flush_timer.daemon = True
+    sms_flush_timer.start()
+
+
+def _flush_sms_alerts():
+    """Send all batched alerts as one SMS, or retry when the next rate-limit token is due"""
+    global sms_flush_timer
+
+    with sms_lock:
+        if sms_flush_timer is not None:
+            sms_flush_timer.cancel()
+            sms_flush_timer = None
+        if not sms_pending:
+            return False
+
+        reason = _sms_unavailable_reason()
+        limited = reason is None and SMS_REFILL_PER_SEC is not None
+        if limited:
+            delay = _take_sms_token()
+            if delay > 0:
+                _schedule_sms_flush(delay)
+                print(f"[SMS Rate Limited] {len(sms_pending)} alert(s) held, "
+                      f"next SMS in {delay / 60:.1f} minutes")
+                return False
+        batch = sms_pending[:]
+        sms_pending.clear()
+
+    if len(batch) == 1:
+        text = batch[0]
+    else:
+        text = "\n".join(batch)
+        if len(text) > SMS_MAX_BATCH_TEXT:
+            text = text[:SMS_MAX_BATCH_TEXT - 3] + "..."
+    if reason:
+        _log_sms_unavailable(reason, text)
         return False
+    _submit_sms(text, limited)
+    return True
+
+
+# ─────────────── Background Image Writer ─────────────────────────
+# JPEG encoding + disk flush takes tens of milliseconds per image, so detection
+# images are handed to a writer thread instead of blocking the capture loop.
+save_queue = queue.Queue(maxsize=64)
+SAVE_JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 90]
+DETECTION_JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 85]
+
+
+def image_writer():
+    """Write queued (path, image) pairs to disk until a None sentinel arrives"""
+    for path, image in iter(save_queue.get, None):
+        try:
+            if not cv2.imwrite(path, image, SAVE_JPEG_PARAMS):
+                logger.warning(f"Failed to write image: {path}")
+        except cv2.error as e:
+            logger.error(f"Image write error for {path}: {e}")
+
+
+def queue_image_save(path: str, image):
+    """Queue an image for the writer thread, dropping it if the disk can't keep up"""
+    try:
+        save_queue.put_nowait((path, image))
+        return True
+    except queue.Full:
+        logger.warning(f"Save queue full - dropping image {path}")
+        return False
+
+
+# ─────────────── Capture / Web Publisher Threads ─────────────────────────
+# Capture, inference and web frame publishing run on separate threads joined
+# by small bounded queues, so the loop runs at max(capture, inference) time
+# instead of their sum. Live cameras drop stale frames instead of blocking.
+frame_queue = queue.Queue(maxsize=2)
+web_queue = queue.Queue(maxsize=2)
+capture_stop = threading.Event()
+
+
+def put_latest(q, item):
+    """Put an item on a bounded queue, discarding the oldest entry when full"""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def capture_frames(cap, drop_stale=True):
+    """Read frames into frame_queue until capture_stop is set"""
+    while not capture_stop.is_set():
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            time.sleep(0.1)
+            continue
+
+        if drop_stale:
+            put_latest(frame_queue, frame)
+        else:
+            # Video files: every frame is processed, capture waits for inference
+            while not capture_stop.is_set():
+                try:
+                    frame_queue.put(frame, timeout=0.5)
+                    break
+                except queue.Full:
+                    pass
+
+
+def web_publisher():
+    """Resize annotated frames into the inactive web buffer and publish them"""
+    global web_idx, web_frame_seq
+    while True:
+        annotated = web_queue.get()
+        if annotated is None:
+            break
+        back = 1 - web_idx
+        cv2.resize(annotated, WEB_FRAME_SIZE, dst=web_frames[back])
+        with web_frame_cond:
+            web_idx = back
+            web_frame_seq += 1
+            web_frame_cond.notify_all()
+
+
+# ─────────────── Direct Inference ─────────────────────────
+# YOLOv5's AutoShape letterboxes and normalizes every frame with numpy and then
+# copies a float tensor to the model device. We upload the raw uint8 frame
+# instead (4x fewer bytes to the GPU) and resize/pad/normalize it with torch.
+# On CPU the pad/normalize/transpose is a single fused jit_utils kernel.
+# On CPU the torchvision NMS is replaced by OpenCV's much cheaper NMSBoxes.
+direct_inference_enabled = True
+
+# On CPU-only hosts the network itself runs in ONNX Runtime when available
+onnx_session = None
+
+
+def export_onnx(model, onnx_path):
+    """Export the YOLOv5 network behind an AutoShape model to ONNX with dynamic input size"""
+    net = model.model.model  # AutoShape -> DetectMultiBackend -> DetectionModel
+    detect = net.model[-1]
+    detect.export = True  # Detect head returns only the concatenated predictions
+    # Rebuild the anchor grid from the input shape, or the 640x640 grid of the
+    # example input is baked in and stride-padded 16:9 frames decode wrongly
+    dynamic = getattr(detect, 'dynamic', False)
+    detect.dynamic = True
+    try:
+        torch.onnx.export(net, torch.zeros(1, 3, 640, 640), onnx_path,
+                          opset_version=17,
+                          input_names=['images'],
+                          output_names=['output0'],
+                          dynamic_axes={'images': {2: 'height', 3: 'width'},
+                                        'output0': {1: 'anchors'}})
+    finally:
+        detect.export = False
+        detect.dynamic = dynamic
+
+
+def load_onnx_session(model, weights_pt):
+    """Create an ONNX Runtime CPU session for the model, exporting it on first run"""
+    if ort is None:
+        print("onnxruntime not installed - using PyTorch on CPU")
+        return None
+
+    # Exports from before the Detect grid was dynamic used plain .onnx and are ignored
+    onnx_path = os.path.splitext(weights_pt)[0] + '-dynamic.onnx'
+    try:
+        if not os.path.exists(onnx_path):
+            print(f"Exporting model to {onnx_path}...")
+            export_onnx(model, onnx_path)
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.intra_op_num_threads = CPU_THREADS
+        session = ort.InferenceSession(onnx_path, sess_options=opts,
+                                       providers=['CPUExecutionProvider'])
+        print(f"Model running on ONNX Runtime: {onnx_path}")
+        return session
+    except Exception as e:
+        print(f"ONNX Runtime unavailable, using PyTorch: {e}")
+        return None
+
+
+def opencv_nms(prediction, conf_thres=0.25, iou_thres=0.45, max_det=300):
+    """Per-class NMS of a raw single-image YOLOv5 output via cv2.dnn.NMSBoxesBatched"""
+    if isinstance(prediction, (list, tuple)):
+        prediction = prediction[0]
+    x = prediction[0]  # (N, 5 + nc) rows of cx, cy, w, h, obj, cls...
+    x = x[x[:, 4] > conf_thres]
+
+    scores, cls = (x[:, 5:] * x[:, 4:5]).max(1)  # conf = obj_conf * cls_conf
+    keep = scores > conf_thres
+    x, scores, cls = x[keep], scores[keep], cls[keep]
+    if not len(x):
+        return [torch.zeros((0, 6), device=prediction.device)]
+
+    boxes = x[:, :4].clone()
+    boxes[:, :2] -= boxes[:, 2:] / 2  # cx, cy, w, h -> x, y, w, h
+    idx = cv2.dnn.NMSBoxesBatched(boxes.float().cpu().numpy(), scores.float().cpu().numpy(),
+                                  cls.cpu().numpy().astype(np.int32), conf_thres, iou_thres)
+    idx = torch.as_tensor(np.asarray(idx, dtype=np.int64).reshape(-1)[:max_det])
+
+    boxes[:, 2:] += boxes[:, :2]  # x, y, w, h -> x1, y1, x2, y2
+    out = torch.cat((boxes, scores[:, None], cls[:, None].type_as(boxes)), 1)
+    return [out[idx.to(out.device)]]
+
+
+# Pinned host staging buffer and device buffer per frame shape and batch slot,
+# reused for every frame so the uint8 upload is a true async DMA without
+# allocations. Frames of one batch use separate slots, since a slot's pinned
+# buffer can't be refilled until its pending copy has run.
+upload_buffers = {}
+
+
+def upload_frame(frame, device, slot=0):
+    """Copy a uint8 HWC frame to the GPU through a reused pinned staging buffer"""
+    key = (frame.shape, slot)
+    buffers = upload_buffers.get(key)
+    if buffers is None:
+        buffers = (torch.empty(frame.shape, dtype=torch.uint8, pin_memory=True),
+                   torch.empty(frame.shape, dtype=torch.uint8, device=device))
+        upload_buffers[key] = buffers
+    pinned, gpu = buffers
+    np.copyto(pinned.numpy(), frame)
+    return gpu.copy_(pinned, non_blocking=True)
+
+
+# On CUDA the network runs as a TorchScript trace specialised to the (fixed)
+# camera input shape, letting the fuser merge the Detect head's element-wise ops
+jit_trace_enabled = True
+traced_nets = {}
+
+
+def traced_forward(model, x):
+    """Run the YOLOv5 network through a per-shape TorchScript trace, tracing on first use"""
+    global jit_trace_enabled
+
+    key = (tuple(x.shape), x.dtype)
+    traced = traced_nets.get(key)
+    if traced is None:
+        net = model.model.model  # AutoShape -> DetectMultiBackend -> DetectionModel
+        try:
+            traced = torch.jit.trace(net, x, check_trace=False, strict=False)
+            traced_nets[key] = traced
+            print(f"Traced model for input {list(x.shape)}")
+        except Exception as e:
+            print(f"TorchScript tracing failed, using eager model: {e}")
+            jit_trace_enabled = False
+            return net(x)[0]
+    return traced(x)[0]
+
+
+def direct_inference(model, frames, rgbs, size=640):
+    """Run AutoShape-equivalent inference on same-sized frames with torch-side letterboxing"""
+    common = sys.modules[type(model).__module__]  # AutoShape's own module
+    p = next(model.model.parameters())
+    h, w = frames[0].shape[:2]
+
+    # Same inference shape AutoShape would pick: longest side = size, stride-padded
+    gain = size / max(h, w)
+    stride = int(model.stride)
+    shape1 = [-(-int(h * gain) // stride) * stride, -(-int(w * gain) // stride) * stride]
+    r = min(shape1[0] / h, shape1[1] / w)
+    nh, nw = round(h * r), round(w * r)
+    dh, dw = (shape1[0] - nh) / 2, (shape1[1] - nw) / 2
+    top, bottom = round(dh - 0.1), round(dh + 0.1)
+    left, right = round(dw - 0.1), round(dw + 0.1)
+
+    with torch.inference_mode():
+        if p.is_cuda:
+            x = torch.stack([upload_frame(f, p.device, slot) for slot, f in enumerate(frames)])
+            x = x.permute(0, 3, 1, 2).flip(1).type_as(p) / 255  # BGR NHWC -> RGB NCHW
+            x = F.interpolate(x, size=(nh, nw), mode='bilinear', align_corners=False)
+            x = F.pad(x, (left, right, top, bottom), value=114 / 255)
+            x = x.contiguous(memory_format=torch.channels_last)
+        else:
+            # Pad, BGR->RGB, normalise and HWC->CHW in a single pass over the pixels
+            x = np.empty((len(frames), 3, shape1[0], shape1[1]), dtype=np.float32)
+            for frame, chw in zip(frames, x):
+                resized = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+                letterbox_chw(resized, chw, top, left)
+            x = torch.from_numpy(x)
+
+        if onnx_session is not None:
+            # The export has a fixed batch dimension of 1
+            y = torch.cat([torch.from_numpy(onnx_session.run(None, {'images': xi.numpy()})[0])
+                           for xi in x.split(1)])
+        elif p.is_cuda and jit_trace_enabled:
+            y = traced_forward(model, x)
+        else:
+            y = model.model(x)
+            y = y if model.dmb else y[0]
+        if p.is_cuda:
+            y = common.non_max_suppression(y, model.conf, model.iou, model.classes,
+                                           model.agnostic, model.multi_label,
+                                           max_det=model.max_det)
+        else:
+            y = y[0] if isinstance(y, (list, tuple)) else y
+            y = [opencv_nms(y[i:i + 1], model.conf, model.iou, max_det=model.max_det)[0]
+                 for i in range(len(frames))]
+        for det in y:
+            common.scale_boxes(shape1, det[:, :4], (h, w))
+
+    times = (common.Profile(), common.Profile(), common.Profile())
+    return common.Detections(rgbs, y, [None] * len(rgbs), times, model.names, x.shape)
+
+
+def run_model_batch(model, frames):
+    """Run detection on same-sized BGR frames in one forward pass, one result per frame"""
+    global direct_inference_enabled
+
+    # The RGB copies are still needed on the host for results.render()
+    rgbs = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frames]
+
+    if direct_inference_enabled:
+        try:
+            return direct_inference(model, frames, rgbs).tolist()
+        except Exception as e:
+            print(f"Direct inference unavailable, using AutoShape: {e}")
+            direct_inference_enabled = False
+
+    with torch.inference_mode():
+        return model(rgbs).tolist()
+
+
+# ─────────────── Detection Counting ─────────────────────────
+def _count_detections(preds):
+    """Count velutina/crabro rows and sum confidences of an (N, 6) float32 array"""
+    velutina = 0
+    crabro = 0
+    conf_sum = 0.0
+    for i in range(preds.shape[0]):
+        conf_sum += preds[i, 4]
+        cls = int(preds[i, 5])
+        if cls == 1:
+            velutina += 1
+        elif cls == 0:
+            crabro += 1
+    return velutina, crabro, conf_sum, preds.shape[0]
+
+
+def _count_detections_numpy(preds):
+    """Vectorised equivalent of _count_detections for when numba is unavailable"""
+    classes = preds[:, 5].astype(np.int8)
+    return (int(np.count_nonzero(classes == VELUTINA)),
+            int(np.count_nonzero(classes == CRABRO)),
+            float(preds[:, 4].sum()), preds.shape[0])
+
+
+# Compiled to native code when numba is installed (cached on disk between runs)
+count_detections = (njit(cache=True, nogil=True)(_count_detections) if njit
+                    else _count_detections_numpy)
+
+
+# ─────────────── Motion Gate ─────────────────────────
+# Frame differencing on a tiny greyscale thumbnail costs well under a
+# millisecond and lets static scenes skip YOLO inference entirely
+MOTION_GATE_SIZE = (160, 90)
+MOTION_PIXEL_THRESHOLD = 15
+
+
+def motion_gate(frame, prev_small, min_motion_area):
+    """Return (motion_detected, thumbnail) comparing a frame with the previous thumbnail"""
+    small = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), MOTION_GATE_SIZE,
+                       interpolation=cv2.INTER_AREA)
+    if prev_small is None:
+        return True, small
+
+    return motion_area(small, prev_small, MOTION_PIXEL_THRESHOLD) >= min_motion_area, small
+
+
+# ─────────────── Frame Overlay ─────────────────────────
+# The status text is rasterised into a small cached patch at most every
+# 100 ms and copied onto each frame through its text mask
+OVERLAY_SIZE = (70, 420)  # height, width
+OVERLAY_REFRESH_INTERVAL = 0.1
+OVERLAY_FONT = cv2.FONT_HERSHEY_SIMPLEX
+OVERLAY_COLOR = (0, 255, 0)  # BGR green
+overlay_cache = {"lines": None, "time": 0.0, "image": None, "mask": None}
+
+
+def draw_overlay(annotated, lines):
+    """Draw the status lines onto a frame, re-rendering the text only when needed"""
+    now = time.monotonic()
+    if overlay_cache["image"] is None or (
+            lines != overlay_cache["lines"]
+            and now - overlay_cache["time"] >= OVERLAY_REFRESH_INTERVAL):
+        image = np.zeros((*OVERLAY_SIZE, 3), dtype=np.uint8)
+        for i, text in enumerate(lines):
+            cv2.putText(image, text, (10, 30 + 30 * i),
+                        OVERLAY_FONT, 0.7, OVERLAY_COLOR, 2)
+        overlay_cache.update(lines=lines, time=now, image=image,
+                             mask=image[..., 1:2] > 0)
+
+    roi = annotated[:OVERLAY_SIZE[0], :OVERLAY_SIZE[1]]
+    h, w = roi.shape[:2]
+    np.copyto(roi, overlay_cache["image"][:h, :w],
+              where=overlay_cache["mask"][:h, :w])
 
 
 # ─────────────── Main Detection Function ─────────────────────────
 def main():
-    global web_frame, stats, hourly_detections, current_hour
+    global stats, hourly_detections, current_hour, onnx_session, frame_queue
+
+    # Inference only: no autograd bookkeeping, and let cuDNN pick the fastest
+    # conv kernels once for the fixed input shape
+    torch.set_grad_enabled(False)
+    torch.backends.cudnn.benchmark = True
+
+    cv2.setNumThreads(CPU_THREADS)
+    torch.set_num_threads(CPU_THREADS)
 
     # Parse arguments
     argp = argparse.ArgumentParser()
@@ -1813,6 +2587,9 @@ def main():
     argp.add_argument("-sd", "--save-dir", default="monitor/detections")
     argp.add_argument("-v", "--video")
     argp.add_argument("-r", "--resolution", default="1920x1080")
+    argp.add_argument("--batch", type=int, default=1,
+                      help="Most frames per inference call (1 on a Pi, 4-8 on a GPU); "
+                           "a batch takes whatever frames are queued, it never waits for more")
     argp.add_argument("--web", action="store_true", help="Enable web server")
     argp.add_argument("--sms", action="store_true", help="Enable SMS alerts (requires LOX24_API_KEY and PHONE_NUMBER)")
     args = argp.parse_args()
@@ -1847,6 +2624,9 @@ def main():
         for d in (FRAME_DIR, LABEL_DIR, RESULT_DIR):
             os.makedirs(d, exist_ok=True)
 
+        save_thread = threading.Thread(target=image_writer, daemon=True)
+        save_thread.start()
+
     # Initialize Camera
     if args.video:
         cap = cv2.VideoCapture(args.video)
@@ -1866,8 +2646,17 @@ def main():
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, WIDTH)
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, HEIGHT)
         cap.set(cv2.CAP_PROP_FPS, 30)
-
-        print(f"Camera initialized")
+        # Keep only the newest frame so an inference stall doesn't leave
+        # stale frames queued in the driver
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        # Uncompressed YUYV can't sustain 30 FPS at 1080p over USB 2
+        # Masked: unsupported backends report -1 and DirectShow negative codes
+        fourcc_code = int(cap.get(cv2.CAP_PROP_FOURCC)) & 0xFFFFFFFF
+        fourcc_str = fourcc_code.to_bytes(4, 'little').decode('ascii', 'replace')
+        print(f"Camera initialized ({fourcc_str})")
+        if fourcc_str != 'MJPG':
+            print("Warning: camera did not accept MJPG, frame rate may be USB-limited")
         time.sleep(2)
 
     # Load YOLOv5 Model
@@ -1901,7 +2690,8 @@ def main():
     # Method 1: Try yolov5 package
     try:
         import yolov5
-        model = yolov5.load(weights_pt, device='cpu')
+        device = 'cuda:0' if torch.cuda.is_available() else 'cpu'
+        model = yolov5.load(weights_pt, device=device)
         model.conf = args.conf
         print("Model loaded via yolov5 package")
     except ImportError:
@@ -1941,6 +2731,18 @@ def main():
     if hasattr(model, 'names'):
         print(f"Classes: {model.names}")
 
+    # On CUDA use channels-last FP16 weights so cuDNN can run Tensor-Core NHWC
+    # kernels without transposing every activation
+    if torch.cuda.is_available():
+        try:
+            if next(model.parameters()).is_cuda:
+                model.model = model.model.to(memory_format=torch.channels_last).half()
+                print("Model converted to channels-last FP16")
+        except Exception as e:
+            print(f"Channels-last conversion failed, keeping default layout: {e}")
+    else:
+        onnx_session = load_onnx_session(model, weights_pt)
+
     # Start Web Server
     if args.web:
         web_thread = threading.Thread(target=start_web_server)
@@ -1967,205 +2769,251 @@ def main():
                 vibe.init_history(cv2.cvtColor(frame0, cv2.COLOR_BGR2GRAY))
                 print("Motion detection enabled")
         except (ImportError, AttributeError) as e:
-            print(f"Warning: Motion detection disabled - {e}")
-            print("Continuing without motion detection...")
+            print(f"Warning: ViBe motion detection unavailable - {e}")
+            print("Using frame differencing for motion detection...")
             vibe = None
+    prev_small = None
+    batch = []
+    if args.batch > frame_queue.maxsize:
+        frame_queue = queue.Queue(maxsize=args.batch)
+
+    capture_thread = threading.Thread(target=capture_frames,
+                                      args=(cap, not args.video), daemon=True)
+    capture_thread.start()
+    if args.web:
+        publish_thread = threading.Thread(target=web_publisher, daemon=True)
+        publish_thread.start()
+
+    # On a Pi keep cores 0-1 for capture and Flask: pin this (inference) thread,
+    # and the torch workers it spawns, to the remaining cores. The other
+    # threads were started above and keep the full affinity mask.
+    cores = os.cpu_count() or 1
+    if GPIO and cores >= 4 and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, set(range(2, cores)))
+            print(f"Inference pinned to cores 2-{cores - 1}")
+        except OSError as e:
+            print(f"Could not set CPU affinity: {e}")
 
     print("\nStarting detection loop...")
     print("Press Ctrl+C to stop\n")
 
     # Main Detection Loop
+    period_ns = int(args.brake * 1e9)
+    deadline = time.monotonic_ns()
     try:
         while True:
-            loop_start = time.time()
-            ret, frame = cap.read()
-
-            if not ret or frame is None:
-                time.sleep(0.1)
+            try:
+                frames = [frame_queue.get(timeout=1.0)]
+            except queue.Empty:
                 continue
+            # Batch whatever else the capture thread has queued, without waiting
+            while len(frames) < args.batch:
+                try:
+                    frames.append(frame_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for frame in frames:
+                # Update FPS
+                fps_counter += 1
+                if time.time() - last_fps_time >= 1.0:
+                    stats.fps = fps_counter
+                    fps_counter = 0
+                    last_fps_time = time.time()
+                    logger.debug("Queue depth - capture: %d, web: %d, save: %d",
+                                 frame_queue.qsize(), web_queue.qsize(), save_queue.qsize())
+
+                # Check for hour change
+                new_hour = datetime.datetime.now().hour
+                if new_hour != current_hour:
+                    # Clear the counts left over from the same hour yesterday
+                    hourly_detections[new_hour] = {"velutina": 0, "crabro": 0}
+                    current_hour = new_hour
+
+                # Motion detection
+                if vibe:
+                    grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                    seg = vibe.segmentation(grey)
+                    vibe.update(grey, seg)
+                    seg = cv2.medianBlur(seg, 3)
+                    seg = cv2.dilate(seg, None, iterations=args.dilation)
+                    contours, _ = cv2.findContours(seg, cv2.RETR_EXTERNAL,
+                                                   cv2.CHAIN_APPROX_SIMPLE)
+                    run_det = any(
+                        cv2.contourArea(c) > args.min_motion_area for c in contours)
+                elif args.motion:
+                    run_det, prev_small = motion_gate(frame, prev_small,
+                                                      args.min_motion_area)
+                else:
+                    run_det = True
 
-            # Update FPS
-            fps_counter += 1
-            if time.time() - last_fps_time >= 1.0:
-                stats["fps"] = fps_counter
-                fps_counter = 0
-                last_fps_time = time.time()
-
-            # Check for hour change
-            new_hour = datetime.datetime.now().hour
-            if new_hour != current_hour:
-                hourly_detections[current_hour] = {"velutina": 0, "crabro": 0}
-                current_hour = new_hour
-
-            # Motion detection
-            if vibe:
-                grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                seg = vibe.segmentation(grey)
-                vibe.update(grey, seg)
-                seg = cv2.medianBlur(seg, 3)
-                seg = cv2.dilate(seg, None, iterations=args.dilation)
-                contours, _ = cv2.findContours(seg, cv2.RETR_EXTERNAL,
-                                               cv2.CHAIN_APPROX_SIMPLE)
-                run_det = any(
-                    cv2.contourArea(c) > args.min_motion_area for c in contours)
-            else:
-                run_det = True
-
-            if run_det:
-                # Run detection
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                results = model(rgb)
-
-                # Count detections
-                preds = results.pred[0]
-                ah = 0  # Asian hornet
-                eh = 0  # European hornet
-
-                if len(preds) > 0:
-                    for pred in preds:
-                        x1, y1, x2, y2, conf, cls = pred
-                        cls = int(cls)
-                        confidence = float(conf)
-
-                        total_confidence += confidence
-                        confidence_count += 1
-
-                        if cls == 1:
-                            ah += 1
-                            stats["total_velutina"] += 1
-                            hourly_detections[current_hour]["velutina"] += 1
-                            if args.print:
-                                print(
-                                    f"  Vespa velutina - conf: {confidence:.2f}")
-                        elif cls == 0:
-                            eh += 1
-                            stats["total_crabro"] += 1
-                            hourly_detections[current_hour]["crabro"] += 1
-                            if args.print:
-                                print(
-                                    f"  Vespa crabro - conf: {confidence:.2f}")
-
-                # Render results
-                results.render()
-                annotated = cv2.cvtColor(results.ims[0], cv2.COLOR_RGB2BGR)
-
-                # Add overlay text
-                cv2.putText(annotated,
-                            f"Frame: {frame_id} | FPS: {stats['fps']}",
-                            (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7,
-                            (0, 255, 0), 2)
-                cv2.putText(annotated,
-                            f"V: {stats['total_velutina']} | C: {stats['total_crabro']}",
-                            (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7,
-                            (0, 255, 0), 2)
-
-                # Update web frame - immer updaten, auch ohne Detection
-                if args.web:
-                    display_frame = cv2.resize(annotated, (960, 540))
-                    with web_lock:
-                        web_frame = display_frame.copy()
-
-                # If hornets detected
-                if ah + eh > 0:
-                    stats["total_detections"] += 1
-                    detection_time = datetime.datetime.now().strftime(
-                        "%H:%M:%S")
-
-                    # Store the annotated frame for this detection
-                    detection_key = f"{frame_id}_{detection_time.replace(':', '')}"
-                    stats["detection_frames"][detection_key] = annotated.copy()
-
-                    # Keep only last 20 frames to manage memory
-                    if len(stats["detection_frames"]) > 20:
-                        oldest_key = list(stats["detection_frames"].keys())[0]
-                        del stats["detection_frames"][oldest_key]
-
-                    # Add to log with specific type
-                    if ah > 0 and eh > 0:
-                        # Beide Arten erkannt
-                        log_entry = {
-                            "time": detection_time,
-                            "message": f"Detected: {ah} Velutina, {eh} Crabro",
-                            "type": "both",
-                            "frame_id": detection_key
-                        }
-                    elif ah > 0:
-                        # Nur Velutina
-                        log_entry = {
-                            "time": detection_time,
-                            "message": f"⚠️ Asian Hornet! {ah} Vespa Velutina detected",
-                            "type": "velutina",
-                            "frame_id": detection_key
-                        }
-                    else:
-                        # Nur Crabro
-                        log_entry = {
-                            "time": detection_time,
-                            "message": f"European Hornet: {eh} Vespa Crabro detected",
-                            "type": "crabro",
-                            "frame_id": detection_key
-                        }
-
-                    stats["detection_log"].append(log_entry)
+                if run_det:
+                    batch.append((frame_id, frame))
 
-                    print(
-                        f">>> Detection #{stats['total_detections']} at frame {frame_id}")
-                    print(f"    Velutina: {ah}, Crabro: {eh}")
+                stats.frame_id = frame_id
+                frame_id += 1
 
-                    # Send SMS alert with delay and frame URL
-                    frame_url = f"{PUBLIC_URL}/frame/{detection_key}"
+            if batch:
+                # Run detection
+                batch_results = run_model_batch(model, [f for _, f in batch])
+
+                for (det_id, frame), results in zip(batch, batch_results):
+                    # Count detections
+                    preds = results.pred[0]
+                    ah = 0  # Asian hornet
+                    eh = 0  # European hornet
+
+                    if preds.shape[0]:
+                        # One device->host copy, then counted without per-row Python
+                        preds_np = preds.cpu().numpy().astype(np.float32)
+                        ah, eh, conf_sum, conf_n = count_detections(preds_np)
+
+                        total_confidence += float(conf_sum)
+                        confidence_count += conf_n
+
+                        stats.total_velutina += ah
+                        stats.total_crabro += eh
+                        hour_counts = hourly_detections[current_hour]
+                        hour_counts["velutina"] += ah
+                        hour_counts["crabro"] += eh
+                        record_detections(preds_np, int(time.time()))
+
+                        if args.print:
+                            for *_, confidence, cls in preds_np:
+                                if cls == 1:
+                                    print(f"  Vespa velutina - conf: {confidence:.2f}")
+                                elif cls == 0:
+                                    print(f"  Vespa crabro - conf: {confidence:.2f}")
+
+                    # Render results
+                    results.render()
+                    annotated = cv2.cvtColor(results.ims[0], cv2.COLOR_RGB2BGR)
+
+                    # Add overlay text
+                    draw_overlay(annotated, (
+                        f"Frame: {det_id} | FPS: {stats.fps}",
+                        f"V: {stats.total_velutina} | C: {stats.total_crabro}"))
+
+                    # Update web frame - immer updaten, auch ohne Detection
+                    if args.web and det_id == batch[-1][0]:
+                        put_latest(web_queue, annotated)
+
+                    # If hornets detected
+                    if ah + eh > 0:
+                        stats.total_detections += 1
+                        detection_time = datetime.datetime.now().strftime(
+                            "%H:%M:%S")
+
+                        # Store the annotated frame for this detection
+                        detection_key = f"{det_id}_{detection_time.replace(':', '')}"
+                        # JPEG-encoded once here, so SMS link visits only send bytes
+                        ok, buffer = cv2.imencode('.jpg', annotated, DETECTION_JPEG_PARAMS)
+                        if ok:
+                            stats.detection_frames[detection_key] = buffer.tobytes()
+
+                        # Add to log with specific type
+                        if ah > 0 and eh > 0:
+                            # Beide Arten erkannt
+                            log_entry = {
+                                "time": detection_time,
+                                "message": f"Detected: {ah} Velutina, {eh} Crabro",
+                                "type": "both",
+                                "frame_id": detection_key
+                            }
+                        elif ah > 0:
+                            # Nur Velutina
+                            log_entry = {
+                                "time": detection_time,
+                                "message": f"⚠️ Asian Hornet! {ah} Vespa Velutina detected",
+                                "type": "velutina",
+                                "frame_id": detection_key
+                            }
+                        else:
+                            # Nur Crabro
+                            log_entry = {
+                                "time": detection_time,
+                                "message": f"European Hornet: {eh} Vespa Crabro detected",
+                                "type": "crabro",
+                                "frame_id": detection_key
+                            }
+
+                        stats.detection_log.append(log_entry)
+
+                        print(
+                            f">>> Detection #{stats.total_detections} at frame {det_id}")
+                        print(f"    Velutina: {ah}, Crabro: {eh}")
+
+                        # Send SMS alert with delay and frame URL
+                        frame_url = f"{PUBLIC_URL}/frame/{detection_key}"
                     
-                    print(f"[DEBUG SMS] ah={ah}, eh={eh}, frame_url={frame_url}")
+                        print(f"[DEBUG SMS] ah={ah}, eh={eh}, frame_url={frame_url}")
                     
-                    if ah > 0:  # Asian hornet detected - high priority
-                        sms_text = f"⚠️ {ah} Asian Hornet {datetime.datetime.now().strftime('%H:%M')} - {frame_url}"
-                        print(f"[DEBUG SMS] Sending Asian hornet SMS: {sms_text}")
-                        send_sms_with_delay(sms_text)
-                    elif eh > 0:  # Only European hornet
-                        sms_text = f"ℹ️ {eh} European Hornet {datetime.datetime.now().strftime('%H:%M')} - {frame_url}"
-                        print(f"[DEBUG SMS] Sending European hornet SMS: {sms_text}")
-                        send_sms_with_delay(sms_text)
-
-                    # Save if enabled
-                    if args.save:
-                        ts = datetime.datetime.now().strftime(
-                            "%d.%m.%Y-%H:%M:%S")
-                        rname = os.path.join(RESULT_DIR, f"{ts}.jpeg")
-                        fname = os.path.join(FRAME_DIR, f"{ts}.jpeg")
-
-                        cv2.imwrite(rname, annotated)
-                        cv2.imwrite(fname, frame)
-                        stats["saved_images"] += 1
-
-                        # Calculate disk usage
-                        try:
-                            stats["disk_usage"] = sum(
-                                os.path.getsize(os.path.join(RESULT_DIR, f))
-                                for f in os.listdir(RESULT_DIR) if
-                                os.path.isfile(os.path.join(RESULT_DIR, f)))
-                        except:
-                            pass
-
-                # Update average confidence
-                if confidence_count > 0:
-                    stats["confidence_avg"] = (
-                                                      total_confidence / confidence_count) * 100
-
-            stats["frame_id"] = frame_id
-            frame_id += 1
-
-            # Frame rate limiting
-            delay = args.brake - (time.time() - loop_start)
+                        if ah > 0:  # Asian hornet detected - high priority
+                            sms_text = f"⚠️ {ah} Asian Hornet {datetime.datetime.now().strftime('%H:%M')} - {frame_url}"
+                            print(f"[DEBUG SMS] Sending Asian hornet SMS: {sms_text}")
+                            queue_sms_alert(sms_text, immediate=True)
+                        elif eh > 0:  # Only European hornet
+                            sms_text = f"ℹ️ {eh} European Hornet {datetime.datetime.now().strftime('%H:%M')} - {frame_url}"
+                            print(f"[DEBUG SMS] Sending European hornet SMS: {sms_text}")
+                            queue_sms_alert(sms_text)
+
+                        # Save if enabled
+                        if args.save:
+                            ts = datetime.datetime.now().strftime(
+                                "%d.%m.%Y-%H:%M:%S")
+                            rname = os.path.join(RESULT_DIR, f"{ts}.jpeg")
+                            fname = os.path.join(FRAME_DIR, f"{ts}.jpeg")
+
+                            # Both arrays are freshly allocated for this iteration
+                            # and never touched again, so no copy is needed here
+                            if queue_image_save(rname, annotated):
+                                stats.saved_images += 1
+                            queue_image_save(fname, frame)
+
+                            # Calculate disk usage
+                            try:
+                                stats.disk_usage = sum(
+                                    os.path.getsize(os.path.join(RESULT_DIR, f))
+                                    for f in os.listdir(RESULT_DIR) if
+                                    os.path.isfile(os.path.join(RESULT_DIR, f)))
+                            except:
+                                pass
+
+                    # Update average confidence
+                    if confidence_count > 0:
+                        stats.confidence_avg = (
+                            total_confidence / confidence_count) * 100
+
+                batch.clear()
+
+            # Frame rate limiting against a running deadline, so scheduling
+            # overshoot doesn't accumulate; reset it when we fall behind
+            deadline += period_ns * len(frames)
+            delay = (deadline - time.monotonic_ns()) / 1e9
             if delay > 0:
                 time.sleep(delay)
+            else:
+                deadline = time.monotonic_ns()
 
     except KeyboardInterrupt:
         print("\n\nStopping detection...")
 
     # Cleanup
     print("Cleaning up...")
+    capture_stop.set()
+    capture_thread.join(timeout=2)
     cap.release()
 
+    if args.web:
+        put_latest(web_queue, None)
+        publish_thread.join(timeout=2)
+
+    if args.save:
+        # Flush pending detection images before exiting
+        save_queue.put(None)
+        save_thread.join(timeout=10)
+
     if GPIO:
         try:
             GPIO.cleanup()
@@ -2174,9 +3022,9 @@ def main():
 
     print(f"\nFinal Statistics:")
     print(f"  Frames: {frame_id}")
-    print(f"  Detections: {stats['total_detections']}")
-    print(f"  Velutina: {stats['total_velutina']}")
-    print(f"  Crabro: {stats['total_crabro']}")
+    print(f"  Detections: {stats.total_detections}")
+    print(f"  Velutina: {stats.total_velutina}")
+    print(f"  Crabro: {stats.total_crabro}")
 
 
 if __name__ == '__main__':